@@ -2,47 +2,51 @@
 Error Message Translator package.
 
 This package provides functionality to translate error messages into beginner-friendly explanations.
+
+The Flask application lives in app.web and is only imported when `app.app`
+is first used, so the translator, the daemon and its client can be imported
+without loading Flask.
 """
-from flask import Flask, jsonify
-from werkzeug.exceptions import HTTPException
-import logging
-
-# Create the Flask application instance
-app = Flask(__name__)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-# Error handlers
-@app.errorhandler(HTTPException)
-def handle_http_error(error):
-    """Handle HTTP errors."""
-    response = jsonify({
-        "error": {
-            "code": error.code,
-            "name": error.name,
-            "description": error.description
-        }
-    })
-    response.status_code = error.code
-    return response
-
-@app.errorhandler(Exception)
-def handle_generic_error(error):
-    """Handle non-HTTP errors."""
-    app.logger.error(f"Unhandled error: {str(error)}", exc_info=True)
-    response = jsonify({
-        "error": {
-            "code": 500,
-            "name": "Internal Server Error",
-            "description": "An unexpected error occurred"
-        }
-    })
-    response.status_code = 500
-    return response
+import os
+
+
+def configure_from_environment() -> None:
+    """Apply the settings given through environment variables.
+
+    LOG_FORMAT=json writes JSON log lines, CACHE_BACKEND_URL shares results
+    through an external cache and TENANTS_FILE defines teams' private patterns.
+    """
+    from app.logs import configure_logging
+
+    # Log through a queue written by a background thread
+    configure_logging(json_output=os.environ.get("LOG_FORMAT", "").lower() == "json")
+
+    # Share translation results with other nodes when an external cache is configured
+    if os.environ.get("CACHE_BACKEND_URL"):
+        from app.cache import configure_backend
+
+        configure_backend(os.environ["CACHE_BACKEND_URL"])
+
+    # Private pattern sets of teams, on top of the shared patterns
+    if os.environ.get("TENANTS_FILE"):
+        from app.data.tenants import configure_tenants
+
+        configure_tenants(os.environ["TENANTS_FILE"],
+                          trust_header=os.environ.get("TRUST_TENANT_HEADER", "").lower() == "true")
+
+
+def __getattr__(name):
+    """Load the Flask application and the translator functions on first use."""
+    if name == "app":
+        from app.web import app
+
+        return app
+    if name in ("translate_error", "detect_language"):
+        from app import translator
+
+        return getattr(translator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Make important objects available at package level
 __all__ = ["app", "translate_error", "detect_language"]
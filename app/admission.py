@@ -0,0 +1,119 @@
+"""
+Admission Control
+
+This module limits how much translation work runs at once. A fixed number of
+requests may run concurrently, a bounded number may wait for a slot, and the
+rest are shed immediately so the admitted requests keep their latency during
+a spike.
+"""
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+from app.deadline import NO_DEADLINE, Deadline
+
+logger = logging.getLogger(__name__)
+
+# Requests allowed to run translation work at the same time in one process
+MAX_IN_FLIGHT = 4
+
+# Requests allowed to wait for a free slot before new ones are shed
+MAX_QUEUE = 32
+
+# Longest a request waits in the queue before it is shed
+QUEUE_TIMEOUT = 2.0  # seconds
+
+# Seconds clients are asked to wait before retrying a shed request
+RETRY_AFTER = 1
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed because the queue is full or the wait timed out."""
+
+    def __init__(self, message: str, retry_after: int = RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExpired(Overloaded):
+    """Raised when a request's client deadline passes before it is admitted."""
+
+
+class AdmissionController:
+    """Caps concurrent work with a bounded wait queue."""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.counters = {"admitted": 0, "shed": 0, "expired": 0}
+
+    @property
+    def stats(self):
+        """Current queue depth, limits and counters."""
+        with self._condition:
+            return dict(
+                self.counters,
+                in_flight=self.in_flight,
+                queued=self.queued,
+                max_in_flight=self.max_in_flight,
+                max_queue=self.max_queue,
+            )
+
+    def _reject(self, error: Overloaded) -> Overloaded:
+        self.counters["expired" if isinstance(error, DeadlineExpired) else "shed"] += 1
+        return error
+
+    @contextmanager
+    def admit(self, deadline: Deadline = NO_DEADLINE):
+        """Hold a work slot for the duration of the block.
+
+        Args:
+            deadline: when the client no longer wants the answer
+
+        Raises:
+            Overloaded: the queue is full or no slot freed up in time
+            DeadlineExpired: the deadline passed before a slot was available
+        """
+        with self._condition:
+            if deadline.expired():
+                raise self._reject(DeadlineExpired("Request deadline already passed"))
+
+            if self.in_flight >= self.max_in_flight:
+                if self.queued >= self.max_queue:
+                    raise self._reject(Overloaded("Too many requests queued"))
+
+                wait_until = time.monotonic() + min(self.queue_timeout, deadline.remaining())
+                self.queued += 1
+                try:
+                    while self.in_flight >= self.max_in_flight:
+                        remaining = wait_until - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                finally:
+                    self.queued -= 1
+
+                if self.in_flight >= self.max_in_flight:
+                    if deadline.expired():
+                        raise self._reject(DeadlineExpired("Request deadline passed while queued"))
+                    raise self._reject(Overloaded("Timed out waiting for a free slot"))
+
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+
+# Controller shared by the translate endpoints
+ADMISSION = AdmissionController()
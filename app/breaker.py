@@ -0,0 +1,180 @@
+"""
+Pattern Circuit Breaker
+
+This module times every pattern search and takes patterns that are
+repeatedly slow out of rotation. A tripped pattern is skipped for a cool-down
+period, then given one trial search: if that is fast it is restored,
+otherwise it is tripped again. One pathological pattern therefore costs a
+few slow searches instead of slowing every request for its language.
+"""
+import time
+import threading
+import logging
+from typing import Dict, FrozenSet, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A single search slower than this counts against the pattern
+SLOW_PATTERN_THRESHOLD = 0.01  # seconds
+
+# Allowance added to the threshold per KiB of searched text, since every
+# pattern scans long messages in full
+SLOW_PATTERN_THRESHOLD_PER_KIB = 0.01  # seconds
+
+# Consecutive slow searches that trip a pattern
+TRIP_AFTER = 3
+
+# How long a tripped pattern is skipped before it is tried again
+COOL_DOWN = 60.0  # seconds
+
+
+class _Trip:
+    """A tripped pattern and when it may be tried again."""
+
+    __slots__ = ("tripped_at", "retry_at", "last_duration", "trial")
+
+    def __init__(self, retry_at: float, last_duration: float):
+        self.tripped_at = time.time()
+        self.retry_at = retry_at
+        self.last_duration = last_duration
+        self.trial = False
+
+
+class PatternBreaker:
+    """Tracks per-pattern search time and skips patterns that keep running slow."""
+
+    def __init__(self, threshold: float = SLOW_PATTERN_THRESHOLD, trip_after: int = TRIP_AFTER,
+                 cool_down: float = COOL_DOWN,
+                 threshold_per_kib: float = SLOW_PATTERN_THRESHOLD_PER_KIB):
+        self.threshold = threshold
+        self.threshold_per_kib = threshold_per_kib
+        self.trip_after = trip_after
+        self.cool_down = cool_down
+        self._lock = threading.Lock()
+        self._slow: Dict[str, int] = {}
+        self._open: Dict[str, _Trip] = {}
+        self.stats = {"trips": 0, "recoveries": 0, "skipped": 0}
+        # Changes whenever a pattern is disabled or restored, so results that
+        # depend on which patterns ran can be cached per state
+        self.generation = 0
+
+    def allow(self, pattern_id: str) -> bool:
+        """Return whether a pattern may be searched now.
+
+        After the cool-down exactly one caller is let through as a trial.
+        """
+        trip = self._open.get(pattern_id)
+        if trip is None:
+            return True
+        with self._lock:
+            if not trip.trial and time.monotonic() >= trip.retry_at:
+                trip.trial = True
+                return True
+            self.stats["skipped"] += 1
+            return False
+
+    def scan_plan(self) -> Tuple[FrozenSet[str], FrozenSet[str], Tuple[str, ...]]:
+        """Return what a scan run in another process needs from the breaker.
+
+        That is the patterns it must skip, the patterns whose search time it
+        must report even when fast (those with a slow streak, and trials) and
+        the trials granted, as allow() would grant them. A trial the scan did
+        not reach must be handed back with end_trial().
+        """
+        if not self._open and not self._slow:
+            return frozenset(), frozenset(), ()
+        now = time.monotonic()
+        skip = set()
+        trials = []
+        with self._lock:
+            for pattern_id, trip in self._open.items():
+                if not trip.trial and now >= trip.retry_at:
+                    trip.trial = True
+                    trials.append(pattern_id)
+                else:
+                    skip.add(pattern_id)
+            watch = frozenset(self._slow).union(trials)
+        return frozenset(skip), watch, tuple(trials)
+
+    def end_trial(self, pattern_id: str) -> None:
+        """Hand back a trial that was granted but not searched, so a later request takes it."""
+        with self._lock:
+            trip = self._open.get(pattern_id)
+            if trip is not None:
+                trip.trial = False
+
+    def threshold_for(self, length: int) -> float:
+        """Return the search time over which a search of `length` characters is slow."""
+        return self.threshold + self.threshold_per_kib * length / 1024
+
+    def record(self, pattern_id: str, duration: float, length: int = 0) -> None:
+        """Record how long a search of a pattern over `length` characters took."""
+        threshold = self.threshold_for(length)
+        slow = duration >= threshold
+        if not slow and pattern_id not in self._slow and pattern_id not in self._open:
+            return  # Fast path: a healthy pattern stayed fast
+
+        with self._lock:
+            trip = self._open.get(pattern_id)
+            if trip is not None:
+                if not trip.trial:
+                    return  # A search that started before the trip
+                if slow:
+                    trip.retry_at = time.monotonic() + self.cool_down
+                    trip.last_duration = duration
+                    trip.trial = False
+                    self.stats["trips"] += 1
+                    logger.warning(f"Pattern {pattern_id} still slow ({duration:.3f}s), "
+                                   f"disabled for another {self.cool_down}s")
+                else:
+                    del self._open[pattern_id]
+                    self.generation += 1
+                    self.stats["recoveries"] += 1
+                    logger.info(f"Pattern {pattern_id} recovered ({duration:.3f}s)")
+                return
+
+            if not slow:
+                self._slow.pop(pattern_id, None)
+                return
+
+            count = self._slow.get(pattern_id, 0) + 1
+            if count < self.trip_after:
+                self._slow[pattern_id] = count
+                return
+            self._slow.pop(pattern_id, None)
+            self._open[pattern_id] = _Trip(time.monotonic() + self.cool_down, duration)
+            self.generation += 1
+            self.stats["trips"] += 1
+            logger.warning(
+                f"Pattern {pattern_id} tripped after {count} searches over {threshold:.3f}s "
+                f"(last {duration:.3f}s), disabled for {self.cool_down}s"
+            )
+
+    def any_tripped(self) -> bool:
+        """Return whether any pattern is disabled."""
+        return bool(self._open)
+
+    def tripped(self) -> List[Dict[str, object]]:
+        """Describe the patterns that are currently disabled."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "id": pattern_id,
+                    "tripped_at": trip.tripped_at,
+                    "retry_in": max(0.0, round(trip.retry_at - now, 3)),
+                    "last_duration": round(trip.last_duration, 6),
+                }
+                for pattern_id, trip in self._open.items()
+            ]
+
+    def reset(self) -> None:
+        """Restore every pattern."""
+        with self._lock:
+            self._slow.clear()
+            self._open.clear()
+            self.generation += 1
+
+
+# Breaker shared by language detection and pattern matching
+BREAKER = PatternBreaker()
@@ -0,0 +1,323 @@
+"""
+Translation Cache
+
+This module caches translation results by message fingerprint. Every process
+keeps a small LRU cache, an optional shared-memory tier lets worker processes
+forked from the same master reuse each other's results, and an optional
+external backend (see app.cache_backends) shares results between nodes.
+"""
+import json
+import time
+import struct
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entries kept in each process's local cache
+CACHE_SIZE = 1024
+
+# Shared-memory table geometry: SHARED_CACHE_SLOTS slots of SHARED_CACHE_SLOT_SIZE
+# bytes, grouped into buckets of SHARED_CACHE_WAYS slots
+SHARED_CACHE_SLOTS = 4096
+SHARED_CACHE_SLOT_SIZE = 8192
+SHARED_CACHE_WAYS = 4
+
+# Seconds a writer waits for the shared table's lock before skipping the write.
+# A worker killed while holding the lock would otherwise block every writer.
+SHARED_CACHE_LOCK_TIMEOUT = 0.05
+
+# Seconds to skip the external backend after it fails or is too slow
+BACKEND_RETRY_INTERVAL = 5.0
+
+# Slot header: sequence number, write stamp, key digest, payload length
+_SLOT_HEADER = struct.Struct("<IQ16sI")
+# Table header: global write counter used to stamp slots for eviction
+_TABLE_HEADER = struct.Struct("<Q")
+
+
+def fingerprint(message: str, language: str) -> str:
+    """Return a stable fingerprint for a sanitized message and language."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(language.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(message.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class LocalCache:
+    """Thread-safe LRU cache private to one process."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = dict(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedMemoryCache:
+    """Fixed-size hash table of fingerprint -> JSON result in shared memory.
+
+    The table is created by the master process before it forks its workers,
+    which inherit the mapping. Each key hashes to a bucket of
+    SHARED_CACHE_WAYS slots; a full bucket evicts its oldest entry.
+
+    Reads take no lock. Every slot carries a sequence number that writers make
+    odd while they modify the slot and even when done (a seqlock), so a reader
+    that sees an odd or changed sequence number treats the slot as a miss.
+    Writers serialize on one inter-process lock; a write that cannot take it
+    within SHARED_CACHE_LOCK_TIMEOUT is skipped, so a worker that died holding
+    it leaves the table read-only instead of blocking every writer.
+    """
+
+    def __init__(self, memory, lock, slots: int, slot_size: int):
+        self._memory = memory
+        self._buffer = memory.buf
+        self._lock = lock
+        self.slots = slots
+        self.slot_size = slot_size
+        self.max_payload = slot_size - _SLOT_HEADER.size
+        self.skipped_writes = 0
+
+    @classmethod
+    def create(cls, slots: int = SHARED_CACHE_SLOTS,
+               slot_size: int = SHARED_CACHE_SLOT_SIZE) -> "SharedMemoryCache":
+        """Allocate a new zeroed table. Raises ImportError or OSError if unavailable."""
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        slots = max(SHARED_CACHE_WAYS, slots - slots % SHARED_CACHE_WAYS)
+        size = _TABLE_HEADER.size + slots * slot_size
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        memory.buf[:size] = bytes(size)
+        return cls(memory, multiprocessing.Lock(), slots, slot_size)
+
+    def _offset(self, slot: int) -> int:
+        return _TABLE_HEADER.size + slot * self.slot_size
+
+    def _bucket(self, digest: bytes) -> range:
+        buckets = self.slots // SHARED_CACHE_WAYS
+        first = int.from_bytes(digest[:8], "little") % buckets * SHARED_CACHE_WAYS
+        return range(first, first + SHARED_CACHE_WAYS)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        digest = bytes.fromhex(key)
+        for slot in self._bucket(digest):
+            offset = self._offset(slot)
+            sequence, _, slot_key, length = _SLOT_HEADER.unpack_from(self._buffer, offset)
+            if sequence % 2 or slot_key != digest or length > self.max_payload:
+                continue
+            start = offset + _SLOT_HEADER.size
+            payload = bytes(self._buffer[start:start + length])
+            if _SLOT_HEADER.unpack_from(self._buffer, offset)[0] != sequence:
+                return None  # Overwritten while reading
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> bool:
+        """Store a result. Returns False if it is too large for a slot or the table is locked."""
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.max_payload:
+            return False
+        digest = bytes.fromhex(key)
+
+        if not self._lock.acquire(timeout=SHARED_CACHE_LOCK_TIMEOUT):
+            self.skipped_writes += 1
+            if self.skipped_writes == 1:
+                logger.warning(f"Shared cache lock held for over {SHARED_CACHE_LOCK_TIMEOUT}s, "
+                               f"skipping writes")
+            return False
+        try:
+            # Reuse the key's own slot, else an empty one, else the oldest
+            victim = None
+            victim_stamp = None
+            for slot in self._bucket(digest):
+                _, stamp, slot_key, _ = _SLOT_HEADER.unpack_from(self._buffer, self._offset(slot))
+                if slot_key == digest:
+                    victim = slot
+                    break
+                if victim_stamp is None or stamp < victim_stamp:
+                    victim, victim_stamp = slot, stamp
+
+            (counter,) = _TABLE_HEADER.unpack_from(self._buffer, 0)
+            _TABLE_HEADER.pack_into(self._buffer, 0, counter + 1)
+
+            offset = self._offset(victim)
+            sequence = _SLOT_HEADER.unpack_from(self._buffer, offset)[0]
+            # A writer that died mid-write left the sequence odd; start from the next even one
+            sequence += sequence % 2
+            struct.pack_into("<I", self._buffer, offset, sequence + 1)
+            start = offset + _SLOT_HEADER.size
+            self._buffer[start:start + len(payload)] = payload
+            _SLOT_HEADER.pack_into(self._buffer, offset, sequence + 1, counter + 1, digest,
+                                   len(payload))
+            struct.pack_into("<I", self._buffer, offset, sequence + 2)
+        finally:
+            self._lock.release()
+        return True
+
+    def close(self) -> None:
+        """Detach this process from the table."""
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """Detach and free the table. Only the creating process should call this."""
+        self.close()
+        self._memory.unlink()
+
+
+class TranslationCache:
+    """Tiered cache: the local LRU, then the shared table, then the external backend.
+
+    The local tier always answers first. When the backend fails or takes longer
+    than its timeout it is skipped for BACKEND_RETRY_INTERVAL seconds, so a slow
+    backend degrades to local caching instead of slowing every request.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.local = LocalCache(maxsize)
+        self.shared: Optional[SharedMemoryCache] = None
+        self.backend = None  # CacheBackend, see configure_backend()
+        self._backend_retry_at = 0.0
+        self.stats = {"local_hits": 0, "shared_hits": 0, "backend_hits": 0, "misses": 0,
+                      "backend_errors": 0}
+
+    def _call_backend(self, method, *args):
+        """Call a backend method, returning None and backing off if it fails or is slow."""
+        if self.backend is None or time.monotonic() < self._backend_retry_at:
+            return None
+        # Backends are imported only once one is configured
+        from app.cache_backends import CacheBackendError
+
+        started = time.monotonic()
+        try:
+            result = method(*args)
+        except (CacheBackendError, OSError, ValueError) as e:
+            self.stats["backend_errors"] += 1
+            self._backend_retry_at = time.monotonic() + BACKEND_RETRY_INTERVAL
+            logger.warning(f"Cache backend unavailable, using local cache for "
+                           f"{BACKEND_RETRY_INTERVAL}s: {e}")
+            return None
+        if time.monotonic() - started > self.backend.timeout:
+            self._backend_retry_at = time.monotonic() + BACKEND_RETRY_INTERVAL
+            logger.warning(f"Cache backend slower than {self.backend.timeout}s, using local cache")
+        return result
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several keys, asking the backend for all local misses in one call."""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                self.stats["local_hits"] += 1
+                found[key] = value
+                continue
+            if self.shared is not None:
+                value = self.shared.get(key)
+                if value is not None:
+                    self.stats["shared_hits"] += 1
+                    self.local.set(key, value)
+                    found[key] = value
+                    continue
+            missing.append(key)
+
+        if missing and self.backend is not None:
+            remote = self._call_backend(self.backend.get_many, missing) or {}
+            for key, value in remote.items():
+                self.stats["backend_hits"] += 1
+                self.local.set(key, value)
+                if self.shared is not None:
+                    self.shared.set(key, value)
+                found[key] = value
+            missing = [key for key in missing if key not in remote]
+
+        self.stats["misses"] += len(missing)
+        return found
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """Store several results in every tier, with one backend call."""
+        for key, value in items.items():
+            self.local.set(key, value)
+            if self.shared is not None:
+                self.shared.set(key, value)
+        if items and self.backend is not None:
+            self._call_backend(self.backend.set_many, items)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.set_many({key: value})
+
+    def clear(self) -> None:
+        """Empty the local tier (the shared tier and backend are left to expiry)."""
+        self.local.clear()
+
+
+# Cache used by the translator
+TRANSLATION_CACHE = TranslationCache()
+
+
+def enable_shared_cache(slots: int = SHARED_CACHE_SLOTS,
+                        slot_size: int = SHARED_CACHE_SLOT_SIZE) -> bool:
+    """Attach a new shared-memory tier to the translation cache.
+
+    Call this in the master process before forking workers. If shared memory is
+    unavailable the cache keeps working per process and False is returned.
+    """
+    try:
+        TRANSLATION_CACHE.shared = SharedMemoryCache.create(slots, slot_size)
+    except (ImportError, OSError) as e:
+        logger.warning(f"Shared translation cache unavailable, using per-process caching: {e}")
+        return False
+    logger.info(f"Shared translation cache enabled ({slots} slots of {slot_size} bytes)")
+    return True
+
+
+def disable_shared_cache() -> None:
+    """Detach and free the shared tier created by enable_shared_cache()."""
+    shared, TRANSLATION_CACHE.shared = TRANSLATION_CACHE.shared, None
+    if shared is not None:
+        shared.unlink()
+
+
+def configure_backend(url: Optional[str]):
+    """Attach the external backend described by a URL (None detaches it) and return it."""
+    from app.cache_backends import backend_from_url
+
+    if TRANSLATION_CACHE.backend is not None:
+        TRANSLATION_CACHE.backend.close()
+    TRANSLATION_CACHE.backend = backend_from_url(url) if url else None
+    if url:
+        # Log only the scheme so credentials in the URL stay out of the logs
+        logger.info(f"Translation cache backend: {url.split(':', 1)[0]}")
+    return TRANSLATION_CACHE.backend
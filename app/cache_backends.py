@@ -0,0 +1,257 @@
+"""
+Translation Cache Backends
+
+This module provides external stores that let several nodes share translation
+results: an in-process memory store, an on-disk store and a client for servers
+speaking the Redis protocol (RESP). Every backend supports batch get/set so a
+batch of fingerprints is resolved in one round trip.
+"""
+import os
+import json
+import time
+import socket
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Seconds a backend call may take before the cache stops waiting on it
+BACKEND_TIMEOUT = 0.05
+
+# Seconds cached results are kept by backends that support expiry
+BACKEND_TTL = 24 * 60 * 60
+
+# Prefix for keys stored in shared key-value servers
+KEY_PREFIX = "emt:"
+
+
+class CacheBackendError(Exception):
+    """Raised when a cache backend cannot complete a request."""
+
+
+class CacheBackend:
+    """Interface for external translation result stores.
+
+    Keys are message fingerprints and values are JSON-serializable result
+    dictionaries. Implementations raise CacheBackendError (or OSError) on
+    failure; the translation cache treats failures as misses.
+    """
+
+    timeout = BACKEND_TIMEOUT
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the stored values for the keys that are present."""
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """Store several values at once."""
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.set_many({key: value})
+
+    def close(self) -> None:
+        """Release any connections or handles."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process stand-in for an external store, used for development and tests."""
+
+    def __init__(self):
+        self._entries: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        with self._lock:
+            found = {key: self._entries[key] for key in keys if key in self._entries}
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def set_many(self, items):
+        encoded = {key: json.dumps(value).encode("utf-8") for key, value in items.items()}
+        with self._lock:
+            self._entries.update(encoded)
+
+
+class DiskBackend(CacheBackend):
+    """Stores each result as a JSON file, e.g. on a volume shared between nodes."""
+
+    def __init__(self, directory: str, ttl: int = BACKEND_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys are hex digests; two-character subdirectories keep directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get_many(self, keys):
+        found = {}
+        now = time.time()
+        for key in keys:
+            path = self._path(key)
+            try:
+                if self.ttl and now - os.path.getmtime(path) > self.ttl:
+                    continue
+                with open(path, "rb") as f:
+                    found[key] = json.loads(f.read())
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                continue  # Partially written by an older version; treat as a miss
+        return found
+
+    def set_many(self, items):
+        for key, value in items.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename so readers never see partial files
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(json.dumps(value).encode("utf-8"))
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+
+class RedisBackend(CacheBackend):
+    """Minimal client for servers speaking the Redis protocol (RESP2).
+
+    Uses MGET for batch reads and a pipeline of SET ... EX commands for batch
+    writes. One connection is kept per process and reopened after fork.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = BACKEND_TIMEOUT,
+                 ttl: int = BACKEND_TTL, prefix: str = KEY_PREFIX):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.ttl = ttl
+        self.prefix = prefix
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise CacheBackendError("Connection closed by cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            raise CacheBackendError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise CacheBackendError("Connection closed by cache server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from cache server: {line[:20]!r}")
+
+    def _connect(self) -> None:
+        self.close()
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        self._pid = os.getpid()
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._pipeline(setup)
+
+    def _pipeline(self, commands) -> list:
+        self._sock.sendall(b"".join(self._encode(*command) for command in commands))
+        return [self._read_reply() for _ in commands]
+
+    def execute(self, *commands) -> list:
+        """Send commands in one round trip and return their replies."""
+        with self._lock:
+            try:
+                # Connections are not shared with forked children
+                if self._sock is None or self._pid != os.getpid():
+                    self._connect()
+                return self._pipeline(commands)
+            except (OSError, ValueError, CacheBackendError):
+                self.close()
+                raise
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        (values,) = self.execute(("MGET", *(self.prefix + key for key in keys)))
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items):
+        if not items:
+            return
+        commands = [
+            ("SET", self.prefix + key, json.dumps(value), "EX", self.ttl) if self.ttl
+            else ("SET", self.prefix + key, json.dumps(value))
+            for key, value in items.items()
+        ]
+        self.execute(*commands)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """Create a backend from a URL.
+
+    Supported forms are ``memory://``, ``disk:///path/to/dir`` and
+    ``redis://[:password@]host[:port][/db]``. A ``timeout`` query parameter
+    sets the per-call timeout in seconds, e.g. ``redis://cache:6379?timeout=0.1``.
+    """
+    parsed = urlparse(url)
+    timeout = float(parse_qs(parsed.query).get("timeout", [BACKEND_TIMEOUT])[0])
+    if parsed.scheme == "memory":
+        backend = MemoryBackend()
+    elif parsed.scheme == "disk":
+        backend = DiskBackend(unquote(parsed.netloc + parsed.path))
+    elif parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        backend = RedisBackend(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+    else:
+        raise ValueError(f"Unsupported cache backend URL: {url}")
+    backend.timeout = timeout
+    return backend
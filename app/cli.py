@@ -0,0 +1,104 @@
+"""
+Command Line Interface
+
+The `error-translator` command:
+
+    error-translator translate "NameError: name 'x' is not defined"
+    error-translator translate --file build.log --json
+    make 2>&1 | error-translator translate --language python
+    error-translator serve --prod --port 5001
+
+`translate` explains one error message, given as an argument, read from a
+file or from stdin (the whole input is one message, so tracebacks keep
+their lines). It imports only the translator and the pattern data, never
+Flask, so it starts fast enough for shell loops and git hooks; the import
+time is held to a budget by tests/integration/test_cli.py. `serve` runs the web
+application with the options of app.py.
+"""
+import sys
+import json
+import argparse
+
+
+def read_message(args) -> str:
+    """Return the message to translate from the argument, the file or stdin."""
+    if args.file:
+        if args.file == "-":
+            return sys.stdin.read()
+        with open(args.file, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    if args.message not in (None, "-"):
+        return args.message
+    if args.message is None and sys.stdin.isatty():
+        raise ValueError("No error message: pass it as an argument, with --file or on stdin")
+    return sys.stdin.read()
+
+
+def format_text(result) -> str:
+    """Render a translation for a terminal."""
+    lines = [f"{result['title']} ({result['language']})", "", result["explanation"]]
+    if result.get("solution"):
+        lines += ["", f"Solution: {result['solution']}"]
+    if result.get("code_example"):
+        lines += ["", "Example:", result["code_example"].strip("\n")]
+    return "\n".join(lines)
+
+
+def translate_command(args, extra) -> int:
+    try:
+        message = read_message(args)
+        if not message.strip():
+            raise ValueError("The error message is empty")
+    except (OSError, ValueError) as e:
+        print(f"error-translator: {e}", file=sys.stderr)
+        return 2
+
+    from app.translator import translate_error
+
+    result = translate_error(message.strip("\n"), args.language)
+    if args.json:
+        output = json.dumps(result, ensure_ascii=False, indent=2 if args.pretty else None)
+        sys.stdout.write(output + "\n")
+    else:
+        sys.stdout.write(format_text(result) + "\n")
+    return 0
+
+
+def serve_command(args, extra) -> int:
+    from app.web import main
+
+    main(extra, prog="error-translator serve")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Run an error-translator subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="error-translator",
+        description="Translate error messages into beginner-friendly explanations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    translate_parser = subparsers.add_parser("translate", help="Explain an error message")
+    translate_parser.add_argument("message", nargs="?",
+                                  help="The error message (default: read stdin)")
+    translate_parser.add_argument("-f", "--file",
+                                  help="Read the error message from a file ('-' for stdin)")
+    translate_parser.add_argument("-l", "--language", default="auto",
+                                  help="Language of the message (default: auto-detect)")
+    translate_parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    translate_parser.add_argument("--pretty", action="store_true", help="Indent the JSON output")
+    translate_parser.set_defaults(run=translate_command)
+
+    # Its options, including --help, are parsed by app.web.main
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the web application (options of app.py)", add_help=False)
+    serve_parser.set_defaults(run=serve_command)
+
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.run is not serve_command:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.run(args, extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Local Daemon
+
+Serves translations over a Unix domain socket to callers on the same machine,
+such as build scripts that translate many messages per job and cannot afford
+to start Python and load the patterns on every call. The daemon loads and
+warms the registry once and keeps its caches between calls.
+
+Requests and responses are length-prefixed msgpack frames (see app.wire).
+A request is a map with an "op" and its arguments:
+
+    {"id": 1, "op": "translate", "error_message": "...", "language": "auto"}
+    {"id": 2, "op": "batch", "errors": [{"error_message": "...", "language": "auto"}]}
+    {"id": 3, "op": "ping"}
+
+and is answered with {"id": 1, "result": {...}} or
+{"id": 1, "error": {"code": 400, "description": "..."}}, the codes matching
+those of the HTTP API. A request may also carry "timeout" (seconds, like
+X-Request-Timeout) and "api_key" (a tenant's key, like X-API-Key).
+
+Clients may pipeline: write many requests before reading. Each connection is
+served by one thread that answers its requests in order, and responses to
+requests that arrived together are written back together.
+"""
+import os
+import time
+import signal
+import socket
+import logging
+import threading
+import socketserver
+from typing import Any, Dict
+
+from app.admission import ADMISSION, Overloaded
+from app.data.tenants import TENANTS, UnknownTenant
+from app.deadline import DEFAULT_REQUEST_BUDGET, Deadline
+from app.translator import translate_error, translate_errors
+from app.wire import FrameError, FrameReader, encode_frame
+
+logger = logging.getLogger(__name__)
+
+# Most error messages accepted in one batch request, as over HTTP
+MAX_BATCH_SIZE = 50
+
+# Socket file permissions: only the daemon's user may connect
+SOCKET_MODE = 0o600
+
+
+class DaemonRequestError(Exception):
+    """Raised for a request that cannot be served, with the matching HTTP status code."""
+
+    def __init__(self, code: int, description: str):
+        super().__init__(description)
+        self.code = code
+
+
+def _deadline(request: Dict[str, Any]) -> Deadline:
+    """Return the client's deadline from the request's timeout, or one that never expires."""
+    timeout = request.get("timeout")
+    if timeout is None:
+        return Deadline()
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+        raise DaemonRequestError(400, "'timeout' must be a number of seconds")
+    return Deadline.after(timeout)
+
+
+def _registry(request: Dict[str, Any]):
+    """Return the registry of the tenant owning the request's API key, or None if shared."""
+    api_key = request.get("api_key")
+    if api_key is None:
+        return None
+    try:
+        return TENANTS.registry(TENANTS.tenant_for_key(str(api_key)))
+    except UnknownTenant as e:
+        raise DaemonRequestError(401, str(e))
+
+
+def _translate(request, deadline):
+    return translate_error(request.get("error_message", ""), request.get("language", "auto"),
+                           deadline=deadline, registry=_registry(request))
+
+
+def _translate_batch(request, deadline):
+    errors = request.get("errors")
+    if not isinstance(errors, list) or not all(isinstance(item, dict) for item in errors):
+        raise DaemonRequestError(400, "'errors' must be a list of maps")
+    if len(errors) > MAX_BATCH_SIZE:
+        raise DaemonRequestError(
+            400, f"At most {MAX_BATCH_SIZE} errors can be translated per request")
+    results = translate_errors(
+        [(item.get("error_message", ""), item.get("language", "auto")) for item in errors],
+        deadline=deadline,
+        registry=_registry(request),
+    )
+    return {"results": results}
+
+
+# Operations that translate, and so go through admission control
+OPERATIONS = {
+    "translate": _translate,
+    "batch": _translate_batch,
+}
+
+
+def handle_request(request: Any) -> Dict[str, Any]:
+    """Serve one decoded request and return the response to send back."""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict):
+            raise DaemonRequestError(400, "Request must be a map")
+        op = request.get("op", "translate")
+        if op == "ping":
+            return {"id": request_id, "result": {"pid": os.getpid()}}
+        operation = OPERATIONS.get(op)
+        if operation is None:
+            raise DaemonRequestError(400, f"Unknown op {op!r}")
+        client_deadline = _deadline(request)
+        with ADMISSION.admit(client_deadline):
+            deadline = Deadline.after(DEFAULT_REQUEST_BUDGET).earliest(client_deadline)
+            result = operation(request, deadline)
+    except DaemonRequestError as e:
+        return {"id": request_id, "error": {"code": e.code, "description": str(e)}}
+    except Overloaded as e:
+        error = {"code": 503, "description": str(e), "retry_after": e.retry_after}
+        return {"id": request_id, "error": error}
+    except Exception as e:
+        logger.error(f"Unhandled daemon error: {e}", exc_info=True)
+        error = {"code": 500, "description": "An unexpected error occurred"}
+        return {"id": request_id, "error": error}
+    return {"id": request_id, "result": result}
+
+
+class DaemonHandler(socketserver.BaseRequestHandler):
+    """Answers the requests of one connection in order until the client disconnects."""
+
+    def handle(self) -> None:
+        reader = FrameReader(self.request)
+        pending = bytearray()
+        while True:
+            try:
+                request = reader.read()
+            except EOFError:
+                break
+            except FrameError as e:
+                # The stream cannot be resynchronised: report the error and hang up
+                logger.warning(f"Closing daemon connection after a bad frame: {e}")
+                pending += encode_frame({"id": None, "error": {"code": 400, "description": str(e)}})
+                break
+            pending += encode_frame(handle_request(request))
+            # Answer a pipelined burst in one write once its last request is served.
+            # A bad header next is reported by read(), after the answers queued so far.
+            try:
+                burst_continues = reader.has_frame()
+            except FrameError:
+                burst_continues = True
+            if not burst_continues:
+                self.request.sendall(pending)
+                pending.clear()
+        if pending:
+            self.request.sendall(pending)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running one thread per connection."""
+
+    daemon_threads = True
+    bound = False
+
+    def server_bind(self) -> None:
+        # A socket file left by a daemon that died is replaced; a live one is not
+        if os.path.exists(self.server_address):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.server_address)
+            except OSError:
+                os.unlink(self.server_address)
+            else:
+                raise OSError(f"A daemon is already listening on {self.server_address}")
+            finally:
+                probe.close()
+        # The socket file is created by bind, so the umask decides its mode from the start;
+        # chmod afterwards would leave it open to other users for a moment
+        old_umask = os.umask(0o777 & ~SOCKET_MODE)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+        self.bound = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Only remove the socket file this server created, never a live daemon's
+        if self.bound:
+            self.bound = False
+            try:
+                os.unlink(self.server_address)
+            except FileNotFoundError:
+                pass
+
+
+def serve_daemon(path: str, shards: int = 0, shard_by: str = "hash") -> None:
+    """Warm the translator and serve requests on a Unix socket until SIGTERM or Ctrl-C."""
+    from app.server import warm_up
+
+    if shards:
+        from app.sharding import enable_sharding
+
+        enable_sharding(shards, shard_by)
+
+    started = time.monotonic()
+    warm_up()
+    server = DaemonServer(path, DaemonHandler)
+    logger.info(f"Daemon listening on {path} (warmed up in {time.monotonic() - started:.2f}s)")
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
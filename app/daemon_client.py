@@ -0,0 +1,170 @@
+"""
+Daemon Client
+
+A small client for the local daemon (see app.daemon), and a command line to
+translate messages through it from shell scripts:
+
+    python -m app.daemon_client "NameError: name 'x' is not defined"
+    some-build-step 2>&1 | python -m app.daemon_client --language python
+
+Messages given as arguments, or read one per line from stdin, are sent
+pipelined on one connection and each result is printed as a JSON line.
+This module imports only the standard library and app.wire, so it starts
+in a few tens of milliseconds.
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.wire import FrameError, FrameReader, encode_frame
+
+# Socket the daemon listens on unless told otherwise
+DEFAULT_SOCKET = os.environ.get("TRANSLATOR_SOCKET") or os.path.join(
+    tempfile.gettempdir(), f"error-translator-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+# Seconds the client waits on the daemon
+CLIENT_TIMEOUT = 10.0
+
+# Requests, and bytes of them, written before their responses are read. Kept
+# below the socket buffers so neither side blocks writing while the other does
+PIPELINE_WINDOW = 256
+PIPELINE_BYTES = 64 * 1024
+
+
+class DaemonError(Exception):
+    """Raised when the daemon answers a request with an error."""
+
+    def __init__(self, code: int, description: str):
+        super().__init__(f"{code}: {description}")
+        self.code = code
+        self.description = description
+
+
+class DaemonClient:
+    """A connection to the local daemon."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: Optional[float] = CLIENT_TIMEOUT):
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._reader = FrameReader(self._sock)
+        self._next_id = 0
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def call_many(self, requests: Iterable[Dict[str, Any]],
+                  window: int = PIPELINE_WINDOW) -> List[Any]:
+        """Send requests pipelined and return their results in order.
+
+        Up to `window` requests (and PIPELINE_BYTES of them) are in flight at
+        once. A request the daemon rejected is returned as a DaemonError
+        instead of a result.
+        """
+        results: List[Any] = []
+        in_flight: List[int] = []
+        batch = bytearray()
+        for request in requests:
+            self._next_id += 1
+            in_flight.append(self._next_id)
+            batch += encode_frame(dict(request, id=self._next_id))
+            if len(in_flight) >= window or len(batch) >= PIPELINE_BYTES:
+                self._sock.sendall(batch)
+                batch.clear()
+                results.extend(self._receive(in_flight))
+                in_flight = []
+        if batch:
+            self._sock.sendall(batch)
+        results.extend(self._receive(in_flight))
+        return results
+
+    def _receive(self, request_ids: List[int]) -> List[Any]:
+        results = []
+        for request_id in request_ids:
+            response = self._reader.read()
+            if not isinstance(response, dict) or response.get("id") != request_id:
+                error = response.get("error") if isinstance(response, dict) else None
+                if error:
+                    raise DaemonError(error.get("code", 500), error.get("description", ""))
+                raise DaemonError(500, f"Response out of order: expected id {request_id}")
+            if "error" in response:
+                error = response["error"]
+                results.append(DaemonError(error.get("code", 500), error.get("description", "")))
+            else:
+                results.append(response.get("result"))
+        return results
+
+    def call(self, request: Dict[str, Any]) -> Any:
+        """Send one request and return its result.
+
+        Raises:
+            DaemonError: the daemon rejected the request
+        """
+        result = self.call_many([request])[0]
+        if isinstance(result, DaemonError):
+            raise result
+        return result
+
+    def translate(self, error_message: str, language: str = "auto", **options) -> Dict[str, Any]:
+        """Translate one error message."""
+        return self.call(dict(options, op="translate", error_message=error_message,
+                              language=language))
+
+    def translate_many(self, messages: Iterable[Tuple[str, str]], **options) -> List[Any]:
+        """Translate (error_message, language) pairs, pipelined on this connection."""
+        return self.call_many(dict(options, op="translate", error_message=error_message,
+                                   language=language)
+                              for error_message, language in messages)
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call({"op": "ping"})
+
+
+def main(argv=None) -> int:
+    """Translate messages through the daemon and print one JSON line per result."""
+    parser = argparse.ArgumentParser(
+        description="Translate error messages through the local daemon")
+    parser.add_argument("messages", nargs="*",
+                        help="Error messages (default: one per line from stdin)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help="Daemon socket (default: %(default)s)")
+    parser.add_argument("--language", default="auto",
+                        help="Language of the messages (default: auto)")
+    parser.add_argument("--api-key", default=None, help="Tenant API key")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds the daemon may spend per message")
+    args = parser.parse_args(argv)
+
+    messages = args.messages or [line.rstrip("\n") for line in sys.stdin if line.strip()]
+    options = {key: value for key, value in (("api_key", args.api_key), ("timeout", args.timeout))
+               if value is not None}
+    try:
+        with DaemonClient(args.socket) as client:
+            pairs = ((message, args.language) for message in messages)
+            results = client.translate_many(pairs, **options)
+    except (OSError, EOFError, FrameError, DaemonError) as e:
+        print(f"Translator daemon at {args.socket} failed: {e}", file=sys.stderr)
+        return 2
+
+    status = 0
+    for result in results:
+        if isinstance(result, DaemonError):
+            result = {"error": {"code": result.code, "description": result.description}}
+            status = 1
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
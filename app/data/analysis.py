@@ -0,0 +1,273 @@
+"""Pattern Analysis Module
+
+This module finds patterns that can never be the answer to any message:
+exact duplicates of an earlier pattern, and patterns shadowed by earlier ones
+that match every message they match.
+
+Whether one regex covers another cannot be decided in general, so shadowing
+is found by probing. Messages are generated from each pattern's regex
+(every alternative, optional parts present and absent, and word,
+punctuation and whitespace characters wherever a class or wildcard allows
+them), and the pattern's own related errors plus any caller-supplied corpus
+are added. A pattern is reported as shadowed only if every probe it matches
+is won by another pattern in the order the translator tries them.
+"""
+import re
+import json
+import hashlib
+import itertools
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import re._parser as sre_parse
+    from re._constants import (
+        ANY, ASSERT, ASSERT_NOT, AT, BRANCH, CATEGORY, GROUPREF, IN, LITERAL, MAX_REPEAT,
+        MIN_REPEAT, NEGATE, NOT_LITERAL, RANGE, SUBPATTERN,
+    )
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import (
+        ANY, ASSERT, ASSERT_NOT, AT, BRANCH, CATEGORY, GROUPREF, IN, LITERAL, MAX_REPEAT,
+        MIN_REPEAT, NEGATE, NOT_LITERAL, RANGE, SUBPATTERN,
+    )
+
+from app.data.patterns.base_pattern import ErrorPattern
+from app.data.registry import PatternRegistry, exception_types
+
+logger = logging.getLogger(__name__)
+
+# Kinds of dead pattern
+DUPLICATE = "duplicate"
+SHADOWED = "shadowed"
+
+# Characters tried, in order, for classes and wildcards under each probe style
+PROBE_STYLES = {
+    "word": "xaZ0_",
+    "punct": "-'.:/@#",
+    "space": " \t",
+}
+
+# Characters tried when none of the style's characters fit a class
+FALLBACK_CHARS = ("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+                  " -_.:'\"/()[]{}<>=+*&%$#@!~`,;?|\\\n")
+
+# Most probes generated per pattern
+MAX_PROBES = 48
+
+# Part of the digest of prebuilt results: bump it when a change to the
+# analysis can change which patterns are found dead
+ANALYSIS_VERSION = 1
+
+_CATEGORY_TESTS = {
+    "CATEGORY_DIGIT": str.isdigit,
+    "CATEGORY_NOT_DIGIT": lambda c: not c.isdigit(),
+    "CATEGORY_SPACE": str.isspace,
+    "CATEGORY_NOT_SPACE": lambda c: not c.isspace(),
+    "CATEGORY_WORD": lambda c: c.isalnum() or c == "_",
+    "CATEGORY_NOT_WORD": lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+def _in_class(char: str, items, ignore_case: bool) -> bool:
+    """Return whether a character belongs to a parsed character class."""
+    negated = False
+    found = False
+    candidates = {char, char.lower(), char.upper()} if ignore_case else {char}
+    for op, value in items:
+        if op is NEGATE:
+            negated = True
+        elif op is LITERAL:
+            found = found or chr(value) in candidates
+        elif op is RANGE:
+            found = found or any(value[0] <= ord(c) <= value[1] for c in candidates)
+        elif op is CATEGORY:
+            test = _CATEGORY_TESTS.get(str(value))
+            found = found or bool(test and test(char))
+    return found != negated
+
+
+class _Generator:
+    """Builds one message matching a parsed regex under a set of choices."""
+
+    def __init__(self, style: str, optional: bool, branch: int, ignore_case: bool):
+        self.chars = PROBE_STYLES[style] + FALLBACK_CHARS
+        self.optional = optional
+        self.branch = branch
+        self.ignore_case = ignore_case
+        self.groups: Dict[int, str] = {}
+
+    def pick(self, test) -> str:
+        for char in self.chars:
+            if test(char):
+                return char
+        raise ValueError("No character fits")
+
+    def build(self, parsed) -> str:
+        out = []
+        for op, value in parsed:
+            if op is LITERAL:
+                out.append(chr(value))
+            elif op is NOT_LITERAL:
+                out.append(self.pick(lambda c: c != chr(value)))
+            elif op is ANY:
+                out.append(self.pick(lambda c: c != "\n"))
+            elif op is IN:
+                out.append(self.pick(lambda c: _in_class(c, value, self.ignore_case)))
+            elif op is BRANCH:
+                alternatives = value[1]
+                out.append(self.build(alternatives[self.branch % len(alternatives)]))
+            elif op is SUBPATTERN:
+                group, body = value[0], value[-1]
+                text = self.build(body)
+                if group:
+                    self.groups[group] = text
+                out.append(text)
+            elif op in (MAX_REPEAT, MIN_REPEAT):
+                low, high, body = value
+                count = max(low, 1) if self.optional else low
+                if self.optional and high > 1:
+                    count = max(count, min(high, 2))
+                out.append("".join(self.build(body) for _ in range(count)))
+            elif op is GROUPREF:
+                out.append(self.groups.get(value, ""))
+            elif op in (AT, ASSERT, ASSERT_NOT):
+                # Anchors and lookarounds add no text; probes that break them are filtered out
+                continue
+            else:
+                raise ValueError(f"Unsupported regex construct {op}")
+        return "".join(out)
+
+
+def _max_branches(parsed) -> int:
+    widest = 1
+    for op, value in parsed:
+        if op is BRANCH:
+            widest = max(widest, len(value[1]), *(_max_branches(alt) for alt in value[1]))
+        elif op is SUBPATTERN:
+            widest = max(widest, _max_branches(value[-1]))
+        elif op in (MAX_REPEAT, MIN_REPEAT):
+            widest = max(widest, _max_branches(value[2]))
+    return widest
+
+
+def generate_probes(pattern: ErrorPattern) -> List[str]:
+    """Return distinct messages generated from a pattern's regex that the pattern matches."""
+    try:
+        parsed = sre_parse.parse(pattern.source, pattern.flags)
+    except re.error:
+        return []
+    ignore_case = bool(pattern.flags & re.IGNORECASE)
+    probes = []
+    variants = itertools.product(range(_max_branches(parsed)), PROBE_STYLES, (False, True))
+    for branch, style, optional in variants:
+        try:
+            probe = _Generator(style, optional, branch, ignore_case).build(parsed)
+        except ValueError:
+            continue
+        if probe not in probes and pattern.search(probe):
+            probes.append(probe)
+            if len(probes) >= MAX_PROBES:
+                break
+    return probes
+
+
+def probe_corpus(pattern: ErrorPattern, corpus: Sequence[str] = ()) -> List[str]:
+    """Return the probes for a pattern: generated ones plus matching related and corpus messages."""
+    probes = generate_probes(pattern)
+    for text in itertools.chain(pattern.related_errors, corpus):
+        if isinstance(text, str) and text not in probes and pattern.search(text):
+            probes.append(text)
+    return probes
+
+
+def _winner(registry: PatternRegistry, language: str, message: str, dead) -> Optional[ErrorPattern]:
+    """Return the pattern the translator would answer a message with, ignoring dead patterns."""
+    folded = message.casefold()
+    for pattern in registry.candidates(language, exception_types(message)):
+        if pattern.id not in dead and pattern.search(message, folded):
+            return pattern
+    return None
+
+
+def find_dead_patterns(registry: PatternRegistry, corpus: Iterable[str] = (),
+                       languages: Optional[Iterable[str]] = None) -> List[Dict[str, object]]:
+    """Return the patterns in a registry that can never win a match.
+
+    Patterns are examined in priority order and each dead one is set aside
+    before the next is examined, so a pattern is never reported as shadowed
+    only by patterns that are themselves dead.
+
+    Args:
+        registry: the patterns to examine
+        corpus: real messages to probe with in addition to the generated ones
+        languages: the languages to examine (default: all)
+
+    Returns:
+        One dict per dead pattern with its id, language, kind (duplicate or
+        shadowed), the ids of the patterns that win instead ("by") and the
+        number of probes tried.
+    """
+    corpus = list(corpus)
+    dead: Dict[str, Dict[str, object]] = {}
+    for language in languages or registry.languages():
+        first_with_source: Dict[Tuple[str, int], str] = {}
+        for pattern in registry.patterns(language):
+            key = (pattern.source, pattern.flags)
+            if key in first_with_source:
+                dead[pattern.id] = {"id": pattern.id, "language": language, "kind": DUPLICATE,
+                                    "regex": pattern.source, "by": [first_with_source[key]],
+                                    "probes": 0}
+                continue
+            first_with_source[key] = pattern.id
+
+            probes = probe_corpus(pattern, corpus)
+            if not probes:
+                logger.debug(f"No probes generated for {pattern.id}, assuming it is live")
+                continue
+            winners = []
+            for probe in probes:
+                winner = _winner(registry, language, probe, dead)
+                if winner is pattern:
+                    break
+                if winner.id not in winners:
+                    winners.append(winner.id)
+            else:
+                dead[pattern.id] = {"id": pattern.id, "language": language, "kind": SHADOWED,
+                                    "regex": pattern.source, "by": winners, "probes": len(probes)}
+    return list(dead.values())
+
+
+def registry_digest(registry: PatternRegistry) -> str:
+    """Return a digest of everything find_dead_patterns reads from a registry's patterns."""
+    digest = hashlib.sha256(f"analysis {ANALYSIS_VERSION}".encode())
+    for language in registry.languages():
+        digest.update(f"\0language {language}".encode())
+        for pattern in registry.patterns(language):
+            fields = f"\0{pattern.id}\0{pattern.flags}\0{pattern.source}\0"
+            digest.update(fields.encode("utf-8", "surrogatepass"))
+            # The compressed display text, which holds the related errors used as probes
+            digest.update(pattern._cold)
+    return digest.hexdigest()
+
+
+def save_prebuilt_dead_patterns(registry: PatternRegistry, path: str) -> List[Dict[str, object]]:
+    """Find the dead patterns of a whole registry and save them for loading at startup."""
+    dead = find_dead_patterns(registry)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"digest": registry_digest(registry), "dead_patterns": dead}, f, indent=2)
+        f.write("\n")
+    return dead
+
+
+def load_prebuilt_dead_patterns(registry: PatternRegistry,
+                                path: str) -> Optional[List[Dict[str, object]]]:
+    """Return the saved dead patterns if they were found for exactly these patterns, else None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(saved, dict) or saved.get("digest") != registry_digest(registry):
+        return None
+    return saved.get("dead_patterns")
@@ -2,48 +2,124 @@
 
 This module imports and aggregates error patterns from all language-specific modules.
 """
+import os
+import sys
 import logging
-from typing import List, Dict
+import importlib
+from typing import List, Dict, Tuple
+
+from app.data.packs import BUILTIN_PACKS, GENERAL
+from app.data.patterns.base_pattern import ErrorPattern
+from app.data.registry import PatternRegistry
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Define supported languages
-SUPPORTED_LANGUAGES = [
-    "python",
-    "javascript",
-    "java",
-    "ruby",
-    "html",
-    "css"
-]
+# Languages of the built-in pattern packs; packs installed as plugins are
+# listed by app.data.packs.LANGUAGE_PACKS and loaded when first needed
+SUPPORTED_LANGUAGES = [pack.language for pack in BUILTIN_PACKS if pack.language != GENERAL]
 
 # Type definition for patterns
-Pattern = Dict[str, str]
-PatternList = List[Pattern]
+PatternList = Tuple[ErrorPattern, ...]
+
+# Compiled patterns for every language, including "general"
+REGISTRY = PatternRegistry()
 
 # Initialize pattern collections
-language_patterns: Dict[str, PatternList] = {lang: [] for lang in SUPPORTED_LANGUAGES}
-ALL_PATTERNS: PatternList = []
+language_patterns: Dict[str, PatternList] = {lang: () for lang in SUPPORTED_LANGUAGES}
+ALL_PATTERNS: List[ErrorPattern] = []
+
+
+def release_source_module(name: str) -> None:
+    """Forget an imported pattern module and its submodules so their dictionaries can be freed.
+
+    The lists are not emptied: importing the module again, as a pattern pack
+    or script may, rebuilds them from source.
+    """
+    for module_name in [module_name for module_name in sys.modules
+                        if module_name == name or module_name.startswith(name + ".")]:
+        del sys.modules[module_name]
+    parent, _, attribute = name.rpartition(".")
+    vars(sys.modules[parent]).pop(attribute, None)
+
 
 def import_language_patterns(language: str) -> None:
-    """Import patterns for a specific language."""
+    """Import patterns for a specific language and compile them into the registry.
+
+    The registry builds its own compact records, after which the source module
+    is released so its dictionaries do not stay in memory beside them.
+    """
     try:
-        module = __import__(f"app.data.patterns.{language}", fromlist=["PATTERNS"])
-        language_patterns[language] = module.PATTERNS
-        ALL_PATTERNS.extend(module.PATTERNS)
-        logger.info(f"Loaded {len(module.PATTERNS)} patterns for {language}")
+        module_name = f"app.data.patterns.{language}"
+        compiled = REGISTRY.add_language(language, importlib.import_module(module_name).PATTERNS)
+        release_source_module(module_name)
+        if language in language_patterns:
+            language_patterns[language] = compiled
+            ALL_PATTERNS.extend(compiled)
+        logger.info(f"Loaded {len(compiled)} patterns for {language}")
     except ImportError as e:
         logger.warning(f"Could not import {language} error patterns: {e}")
 
-# Import patterns for all supported languages
-for language in SUPPORTED_LANGUAGES:
+
+# Import patterns for all supported languages, plus the general patterns that
+# apply to every language and are not part of SUPPORTED_LANGUAGES
+for language in SUPPORTED_LANGUAGES + ["general"]:
     import_language_patterns(language)
 
-# Print pattern counts for debugging
+# Patterns contributed to the SQLite pattern store follow the module patterns
+if os.environ.get("PATTERN_DB"):
+    from app.data.store import configure_store
+
+    configure_store(os.environ["PATTERN_DB"], REGISTRY)
+
+# Set aside duplicates and patterns shadowed by earlier ones: they can never
+# win a match and only cost time (PRUNE_DEAD_PATTERNS=0 keeps them)
+DEAD_PATTERNS = []
+
+# Dead patterns of the shipped packs, found ahead of time by
+# `scripts/analyze_patterns.py --prebuild` so startup skips the probing
+PREBUILT_DEAD_PATTERNS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                      "dead_patterns.json")
+
+
+def prune_dead_patterns(languages=None) -> List[dict]:
+    """Exclude the dead patterns of some languages (default: all), recorded in DEAD_PATTERNS."""
+    if os.environ.get("PRUNE_DEAD_PATTERNS", "1") == "0":
+        return []
+    from app.data.analysis import find_dead_patterns, load_prebuilt_dead_patterns
+
+    # The prebuilt result is used only if it was found for exactly these patterns
+    dead = None
+    if languages is None:
+        dead = load_prebuilt_dead_patterns(REGISTRY, PREBUILT_DEAD_PATTERNS)
+    if dead is None:
+        dead = find_dead_patterns(REGISTRY, languages=languages)
+    if REGISTRY.exclude(issue["id"] for issue in dead):
+        DEAD_PATTERNS.extend(dead)
+        logger.info(f"Excluded {len(dead)} patterns that can never match first "
+                    f"(see scripts/analyze_patterns.py)")
+    return dead
+
+
+prune_dead_patterns()
+
+for language in language_patterns:
+    language_patterns[language] = REGISTRY.patterns(language)
+ALL_PATTERNS[:] = [pattern for patterns in language_patterns.values() for pattern in patterns]
+
+# Per-language pattern lists used by the translator
+PYTHON_PATTERNS: PatternList = REGISTRY.patterns("python")
+JAVASCRIPT_PATTERNS: PatternList = REGISTRY.patterns("javascript")
+JAVA_PATTERNS: PatternList = REGISTRY.patterns("java")
+RUBY_PATTERNS: PatternList = REGISTRY.patterns("ruby")
+HTML_PATTERNS: PatternList = REGISTRY.patterns("html")
+CSS_PATTERNS: PatternList = REGISTRY.patterns("css")
+GENERAL_PATTERNS: PatternList = REGISTRY.patterns("general")
+
+# Log pattern counts for debugging (on stderr, so command line output stays clean)
 for lang in SUPPORTED_LANGUAGES:
-    print(f"{lang.capitalize()} patterns: {len(language_patterns[lang])}")
-print(f"Total patterns: {len(ALL_PATTERNS)}")
+    logger.debug(f"{lang.capitalize()} patterns: {len(language_patterns[lang])}")
+logger.debug(f"Total patterns: {len(ALL_PATTERNS)}")
 
 # Add new patterns or load from JSON/database here as needed
-# This allows for easier management of a large number of patterns 
+# This allows for easier management of a large number of patterns
@@ -0,0 +1,304 @@
+"""Pattern Pack Module
+
+This module describes each supported language as a pattern pack: its display
+name, the signals that detect it (keywords, file extensions and exception
+types) and where its patterns come from. The translator, language detection
+and the language list read everything language-specific from the packs.
+
+The built-in packs are the packages under app/data/patterns and are loaded at
+startup. Other packs are discovered through the "error_translator.packs"
+entry point group, for example in a plugin's pyproject.toml:
+
+    [project.entry-points."error_translator.packs"]
+    cpp = "translator_cpp:PACK"
+
+where translator_cpp.PACK is a PatternPack (or a callable returning one).
+Declaring a pack should be cheap: its patterns are given as a list, a
+callable or a "module:attribute" path, and are only compiled into the
+registry the first time its language is needed, either requested
+explicitly or detected from the declared signals.
+"""
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Entry point group external packs are registered under
+ENTRY_POINT_GROUP = "error_translator.packs"
+
+# Language whose patterns apply to every message
+GENERAL = "general"
+
+# Seconds before a pack whose patterns could not be loaded is tried again
+LOAD_RETRY_BACKOFF = 30.0
+
+PatternSource = Union[str, Sequence[Dict[str, Any]], Callable[[], Sequence[Dict[str, Any]]]]
+
+
+class PatternPack:
+    """A language's patterns and the signals that detect it."""
+
+    __slots__ = ("language", "name", "keywords", "file_extensions", "exception_types",
+                 "generic_title", "patterns")
+
+    def __init__(
+        self,
+        language: str,
+        name: str,
+        patterns: PatternSource,
+        keywords: Sequence[str] = (),
+        file_extensions: Sequence[str] = (),
+        exception_types: Sequence[str] = (),
+        generic_title: Optional[str] = None,
+    ):
+        if not language or not language.isidentifier() or language != language.lower():
+            raise ValueError(f"Invalid pack language {language!r}: expected a lowercase identifier")
+        self.language = language
+        self.name = name
+        self.patterns = patterns
+        # Matched against the case-folded message
+        self.keywords = tuple(keyword.casefold() for keyword in keywords)
+        self.file_extensions = tuple(file_extensions)
+        # Exception identifiers the pack's patterns match, lowercased like exception_types()
+        self.exception_types = tuple(name.lower() for name in exception_types)
+        self.generic_title = generic_title or f"{name} Error"
+
+    def load_patterns(self) -> List[Dict[str, Any]]:
+        """Return the pack's pattern dictionaries, importing them if they are given by path."""
+        patterns = self.patterns
+        if isinstance(patterns, str):
+            module_name, _, attribute = patterns.partition(":")
+            patterns = getattr(importlib.import_module(module_name), attribute or "PATTERNS")
+        if callable(patterns):
+            patterns = patterns()
+        return list(patterns)
+
+    def __repr__(self) -> str:
+        return f"PatternPack({self.language!r})"
+
+
+# Packs shipped with the application, in display order
+BUILTIN_PACKS = (
+    PatternPack(
+        "python", "Python", "app.data.patterns.python:PATTERNS",
+        keywords=["python", "pyfile", "pythonpath", "traceback", "def ", "class ", "import ",
+                  "syntaxerror", "indentationerror", "valueerror", "typeerror", "importerror",
+                  "attributeerror"],
+        file_extensions=[".py"],
+    ),
+    PatternPack(
+        "javascript", "JavaScript", "app.data.patterns.javascript:PATTERNS",
+        keywords=["javascript", "js", "node", "npm", "const ", "let ", "var ", "undefined",
+                  "referenceerror", "typeerror", "syntaxerror", "uncaught", "function", "=>",
+                  "promise", "async ", "await ", "document."],
+        file_extensions=[".js"],
+    ),
+    PatternPack(
+        "java", "Java", "app.data.patterns.java:PATTERNS",
+        keywords=["java", "javac", "exception", "nullpointerexception", "classcastexception", "jvm",
+                  "runtime", "class ", "public ", "private ", "static ", "void ", "interface ",
+                  "abstract ", "extends ", "implements "],
+        file_extensions=[".java"],
+    ),
+    PatternPack(
+        "ruby", "Ruby", "app.data.patterns.ruby:PATTERNS",
+        keywords=["ruby", "rb", "gem", "bundler", "nameerror", "nomethoderror", "argumenterror",
+                  "runtimeerror", "loaderror", "typeerror", "zerodivisionerror", "syntaxerror",
+                  "notenoughargumentserror", "module", "def ", "end", "nil"],
+    ),
+    PatternPack(
+        "html", "HTML", "app.data.patterns.html:PATTERNS",
+        keywords=["html", "<html", "</html>", "<div", "</div>", "<body", "</body>", "<head",
+                  "</head>", "<!doctype", "markup", "tag", "element"],
+        file_extensions=[".html", ".htm"],
+    ),
+    PatternPack(
+        "css", "CSS", "app.data.patterns.css:PATTERNS",
+        keywords=["css", "stylesheet", "css file", "selector", "@media", "@keyframes", "color:",
+                  "background:", "margin:", "padding:", "width:", "height:", "px;", "em;", "rem;",
+                  "%;"],
+        file_extensions=[".css"],
+    ),
+    PatternPack(GENERAL, "General", "app.data.patterns.general:PATTERNS",
+                generic_title="Code Error"),
+)
+
+
+def _entry_points(group: str):
+    from importlib.metadata import entry_points
+
+    found = entry_points()
+    if hasattr(found, "select"):
+        return found.select(group=group)
+    return found.get(group, ())  # Python < 3.10
+
+
+class PackRegistry:
+    """The built-in and installed packs, compiling a pack's patterns on first use."""
+
+    def __init__(self, registry=None, builtin: Sequence[PatternPack] = BUILTIN_PACKS,
+                 discover: bool = True):
+        self._registry = registry
+        self._packs: Dict[str, PatternPack] = {pack.language: pack for pack in builtin}
+        self._builtin = frozenset(self._packs)
+        self._discovered = not discover
+        self._lock = threading.RLock()
+        self._extensions: Optional[Dict[str, str]] = None
+        self._type_languages: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._retry_at: Dict[str, float] = {}
+        self._loaded: List[str] = []
+        # Changes whenever a pack is added or loaded, so results that depend on
+        # the packs can be cached per state
+        self.generation = 0
+
+    @property
+    def registry(self):
+        if self._registry is None:
+            from app.data.error_patterns import REGISTRY
+
+            self._registry = REGISTRY
+        return self._registry
+
+    def _ensure_discovered(self) -> None:
+        if self._discovered:
+            return
+        with self._lock:
+            if self._discovered:
+                return
+            try:
+                entry_points = list(_entry_points(ENTRY_POINT_GROUP))
+            except Exception as e:
+                logger.warning(f"Could not list pattern pack entry points: {e}")
+                entry_points = []
+            for entry_point in entry_points:
+                try:
+                    pack = entry_point.load()
+                    if callable(pack) and not isinstance(pack, PatternPack):
+                        pack = pack()
+                    if not isinstance(pack, PatternPack):
+                        raise TypeError(f"expected a PatternPack, got {type(pack).__name__}")
+                except Exception as e:
+                    logger.error(f"Skipping pattern pack {entry_point.name}: {e}")
+                    continue
+                self._add(pack)
+            self._discovered = True
+
+    def _add(self, pack: PatternPack) -> None:
+        if pack.language in self._packs:
+            logger.warning(f"Skipping pattern pack for {pack.language}: "
+                           f"the language is already provided")
+            return
+        self._packs[pack.language] = pack
+        self._extensions = None
+        self._type_languages = None
+        self.generation += 1
+        logger.info(f"Found pattern pack for {pack.language}")
+
+    def register(self, pack: PatternPack) -> None:
+        """Add a pack without an entry point, such as one built at runtime, to load lazily."""
+        with self._lock:
+            self._add(pack)
+
+    def packs(self) -> List[PatternPack]:
+        """Return every pack, built-in first, with the general pack last."""
+        self._ensure_discovered()
+        packs = [pack for language, pack in self._packs.items() if language != GENERAL]
+        return packs + [self._packs[GENERAL]] if GENERAL in self._packs else packs
+
+    def pack(self, language: str) -> Optional[PatternPack]:
+        self._ensure_discovered()
+        return self._packs.get(language)
+
+    def languages(self) -> List[str]:
+        return [pack.language for pack in self.packs()]
+
+    def is_builtin(self, language: str) -> bool:
+        return language in self._builtin
+
+    def is_loaded(self, language: str) -> bool:
+        return language in self.registry
+
+    @property
+    def cache_namespace(self) -> str:
+        """Distinguishes translations cached after packs were loaded from those cached before."""
+        return f"packs:{','.join(sorted(self._loaded))}" if self._loaded else ""
+
+    def ensure_loaded(self, language: str) -> bool:
+        """Compile a pack's patterns into the registry if they are not yet.
+
+        Returns whether the language has patterns.
+
+        A pack whose patterns fail to load is left unloaded and tried again
+        once LOAD_RETRY_BACKOFF has passed.
+        """
+        registry = self.registry
+        if language in registry:
+            return True
+        pack = self.pack(language)
+        if pack is None:
+            return False
+        with self._lock:
+            if language in registry:
+                return True
+            if time.monotonic() < self._retry_at.get(language, 0.0):
+                return False
+            try:
+                patterns = pack.load_patterns()
+            except Exception as e:
+                self._retry_at[language] = time.monotonic() + LOAD_RETRY_BACKOFF
+                logger.error(f"Could not load the {language} pattern pack, "
+                             f"retrying in {LOAD_RETRY_BACKOFF}s: {e}")
+                return False
+            self._retry_at.pop(language, None)
+            compiled = registry.add_language(language, patterns)
+            logger.info(f"Loaded {len(compiled)} patterns for {language} from its pattern pack")
+            self._loaded.append(language)
+            self.generation += 1
+            self._after_load(language)
+        return True
+
+    def _after_load(self, language: str) -> None:
+        """Prune the new language's dead patterns and rebuild the registry's indexes."""
+        from app.data.error_patterns import REGISTRY, prune_dead_patterns
+
+        self._type_languages = None
+        if self.registry is not REGISTRY:
+            return  # A registry of its own, which nothing else indexes
+        from app.data.similarity import SIMILARITY_INDEX
+        from app.data.suggest import SUGGESTIONS
+
+        prune_dead_patterns([language])
+        SIMILARITY_INDEX.reset()
+        SUGGESTIONS.reset()
+
+    def file_extensions(self) -> Dict[str, str]:
+        """Return the file extension -> language mapping of every pack."""
+        if self._extensions is None:
+            self._extensions = {ext: pack.language
+                                for pack in self.packs() for ext in pack.file_extensions}
+        return self._extensions
+
+    def languages_for_type(self, name: str) -> Tuple[str, ...]:
+        """Return the languages with patterns for an exception type, or declaring it if unloaded."""
+        if self._type_languages is None:
+            declared: Dict[str, List[str]] = {}
+            for pack in self.packs():
+                if not self.is_loaded(pack.language):
+                    for type_name in pack.exception_types:
+                        declared.setdefault(type_name, []).append(pack.language)
+            self._type_languages = {type_name: tuple(languages)
+                                    for type_name, languages in declared.items()}
+        loaded = self.registry.languages_for_type(name)
+        declared = self._type_languages.get(name, ())
+        return loaded + declared if declared else loaded
+
+    def generic_title(self, language: str) -> str:
+        pack = self.pack(language)
+        return pack.generic_title if pack is not None else "Code Error"
+
+
+# Packs used by the translator
+LANGUAGE_PACKS = PackRegistry()
@@ -2,52 +2,42 @@
 Error Patterns
 
 This module contains error patterns for various programming languages.
-"""
 
-# List to store all error patterns
-ALL_PATTERNS = []
-
-# Import patterns from language-specific modules
-try:
-    from app.data.patterns import python
-    ALL_PATTERNS.extend(python.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import Python error patterns: {e}")
-
-try:
-    from app.data.patterns import javascript
-    ALL_PATTERNS.extend(javascript.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import JavaScript error patterns: {e}")
-
-try:
-    from app.data.patterns import java
-    ALL_PATTERNS.extend(java.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import Java error patterns: {e}")
-
-try:
-    from app.data.patterns import ruby
-    ALL_PATTERNS.extend(ruby.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import Ruby error patterns: {e}")
-
-try:
-    from app.data.patterns import html
-    ALL_PATTERNS.extend(html.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import HTML error patterns: {e}")
-
-try:
-    from app.data.patterns import css
-    ALL_PATTERNS.extend(css.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import CSS error patterns: {e}")
-
-try:
-    from app.data.patterns import general
-    ALL_PATTERNS.extend(general.PATTERNS)
-except ImportError as e:
-    print(f"Warning: Could not import general error patterns: {e}")
-
-print(f"Loaded {len(ALL_PATTERNS)} error patterns in total.") 
\ No newline at end of file
+Each language module is imported when its patterns are needed. The
+translator compiles them into compact records and then forgets the modules,
+so ALL_PATTERNS is built from the modules when it is read.
+"""
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Language modules of this package
+LANGUAGE_MODULES = {
+    "python": "Python",
+    "javascript": "JavaScript",
+    "java": "Java",
+    "ruby": "Ruby",
+    "html": "HTML",
+    "css": "CSS",
+    "general": "general",
+}
+
+
+def load_all_patterns():
+    """Import every language module and return their patterns in one list."""
+    patterns = []
+    for language, name in LANGUAGE_MODULES.items():
+        try:
+            patterns.extend(importlib.import_module(f"{__name__}.{language}").PATTERNS)
+        except ImportError as e:
+            logger.warning(f"Could not import {name} error patterns: {e}")
+    logger.debug(f"Loaded {len(patterns)} error patterns in total.")
+    return patterns
+
+
+def __getattr__(name):
+    """Build ALL_PATTERNS from the language modules when it is read."""
+    if name == "ALL_PATTERNS":
+        return load_all_patterns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
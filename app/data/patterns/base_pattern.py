@@ -1,24 +1,268 @@
 """Base pattern structure for error patterns."""
-from dataclasses import dataclass
-from typing import List, Optional
+import json
+import re
+import sys
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.regex_engines import compile_pattern
+
+# Flags every pattern is compiled with
+DEFAULT_FLAGS = re.IGNORECASE | re.DOTALL
+
+# Number of decoded display text sets kept in memory
+COLD_CACHE_SIZE = 32
+
+# Placeholders such as {{$1}} that reference regex capture groups
+PLACEHOLDER_RE = re.compile(r"\{\{\$(\d+)\}\}")
+
+VALID_DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+# Exception identifier at the start of a case-folded literal prefix, such as
+# "nameerror" or "java.lang.nullpointerexception"
+EXCEPTION_TYPE_RE = re.compile(r"[a-z_$][\w.$]*(?:error|exception)\b")
+
+# Characters with special meaning in a regular expression
+REGEX_METACHARACTERS = set(".^$*+?{}[]|()\\")
+
+
+def has_top_level_alternation(source: str) -> bool:
+    """Return True if a regex has a '|' outside any group or character class."""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def literal_prefix(source: str) -> str:
+    """Return the literal text every match of a regex starts with, case-folded.
+
+    Returns an empty string when the regex starts with a group, class or other
+    construct, or has top-level alternatives.
+    """
+    if has_top_level_alternation(source):
+        return ""
+    chars = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            # Escaped punctuation is literal; escapes like \s or \d are not
+            if i + 1 >= len(source) or source[i + 1].isalnum():
+                break
+            chars.append(source[i + 1])
+            i += 2
+            continue
+        if char in "*?{":
+            # The preceding character is optional or repeated a variable number of times
+            if chars:
+                chars.pop()
+            break
+        if char in REGEX_METACHARACTERS:
+            break
+        chars.append(char)
+        i += 1
+    return "".join(chars).casefold()
+
+
+def literal_alternatives(source: str) -> Optional[Tuple[str, ...]]:
+    """Return the case-folded alternatives of a regex made only of literals, or None.
+
+    A regex such as ``Permission denied|Access denied`` is a set of plain
+    strings; anything with groups, classes, quantifiers, anchors or escapes
+    like \\s is a real regex.
+    """
+    alternatives = []
+    chars: List[str] = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            if i + 1 >= len(source) or source[i + 1].isalnum():
+                return None
+            chars.append(source[i + 1])
+            i += 2
+            continue
+        if char == "|":
+            alternatives.append("".join(chars))
+            chars = []
+        elif char in REGEX_METACHARACTERS:
+            return None
+        else:
+            chars.append(char)
+        i += 1
+    alternatives.append("".join(chars))
+    if not all(alternatives):
+        return None  # An empty alternative matches everywhere
+    return tuple(alternative.casefold() for alternative in alternatives)
+
+
+def exception_type(prefix: str) -> str:
+    """Return the exception identifier a case-folded literal prefix starts with, or ''."""
+    match = EXCEPTION_TYPE_RE.match(prefix)
+    return match.group(0) if match else ""
+
+
+@lru_cache(maxsize=COLD_CACHE_SIZE)
+def _decode_cold(blob: bytes) -> Dict[str, Any]:
+    """Decompress the display text of a pattern."""
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
 
-@dataclass
 class ErrorPattern:
-    """Represents an error pattern with all its attributes."""
-    regex: str
-    title: str
-    explanation: str
-    solution: str
-    language: str
-    difficulty: str
-    code_example: Optional[str] = None
-    related_errors: List[str] = None
-    
-    def __post_init__(self):
-        """Validate pattern attributes after initialization."""
-        if not self.regex or not self.title or not self.explanation or not self.solution:
+    """Represents an error pattern with all its attributes.
+
+    Only the fields needed for matching (id, compiled regex, flags, language,
+    difficulty, literal prefix, exception type, literal alternatives and the
+    slot map of capture groups referenced by placeholders) are kept as
+    attributes. The display text is rarely needed, so the title,
+    explanation, solution, code example and related errors are stored as a
+    compressed blob and decoded on demand through a small LRU cache.
+
+    A pattern keeps no reference to the dictionary it was built from. The
+    built-in pattern modules are released once their patterns are compiled
+    (see app.data.error_patterns), so only these records stay in memory.
+    """
+
+    __slots__ = ("id", "regex", "flags", "language", "difficulty", "slots", "prefix",
+                 "exception_type", "literals", "_cold")
+
+    def __init__(
+        self,
+        regex: str,
+        title: str,
+        explanation: str,
+        solution: str,
+        language: str,
+        difficulty: str,
+        code_example: Optional[str] = None,
+        related_errors: Optional[List[str]] = None,
+        pattern_id: Optional[str] = None,
+        flags: int = DEFAULT_FLAGS,
+    ):
+        if not regex or not title or not explanation or not solution:
             raise ValueError("Required pattern fields cannot be empty")
-        if self.difficulty not in ["beginner", "intermediate", "advanced"]:
+        if difficulty not in VALID_DIFFICULTIES:
             raise ValueError("Invalid difficulty level")
-        if self.related_errors is None:
-            self.related_errors = []
\ No newline at end of file
+
+        # Compiled on re, or on a linear-time engine if the pattern could backtrack catastrophically
+        self.regex = compile_pattern(regex, flags)
+        self.flags = flags
+        self.language = sys.intern(language)
+        self.difficulty = sys.intern(difficulty)
+        self.id = sys.intern(pattern_id or f"{language}:{regex}")
+        self.prefix = literal_prefix(regex)
+        self.exception_type = sys.intern(exception_type(self.prefix))
+        # Case-insensitive literal patterns are searched without the regex engine
+        self.literals = literal_alternatives(regex) if flags & re.IGNORECASE else None
+
+        code_example = code_example or ""
+        self.slots: Tuple[int, ...] = tuple(sorted({
+            int(number)
+            for text in (title, explanation, solution, code_example)
+            for number in PLACEHOLDER_RE.findall(text)
+        }))
+
+        cold = {
+            "title": title,
+            "explanation": explanation,
+            "solution": solution,
+            "code_example": code_example,
+            "related_errors": list(related_errors or []),
+        }
+        self._cold = zlib.compress(json.dumps(cold, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], language: str,
+                  pattern_id: Optional[str] = None) -> "ErrorPattern":
+        """Build a pattern from the dictionary format used by the pattern modules."""
+        return cls(
+            regex=data["regex"],
+            title=data["title"],
+            explanation=data["explanation"],
+            solution=data["solution"],
+            language=language,
+            difficulty=data.get("difficulty", "intermediate"),
+            code_example=data.get("code_example"),
+            related_errors=data.get("related_errors"),
+            pattern_id=pattern_id,
+        )
+
+    @property
+    def engine(self) -> str:
+        """Name of the regex engine the pattern runs on."""
+        return getattr(self.regex, "engine", "re")
+
+    @property
+    def source(self) -> str:
+        """The uncompiled regular expression."""
+        return self.regex.pattern
+
+    def search(self, text: str, folded: Optional[str] = None):
+        """Search text with the pattern and return the match, or None.
+
+        Literal patterns are checked with substring search on the case-folded
+        text (pass it as folded to fold the text only once per request); the
+        regex then only runs on a hit, to produce the match object.
+        """
+        if self.literals is not None:
+            if folded is None:
+                folded = text.casefold()
+            for literal in self.literals:
+                if literal in folded:
+                    break
+            else:
+                return None
+        return self.regex.search(text)
+
+    def cold_fields(self) -> Dict[str, Any]:
+        """Return the decoded display text. The returned dict is shared and must not be modified."""
+        return _decode_cold(self._cold)
+
+    @property
+    def title(self) -> str:
+        return self.cold_fields()["title"]
+
+    @property
+    def explanation(self) -> str:
+        return self.cold_fields()["explanation"]
+
+    @property
+    def solution(self) -> str:
+        return self.cold_fields()["solution"]
+
+    @property
+    def code_example(self) -> str:
+        return self.cold_fields()["code_example"]
+
+    @property
+    def related_errors(self) -> List[str]:
+        return self.cold_fields()["related_errors"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the pattern in the dictionary format used by the pattern modules."""
+        data = {"regex": self.source}
+        data.update(self.cold_fields())
+        data["related_errors"] = list(data["related_errors"])
+        data["difficulty"] = self.difficulty
+        return data
+
+    def __repr__(self) -> str:
+        return f"ErrorPattern(id={self.id!r}, regex={self.source!r})"
@@ -8,7 +8,7 @@ from app.data.patterns.html import PATTERNS
 
 # Unclosed tag
 PATTERNS.append({
-    "regex": r"(?:Error:|Unclosed tag)(?:.*?)([a-zA-Z0-9]+)(?:\s+tag)?",
+    "regex": r"Unclosed tag(?:.*?)([a-zA-Z0-9]+)(?:\s+tag)?",
     "title": "Unclosed HTML Tag: {{$1}}",
     "explanation": "Your HTML has an opening <{{$1}}> tag without a matching closing </{{$1}}> tag. Most HTML tags must be properly closed to form valid HTML.",
     "solution": "Add the missing closing tag </{{$1}}> at the appropriate position. Make sure each opening tag has a corresponding closing tag in the correct order.",
@@ -31,7 +31,7 @@ PATTERNS.append({
 
 # Stray end tag
 PATTERNS.append({
-    "regex": r"(?:Error:|Stray end tag)(?:.*?)([a-zA-Z0-9]+)",
+    "regex": r"Stray end tag(?:.*?)([a-zA-Z0-9]+)",
     "title": "Stray End Tag: {{$1}}",
     "explanation": "Your HTML has a closing </{{$1}}> tag without a matching opening <{{$1}}> tag. Each closing tag must have a corresponding opening tag.",
     "solution": "Either add a matching opening <{{$1}}> tag or remove the stray closing tag. Check your nesting order - tags must be closed in the reverse order they were opened.",
@@ -53,7 +53,7 @@ PATTERNS.append({
 
 # Invalid attribute
 PATTERNS.append({
-    "regex": r"(?:Error:|Invalid attribute)(?:.*?)([a-zA-Z0-9-]+)(?:.*?)for(?:.*?)([a-zA-Z0-9]+)",
+    "regex": r"Invalid attribute[^a-zA-Z0-9-]*([a-zA-Z0-9-]+)(?:.*?)for[^a-zA-Z0-9]*([a-zA-Z0-9]+)",
     "title": "Invalid Attribute: {{$1}} for {{$2}}",
     "explanation": "The attribute '{{$1}}' is not valid for the <{{$2}}> tag. Each HTML element has a specific set of allowed attributes.",
     "solution": "Remove the invalid attribute or check if you're using the correct element for your purpose. Also check for typos in attribute names.",
@@ -75,7 +75,8 @@ PATTERNS.append({
 
 # Element missing required attribute
 PATTERNS.append({
-    "regex": r"(?:Error:|Element)(?:.*?)([a-zA-Z0-9]+)(?:.*?)missing required attribute(?:.*?)([a-zA-Z0-9-]+)",
+    "regex": (r"Element[^a-zA-Z0-9]*([a-zA-Z0-9]+)(?:.*?)"
+              r"missing required attribute[^a-zA-Z0-9-]*([a-zA-Z0-9-]+)"),
     "title": "Missing Required Attribute: {{$2}} in {{$1}}",
     "explanation": "The <{{$1}}> element is missing a required attribute '{{$2}}'. Some HTML elements have mandatory attributes that must be included.",
     "solution": "Add the required '{{$2}}' attribute to the <{{$1}}> tag. This is necessary for the element to function properly and for valid HTML.",
@@ -99,7 +100,7 @@ PATTERNS.append({
 
 # Duplicate ID
 PATTERNS.append({
-    "regex": r"(?:Error:|Duplicate ID)(?:.*?)([a-zA-Z0-9_-]+)",
+    "regex": r"Duplicate ID(?:.*?)([a-zA-Z0-9_-]+)",
     "title": "Duplicate ID: {{$1}}",
     "explanation": "The ID '{{$1}}' is used more than once in your HTML document. IDs must be unique within a single HTML document.",
     "solution": "Give each element a unique ID. If multiple elements need the same styling or behavior, use classes instead of IDs.",
@@ -122,7 +123,7 @@ PATTERNS.append({
 
 # Missing DOCTYPE declaration
 PATTERNS.append({
-    "regex": r"(Error:|Missing DOCTYPE|No DOCTYPE specified)",
+    "regex": r"(Missing DOCTYPE|No DOCTYPE specified)",
     "title": "Missing DOCTYPE Declaration",
     "explanation": "Your HTML file is missing a DOCTYPE declaration at the top. Without it, browsers may render the page in quirks mode, leading to inconsistent behavior.",
     "solution": "Add '<!DOCTYPE html>' as the very first line of your HTML file to ensure standards-compliant rendering.",
@@ -12,6 +12,7 @@ try:
     from app.data.patterns.python import name_errors
     from app.data.patterns.python import type_errors
     from app.data.patterns.python import syntax_errors
+    from app.data.patterns.python import arithmetic_errors
     # Import additional pattern modules as they're created:
     # etc.
 except ImportError as e:
@@ -0,0 +1,27 @@
+"""
+Python Arithmetic Error Patterns
+
+This module contains error patterns for Python arithmetic exceptions.
+"""
+
+from app.data.patterns.python import PATTERNS
+
+# ZeroDivisionError: division by zero
+PATTERNS.append({
+    "regex": r"ZeroDivisionError: (?:(?:integer|float) )?(?:division|modulo|divmod)[^\n]*by zero",
+    "title": "Division by Zero",
+    "explanation": "Your code tried to divide a number by zero, which has no result. Python "
+                   "stops with this error instead of guessing an answer.",
+    "solution": "Check the value of the divisor before dividing. If it can be zero, handle "
+                "that case separately, for example by skipping the calculation or using a "
+                "default result.",
+    "code_example": """
+# Incorrect:
+average = total / count  # Error if count is 0
+
+# Correct:
+average = total / count if count else 0
+""",
+    "related_errors": ["ArithmeticError", "OverflowError"],
+    "difficulty": "beginner",
+})
@@ -0,0 +1,167 @@
+"""Pattern Registry Module
+
+This module holds the compiled error patterns for every language as compact
+ErrorPattern records, indexed by the exception type each pattern matches.
+"""
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.data.patterns.base_pattern import ErrorPattern
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Suffixes that end an exception identifier such as NameError or
+# java.lang.NullPointerException
+EXCEPTION_SUFFIXES = ("Error", "Exception")
+
+# Characters an exception identifier is made of
+IDENTIFIER_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.$")
+
+# Most candidate orders kept for combinations of exception types
+MAX_DISPATCH_ORDERS = 1024
+
+
+def exception_types(error_message: str) -> Tuple[str, ...]:
+    """Return the distinct exception identifiers in a message, lowercased, in order of appearance.
+
+    This scans for the suffixes with str.find and walks back over the
+    identifier, which is several times cheaper than an equivalent regex.
+    """
+    found = []
+    length = len(error_message)
+    for suffix in EXCEPTION_SUFFIXES:
+        end = error_message.find(suffix)
+        while end != -1:
+            stop = end + len(suffix)
+            if (stop == length or error_message[stop] not in IDENTIFIER_CHARS
+                    or error_message[stop] == "."):
+                start = end
+                while start and error_message[start - 1] in IDENTIFIER_CHARS:
+                    start -= 1
+                if start < end:  # A bare "Error" is not an identifier
+                    found.append((start, error_message[start:stop].lstrip(".").lower()))
+            end = error_message.find(suffix, stop)
+    found.sort()
+    return tuple(dict.fromkeys(name for _, name in found))
+
+
+class PatternRegistry:
+    """Compiled error patterns grouped by language, in priority order."""
+
+    def __init__(self):
+        self._patterns: Dict[str, Tuple[ErrorPattern, ...]] = {}
+        # language -> exception type -> patterns for that type, in priority order
+        self._by_type: Dict[str, Dict[str, Tuple[ErrorPattern, ...]]] = {}
+        # exception type -> languages that have patterns for it
+        self._type_languages: Dict[str, Tuple[str, ...]] = {}
+        self._orders: Dict[Tuple[str, Tuple[str, ...]], Tuple[ErrorPattern, ...]] = {}
+        # Languages with at least one pattern that has literal alternatives
+        self._literal_languages = set()
+        # Patterns set aside by exclude(), by id
+        self.excluded: Dict[str, ErrorPattern] = {}
+
+    def add_language(self, language: str,
+                     patterns: List[Dict[str, Any]]) -> Tuple[ErrorPattern, ...]:
+        """Compile pattern dictionaries for a language and append them to the registry.
+
+        Patterns are identified by an "id" key if they have one, otherwise by
+        language and position.
+
+        Invalid patterns are logged and skipped rather than failing the whole language.
+        """
+        existing = self._patterns.get(language, ())
+        compiled = []
+        for index, data in enumerate(patterns, len(existing)):
+            try:
+                pattern_id = data.get("id") or f"{language}:{index}"
+                compiled.append(ErrorPattern.from_dict(data, language, pattern_id=pattern_id))
+            except (KeyError, ValueError) as e:
+                logger.error(f"Skipping invalid {language} pattern #{index}: {e}")
+        self._patterns[language] = existing + tuple(compiled)
+        self._index(language)
+        return self._patterns[language]
+
+    def _index(self, language: str) -> None:
+        """Rebuild the exception type index for a language."""
+        buckets: Dict[str, List[ErrorPattern]] = {}
+        for pattern in self._patterns[language]:
+            if pattern.exception_type:
+                buckets.setdefault(pattern.exception_type, []).append(pattern)
+        self._by_type[language] = {name: tuple(patterns) for name, patterns in buckets.items()}
+        if any(pattern.literals is not None for pattern in self._patterns[language]):
+            self._literal_languages.add(language)
+        else:
+            self._literal_languages.discard(language)
+
+        type_languages: Dict[str, List[str]] = {}
+        for lang, index in self._by_type.items():
+            for name in index:
+                type_languages.setdefault(name, []).append(lang)
+        self._type_languages = {name: tuple(langs) for name, langs in type_languages.items()}
+        self._orders.clear()
+
+    def candidates(self, language: str, types: Tuple[str, ...]) -> Tuple[ErrorPattern, ...]:
+        """Return a language's patterns with those for the given exception types first.
+
+        The remaining patterns follow in priority order as a fallback, so every
+        pattern is still tried if none of the indexed ones match.
+        """
+        index = self._by_type.get(language)
+        known = tuple(name for name in types if index and name in index)
+        if not known:
+            return self.patterns(language)
+
+        key = (language, known)
+        order = self._orders.get(key)
+        if order is None:
+            bucket = {pattern.id: pattern for name in known for pattern in index[name]}
+            rest = tuple(pattern for pattern in self._patterns[language]
+                         if pattern.id not in bucket)
+            order = tuple(bucket.values()) + rest
+            if len(self._orders) >= MAX_DISPATCH_ORDERS:
+                self._orders.clear()
+            self._orders[key] = order
+        return order
+
+    def exclude(self, pattern_ids: Iterable[str]) -> int:
+        """Remove patterns from matching, keeping them listed in `excluded`. Returns how many."""
+        pattern_ids = set(pattern_ids)
+        removed = 0
+        for language, patterns in list(self._patterns.items()):
+            kept = tuple(pattern for pattern in patterns if pattern.id not in pattern_ids)
+            if len(kept) == len(patterns):
+                continue
+            for pattern in patterns:
+                if pattern.id in pattern_ids:
+                    self.excluded[pattern.id] = pattern
+            removed += len(patterns) - len(kept)
+            self._patterns[language] = kept
+            self._index(language)
+        return removed
+
+    def languages_for_type(self, name: str) -> Tuple[str, ...]:
+        """Return the languages that have patterns for an exception type."""
+        return self._type_languages.get(name, ())
+
+    def has_literals(self, language: str) -> bool:
+        """Return whether any of a language's patterns is searched for literals first."""
+        return language in self._literal_languages
+
+    def patterns(self, language: str) -> Tuple[ErrorPattern, ...]:
+        """Return the compiled patterns for a language (empty if unknown)."""
+        return self._patterns.get(language, ())
+
+    def languages(self) -> List[str]:
+        """Return the languages that have patterns registered."""
+        return list(self._patterns)
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._patterns
+
+    def __iter__(self) -> Iterator[ErrorPattern]:
+        for patterns in self._patterns.values():
+            yield from patterns
+
+    def __len__(self) -> int:
+        return sum(len(patterns) for patterns in self._patterns.values())
@@ -0,0 +1,158 @@
+"""Pattern Similarity Module
+
+This module finds the known patterns closest to a message that no pattern
+matched. Every pattern is described by a few short documents: its title,
+example messages generated from its regex and its related errors. Each
+document is indexed by its character trigrams.
+
+A query is compared by Jaccard similarity of trigram sets, and the index
+avoids comparing it with every document:
+
+- length filtering: a document with far fewer or far more trigrams than the
+  query cannot reach the threshold, and documents are kept sorted by size;
+- count filtering: overlaps are counted from the postings of the query's
+  trigrams, so documents sharing no trigram are never looked at, and only
+  documents sharing at least ceil(threshold * |Q|) trigrams are scored.
+"""
+import math
+import bisect
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from app.data.patterns.base_pattern import PLACEHOLDER_RE, ErrorPattern
+
+# Lowest similarity reported
+SIMILARITY_THRESHOLD = 0.3
+
+# Most similar patterns reported
+MAX_SIMILAR = 3
+
+# Example messages generated from each pattern's regex
+EXAMPLES_PER_PATTERN = 4
+
+# Characters of a query that are compared
+MAX_QUERY_LENGTH = 300
+
+
+def normalize(text: str) -> str:
+    """Case-fold text and turn every run of non-alphanumeric characters into one space."""
+    text = PLACEHOLDER_RE.sub(" ", text).casefold()
+    return " ".join("".join(char if char.isalnum() else " " for char in text).split())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Return the character trigrams of normalized text, padded so short words count."""
+    padded = f"  {normalize(text)} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def query_text(text: str) -> str:
+    """Pick the part of a message worth comparing: the lines naming an error, or its start."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    named = [line for line in lines if "error" in line.casefold() or "exception" in line.casefold()]
+    return " ".join(named or lines)[:MAX_QUERY_LENGTH]
+
+
+def pattern_documents(pattern: ErrorPattern) -> List[str]:
+    """Return the texts a pattern is indexed by."""
+    from app.data.analysis import generate_probes
+
+    documents = [pattern.title]
+    documents += generate_probes(pattern)[:EXAMPLES_PER_PATTERN]
+    documents += [text for text in pattern.related_errors if isinstance(text, str)]
+    return [document for document in dict.fromkeys(documents) if normalize(document)]
+
+
+class TrigramIndex:
+    """Inverted trigram index over the documents of a set of patterns."""
+
+    def __init__(self, patterns: Iterable[ErrorPattern]):
+        documents: List[Tuple[FrozenSet[str], ErrorPattern]] = []
+        for pattern in patterns:
+            for text in pattern_documents(pattern):
+                documents.append((trigrams(text), pattern))
+        # Sorted by size so the length filter is a range of document ids
+        documents.sort(key=lambda document: len(document[0]))
+        self._grams = [grams for grams, _ in documents]
+        self._patterns = [pattern for _, pattern in documents]
+        self._sizes = [len(grams) for grams in self._grams]
+        self._postings: Dict[str, List[int]] = {}
+        for doc_id, grams in enumerate(self._grams):
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(doc_id)
+        self.stats = {"documents": len(documents), "trigrams": len(self._postings), "compared": 0}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def search(self, text: str, languages: Optional[Sequence[str]] = None, limit: int = MAX_SIMILAR,
+               threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[ErrorPattern, float]]:
+        """Return up to `limit` (pattern, similarity) pairs meeting the threshold, best first."""
+        query = trigrams(query_text(text))
+        size = len(query)
+        if not size:
+            return []
+
+        # Length filter: |D| must lie in [t|Q|, |Q|/t]
+        low = bisect.bisect_left(self._sizes, math.ceil(threshold * size))
+        high = bisect.bisect_right(self._sizes, math.floor(size / threshold))
+
+        # Count filter: sharing at least ceil(t|Q|) trigrams is needed. Overlaps
+        # are counted from the postings of the query's trigrams, restricted to
+        # the size range, so documents sharing nothing are never touched.
+        counts = Counter()
+        postings = self._postings
+        for gram in query:
+            posting = postings.get(gram)
+            if posting is not None:
+                start = bisect.bisect_left(posting, low)
+                counts.update(posting[start:bisect.bisect_left(posting, high, start)])
+        needed = math.ceil(threshold * size)
+
+        best: Dict[str, Tuple[ErrorPattern, float]] = {}
+        candidates = 0
+        for doc_id, shared in counts.items():
+            if shared < needed:
+                continue
+            pattern = self._patterns[doc_id]
+            if languages is not None and pattern.language not in languages:
+                continue
+            candidates += 1
+            similarity = shared / (size + self._sizes[doc_id] - shared)
+            if similarity >= threshold and similarity > best.get(pattern.id, (None, 0.0))[1]:
+                best[pattern.id] = (pattern, similarity)
+        self.stats["compared"] += candidates
+        return sorted(best.values(), key=lambda item: (-item[1], item[0].id))[:limit]
+
+
+class SimilarityIndex:
+    """Trigram index over the registry's patterns, built on first use."""
+
+    def __init__(self):
+        self._index: Optional[TrigramIndex] = None
+        self._lock = threading.Lock()
+
+    def index(self) -> TrigramIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    from app.data.error_patterns import REGISTRY
+
+                    self._index = TrigramIndex(REGISTRY)
+        return self._index
+
+    def similar(self, text: str, language: str, limit: int = MAX_SIMILAR,
+                threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[ErrorPattern, float]]:
+        """Return the patterns for a language (and general ones) most similar to a message."""
+        languages = None if language == "general" else (language, "general")
+        return self.index().search(text, languages, limit, threshold)
+
+    def reset(self) -> None:
+        """Rebuild the index on next use, after the registry changed."""
+        with self._lock:
+            self._index = None
+
+
+# Index used by the translator when no pattern matches
+SIMILARITY_INDEX = SimilarityIndex()
@@ -0,0 +1,385 @@
+"""Pattern Store Module
+
+This module keeps error patterns in SQLite so they can be searched, counted
+and contributed without editing the Python pattern modules. Each row carries
+its language, category, version (bumped whenever its content changes) and
+hit statistics, and an FTS5 index covers titles, explanations and related
+errors for full-text search.
+
+Rows come from two sources. Rows with source "module" mirror the patterns in
+app/data/patterns and exist for search and statistics only. Every other row
+was added to the store directly, and the registry loads those after the
+module patterns.
+
+Without PATTERN_DB the store lives in memory and is filled from the registry
+the first time it is used in a process. With PATTERN_DB=/path/to/patterns.db
+it is a file shared by every worker.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from app.data.patterns.base_pattern import ErrorPattern
+
+logger = logging.getLogger(__name__)
+
+# Source of rows that mirror the Python pattern modules
+MODULE_SOURCE = "module"
+
+# Source of rows added to the store directly
+STORE_SOURCE = "store"
+
+# Seconds between writes of the buffered hit counts
+HIT_FLUSH_INTERVAL = 5.0
+
+# Results returned by search() by default, and at most
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Most words of a search query used
+MAX_QUERY_TERMS = 12
+
+# Relative weight of matches in the title, explanation and related errors
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    language TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    regex TEXT NOT NULL,
+    title TEXT NOT NULL,
+    explanation TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    code_example TEXT NOT NULL,
+    related_errors TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_hit REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patterns_by_language ON patterns (source, language, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS patterns_fts USING fts5 (
+    title, explanation, related_errors,
+    content='patterns', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS patterns_fts_insert AFTER INSERT ON patterns BEGIN
+    INSERT INTO patterns_fts (rowid, title, explanation, related_errors)
+    VALUES (new.rowid, new.title, new.explanation, new.related_errors);
+END;
+CREATE TRIGGER IF NOT EXISTS patterns_fts_delete AFTER DELETE ON patterns BEGIN
+    INSERT INTO patterns_fts (patterns_fts, rowid, title, explanation, related_errors)
+    VALUES ('delete', old.rowid, old.title, old.explanation, old.related_errors);
+END;
+CREATE TRIGGER IF NOT EXISTS patterns_fts_update
+AFTER UPDATE OF title, explanation, related_errors ON patterns BEGIN
+    INSERT INTO patterns_fts (patterns_fts, rowid, title, explanation, related_errors)
+    VALUES ('delete', old.rowid, old.title, old.explanation, old.related_errors);
+    INSERT INTO patterns_fts (rowid, title, explanation, related_errors)
+    VALUES (new.rowid, new.title, new.explanation, new.related_errors);
+END;
+"""
+
+# Columns whose change makes a new version of a pattern
+CONTENT_COLUMNS = (
+    "regex", "title", "explanation", "solution", "code_example", "related_errors", "difficulty",
+)
+
+# SQL condition that an upsert changes the content of an existing row
+CONTENT_CHANGED = " OR ".join(f"{column} IS NOT excluded.{column}" for column in CONTENT_COLUMNS)
+
+UPSERT = f"""
+INSERT INTO patterns
+    (id, language, category, source, position, {", ".join(CONTENT_COLUMNS)}, updated_at)
+VALUES (?, ?, ?, ?, ?, {", ".join("?" for _ in CONTENT_COLUMNS)}, ?)
+ON CONFLICT (id) DO UPDATE SET
+    version = version + ({CONTENT_CHANGED}),
+    updated_at = CASE WHEN {CONTENT_CHANGED}
+                 THEN excluded.updated_at ELSE updated_at END,
+    language = excluded.language, category = excluded.category, source = excluded.source,
+    position = excluded.position,
+    {", ".join(f"{column} = excluded.{column}" for column in CONTENT_COLUMNS)}
+"""
+
+
+class PatternStoreError(Exception):
+    """Raised when the pattern store cannot be read or written."""
+
+
+def pattern_category(pattern: ErrorPattern) -> str:
+    """Return the category of a module pattern: its exception class name, or 'other'."""
+    return pattern.exception_type.rsplit(".", 1)[-1] or "other"
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word, the last one as a prefix."""
+    terms = "".join(char if char.isalnum() else " " for char in text).split()[:MAX_QUERY_TERMS]
+    if not terms:
+        return ""
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+class PatternStore:
+    """Error patterns in SQLite with full-text search and hit statistics.
+
+    Each process opens its own connection on first use. An in-memory store is
+    empty in every new process, so it is filled by the `seed` callable.
+    """
+
+    def __init__(self, path: str = ":memory:",
+                 seed: Optional[Callable[["PatternStore"], None]] = None):
+        self.path = path
+        self.seed = seed
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Hit counts have their own lock, so counting never waits on a write
+        self._hits: Dict[str, int] = {}
+        self._hits_lock = threading.Lock()
+        self._flusher_pid: Optional[int] = None
+        self._stop_flusher = threading.Event()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                return self._conn
+            try:
+                conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                conn.row_factory = sqlite3.Row
+                if self.path != ":memory:":
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA busy_timeout=1000")
+                conn.executescript(SCHEMA)
+            except sqlite3.Error as e:
+                raise PatternStoreError(f"Cannot open pattern store {self.path}: {e}") from e
+            self._conn, self._pid = conn, os.getpid()
+            if self.path == ":memory:" and self.seed is not None:
+                self.seed(self)
+            return conn
+
+    def _execute(self, sql: str, params=(), many: bool = False) -> List[sqlite3.Row]:
+        conn = self._connection()
+        with self._lock:
+            try:
+                if many:
+                    conn.execute("BEGIN")
+                    try:
+                        conn.executemany(sql, params)
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    conn.execute("COMMIT")
+                    return []
+                return conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise PatternStoreError(str(e)) from e
+
+    def _row(self, data: Dict[str, Any], language: str, pattern_id: str, category: str, source: str,
+             position: int) -> tuple:
+        # Building the pattern validates the regex and required fields
+        ErrorPattern.from_dict(data, language, pattern_id=pattern_id)
+        return (
+            pattern_id, language, category, source, position,
+            data["regex"], data["title"], data["explanation"], data["solution"],
+            data.get("code_example") or "", json.dumps(list(data.get("related_errors") or [])),
+            data.get("difficulty", "intermediate"), time.time(),
+        )
+
+    def add(self, data: Dict[str, Any], language: str, category: str = "other",
+            pattern_id: Optional[str] = None) -> str:
+        """Add a pattern to the store (or update the one with the same id) and return its id.
+
+        Raises:
+            ValueError: the pattern is invalid
+        """
+        if pattern_id is None:
+            count = self._execute("SELECT COUNT(*) FROM patterns WHERE source != ?",
+                                  (MODULE_SOURCE,))[0][0]
+            pattern_id = f"store:{language}:{count}"
+        position = self._execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM patterns WHERE source = ? AND language = ?",
+            (STORE_SOURCE, language),
+        )[0][0]
+        self._execute(UPSERT,
+                      self._row(data, language, pattern_id, category, STORE_SOURCE, position))
+        return pattern_id
+
+    def import_registry(self, registry) -> int:
+        """Mirror the module patterns of a registry into the store. Returns how many."""
+        rows = [
+            self._row(pattern.to_dict(), language, pattern.id, pattern_category(pattern),
+                      MODULE_SOURCE, position)
+            for language in registry.languages()
+            for position, pattern in enumerate(registry.patterns(language))
+            if not pattern.id.startswith("store:")
+        ]
+        self._execute(UPSERT, rows, many=True)
+        return len(rows)
+
+    def load_into(self, registry) -> int:
+        """Append the patterns added to the store directly to a registry. Returns how many."""
+        rows = self._execute(
+            "SELECT * FROM patterns WHERE source != ? ORDER BY language, position", (MODULE_SOURCE,)
+        )
+        by_language: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_language.setdefault(row["language"], []).append({
+                "id": row["id"],
+                "regex": row["regex"],
+                "title": row["title"],
+                "explanation": row["explanation"],
+                "solution": row["solution"],
+                "code_example": row["code_example"],
+                "related_errors": json.loads(row["related_errors"]),
+                "difficulty": row["difficulty"],
+            })
+        for language, patterns in by_language.items():
+            registry.add_language(language, patterns)
+        return len(rows)
+
+    def get(self, pattern_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored pattern with its metadata and statistics, or None."""
+        self._connection()
+        self.flush_hits()
+        rows = self._execute("SELECT * FROM patterns WHERE id = ?", (pattern_id,))
+        if not rows:
+            return None
+        pattern = {key: rows[0][key] for key in rows[0].keys() if key != "rowid"}
+        pattern["related_errors"] = json.loads(pattern["related_errors"])
+        return pattern
+
+    def search(self, query: str, language: Optional[str] = None,
+               limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Return the patterns best matching a free-text query, best first."""
+        match = fts_query(query)
+        if not match:
+            return []
+        self._connection()
+        self.flush_hits()
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        sql = f"""
+            SELECT p.id, p.language, p.category, p.title, p.version, p.hits,
+                   bm25(patterns_fts, {", ".join(map(str, SEARCH_WEIGHTS))}) AS rank,
+                   snippet(patterns_fts, 1, '[', ']', '...', 16) AS snippet
+            FROM patterns_fts JOIN patterns p ON p.rowid = patterns_fts.rowid
+            WHERE patterns_fts MATCH ?{" AND p.language = ?" if language else ""}
+            ORDER BY rank LIMIT ?
+        """
+        params = (match, language, limit) if language else (match, limit)
+        return [
+            {
+                "id": row["id"],
+                "language": row["language"],
+                "category": row["category"],
+                "title": row["title"],
+                "snippet": row["snippet"],
+                "version": row["version"],
+                "hits": row["hits"],
+                "score": round(-row["rank"], 3),  # bm25() is lower for better matches
+            }
+            for row in self._execute(sql, params)
+        ]
+
+    def record_hit(self, pattern_id: str) -> None:
+        """Count a match of a pattern.
+
+        Counts are buffered and written by a background thread every
+        HIT_FLUSH_INTERVAL, so request threads never wait on SQLite.
+        """
+        with self._hits_lock:
+            self._hits[pattern_id] = self._hits.get(pattern_id, 0) + 1
+            if self._flusher_pid != os.getpid():
+                self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        # One per process: a forked worker starts its own on its first hit
+        self._flusher_pid = os.getpid()
+        self._stop_flusher = threading.Event()
+        threading.Thread(target=self._flush_periodically, args=(self._stop_flusher,),
+                         name="pattern-hit-flusher", daemon=True).start()
+
+    def _flush_periodically(self, stop: threading.Event) -> None:
+        while not stop.wait(HIT_FLUSH_INTERVAL):
+            try:
+                self.flush_hits()
+            except PatternStoreError as e:
+                logger.warning(f"Could not write pattern hit counts: {e}")
+
+    def flush_hits(self) -> None:
+        """Write the buffered hit counts, if the store has been opened in this process."""
+        with self._hits_lock:
+            if not self._hits or self._conn is None or self._pid != os.getpid():
+                return  # Kept until the store is opened here
+            hits, self._hits = self._hits, {}
+        now = time.time()
+        self._execute("UPDATE patterns SET hits = hits + ?, last_hit = ? WHERE id = ?",
+                      [(count, now, pattern_id) for pattern_id, count in hits.items()], many=True)
+
+    def hit_counts(self) -> Dict[str, int]:
+        """Return how many times each pattern has matched, for the patterns that have."""
+        self._connection()
+        self.flush_hits()
+        rows = self._execute("SELECT id, hits FROM patterns WHERE hits > 0")
+        return {row["id"]: row["hits"] for row in rows}
+
+    def discard_hits(self) -> None:
+        """Drop the buffered hit counts, such as those a forked worker inherited."""
+        with self._hits_lock:
+            self._hits = {}
+
+    def after_fork(self) -> None:
+        """Drop the counts a forked worker inherited; they belong to the parent."""
+        self._hits_lock = threading.Lock()  # Possibly held by a parent thread at the fork
+        self._hits = {}
+
+    def close(self) -> None:
+        self._stop_flusher.set()
+        self._flusher_pid = None
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                try:
+                    self.flush_hits()
+                except PatternStoreError:
+                    pass
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+
+def _seed_from_registry(store: PatternStore) -> None:
+    from app.data.error_patterns import REGISTRY
+
+    store.import_registry(REGISTRY)
+
+
+# Store behind pattern search and hit statistics
+PATTERN_STORE = PatternStore(seed=_seed_from_registry)
+
+# Counts buffered before a fork belong to the parent
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PATTERN_STORE.after_fork)
+
+
+def configure_store(path: str, registry) -> int:
+    """Use the SQLite file at path as the pattern store and load its own patterns into a registry.
+
+    The module patterns already in the registry are mirrored into the file
+    first. Returns how many patterns were loaded from the store.
+    """
+    PATTERN_STORE.close()
+    PATTERN_STORE.path = path
+    PATTERN_STORE.seed = None
+    PATTERN_STORE.import_registry(registry)
+    loaded = PATTERN_STORE.load_into(registry)
+    logger.info(f"Pattern store {path}: loaded {loaded} patterns")
+    return loaded
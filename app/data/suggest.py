@@ -0,0 +1,271 @@
+"""Error Signature Suggestion Module
+
+This module completes a partly typed error message with the signatures the
+patterns recognise, such as "TypeError: Cannot read properties of". A
+signature is the literal text a pattern's regex starts with: its leading
+literal characters, following every alternative of a group and both
+branches of an optional group, up to the first class, wildcard or other
+construct.
+
+Signatures are kept in a compressed trie (a radix tree: chains of nodes
+with one child are merged into one edge), keyed case-insensitively with
+whitespace collapsed. Completions under a prefix are ranked by how often
+their patterns have matched, counted by the pattern store and by this
+process since the trie was built.
+"""
+import re
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.data.analysis import (
+    AT, BRANCH, CATEGORY, IN, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN, sre_parse,
+)
+from app.data.patterns.base_pattern import ErrorPattern
+
+# Completions returned by default, and at most
+SUGGEST_LIMIT = 5
+MAX_SUGGEST_LIMIT = 20
+
+# Shortest signature offered, in characters
+MIN_SIGNATURE_LENGTH = 6
+
+# Most signatures taken from one pattern
+MAX_SIGNATURES_PER_PATTERN = 8
+
+# Widest character class of plain letters, like [Ii] or [LF], followed as alternatives
+MAX_CLASS_CHOICES = 4
+
+# Characters trimmed from the end of a signature, such as the quote before a captured name
+TRAILING_CHARS = " \t'\"`:;,.([{<-=/"
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prefix(text: str) -> str:
+    """Return the trie key for typed text: case-folded, whitespace collapsed, left-trimmed."""
+    return WHITESPACE_RE.sub(" ", text.casefold()).lstrip()
+
+
+def _is_whitespace(body) -> bool:
+    """Return whether a parsed repeat body matches only whitespace, like \\s or a space."""
+    if len(body) != 1:
+        return False
+    op, value = body[0]
+    if op is LITERAL:
+        return chr(value).isspace()
+    return op is IN and all(
+        (item_op is CATEGORY and str(item) == "CATEGORY_SPACE")
+        or (item_op is LITERAL and chr(item).isspace())
+        for item_op, item in value
+    )
+
+
+def _class_choices(items) -> List[str]:
+    """Return the characters of a small class made only of literals, one per letter case, or []."""
+    if not all(op is LITERAL for op, _ in items):
+        return []
+    by_case = {chr(value).casefold(): chr(value) for _, value in reversed(items)}
+    choices = list(by_case.values())[::-1]
+    return choices if len(choices) <= MAX_CLASS_CHOICES else []
+
+
+def _extend(heads: List[Tuple[str, bool]], parsed) -> List[Tuple[str, bool]]:
+    """Extend the open heads (text, open) with the literal text of a parsed regex."""
+    for op, value in parsed:
+        if not any(is_open for _, is_open in heads):
+            break
+        if op is LITERAL:
+            addition = [chr(value)]
+        elif op is AT:
+            continue
+        elif op is SUBPATTERN:
+            addition = [value[-1]]
+        elif op is BRANCH:
+            addition = list(value[1])
+        elif op is IN and _class_choices(value):
+            addition = _class_choices(value)
+        elif op in (MAX_REPEAT, MIN_REPEAT) and _is_whitespace(value[2]):
+            addition = [" "]  # Collapsed or trimmed later when the space is optional
+        elif op in (MAX_REPEAT, MIN_REPEAT) and value[:2] == (0, 1):
+            addition = [[], value[2]]  # An optional part, absent or present
+        else:
+            heads = [(text, False) for text, _ in heads]
+            break
+
+        extended = []
+        for text, is_open in heads:
+            if not is_open:
+                extended.append((text, False))
+                continue
+            for part in addition:
+                if isinstance(part, str):
+                    extended.append((text + part, True))
+                else:
+                    extended.extend(_extend([(text, True)], part))
+        heads = extended[:MAX_SIGNATURES_PER_PATTERN]
+    return heads
+
+
+def pattern_signatures(pattern: ErrorPattern) -> List[str]:
+    """Return the literal error signatures a pattern's regex starts with."""
+    try:
+        parsed = sre_parse.parse(pattern.source, pattern.flags)
+    except re.error:
+        return []
+    signatures = []
+    for text, _ in _extend([("", True)], parsed):
+        text = WHITESPACE_RE.sub(" ", text).strip().rstrip(TRAILING_CHARS)
+        text = text.replace(" :", ":")
+        if (len(text) < MIN_SIGNATURE_LENGTH or "\\" in text
+                or not any(char.isalpha() for char in text)):
+            continue
+        if normalize_prefix(text) not in map(normalize_prefix, signatures):
+            signatures.append(text)
+    return signatures
+
+
+class _Node:
+    __slots__ = ("label", "children", "signature")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children: Dict[str, "_Node"] = {}
+        self.signature: Optional["Signature"] = None
+
+
+class Signature:
+    """A completion: the text as written in the first pattern, and the patterns starting with it."""
+
+    __slots__ = ("text", "languages", "pattern_ids")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.languages: Tuple[str, ...] = ()
+        self.pattern_ids: Tuple[str, ...] = ()
+
+
+class SignatureTrie:
+    """Compressed trie of the error signatures of a set of patterns."""
+
+    def __init__(self, patterns: Iterable[ErrorPattern], hits: Optional[Dict[str, int]] = None):
+        self._root = _Node()
+        self.hits: Dict[str, int] = dict(hits or {})
+        self.signatures: List[Signature] = []
+        for pattern in patterns:
+            for text in pattern_signatures(pattern):
+                signature = self._insert(normalize_prefix(text), text)
+                if pattern.language not in signature.languages:
+                    signature.languages += (pattern.language,)
+                signature.pattern_ids += (pattern.id,)
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _insert(self, key: str, text: str) -> Signature:
+        node = self._root
+        while key:
+            child = node.children.get(key[0])
+            if child is None:
+                child = node.children[key[0]] = _Node(key)
+                node, key = child, ""
+                break
+            label = child.label
+            shared = 1
+            limit = min(len(label), len(key))
+            while shared < limit and label[shared] == key[shared]:
+                shared += 1
+            if shared < len(label):
+                # Split the edge where the new key leaves it
+                middle = node.children[key[0]] = _Node(label[:shared])
+                child.label = label[shared:]
+                middle.children[child.label[0]] = child
+                child = middle
+            node, key = child, key[shared:]
+        if node.signature is None:
+            node.signature = Signature(text)
+            self.signatures.append(node.signature)
+        return node.signature
+
+    def _find(self, key: str) -> Optional[_Node]:
+        """Return the node under which every key starting with `key` is found."""
+        node = self._root
+        while key:
+            child = node.children.get(key[0])
+            if child is None:
+                return None
+            label = child.label
+            if len(key) <= len(label):
+                return child if label.startswith(key) else None
+            if not key.startswith(label):
+                return None
+            node, key = child, key[len(label):]
+        return node
+
+    def signature_hits(self, signature: Signature) -> int:
+        return sum(self.hits.get(pattern_id, 0) for pattern_id in signature.pattern_ids)
+
+    def complete(self, prefix: str, language: Optional[str] = None,
+                 limit: int = SUGGEST_LIMIT) -> List[Dict[str, object]]:
+        """Return up to `limit` signatures starting with a prefix, most matched then shortest."""
+        key = normalize_prefix(prefix)
+        node = self._find(key) if key else None
+        if node is None:
+            return []
+        languages = None if language in (None, "auto", "general") else (language, "general")
+
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children.values())
+            signature = node.signature
+            if signature is not None and (languages is None or any(
+                    signature_language in languages for signature_language in signature.languages)):
+                found.append((-self.signature_hits(signature), len(signature.text),
+                              signature.text, signature))
+
+        return [
+            {"text": signature.text, "languages": list(signature.languages), "hits": -hits}
+            for hits, _, _, signature in heapq.nsmallest(limit, found)
+        ]
+
+    def record_hit(self, pattern_id: str) -> None:
+        self.hits[pattern_id] = self.hits.get(pattern_id, 0) + 1
+
+
+class SuggestionIndex:
+    """Signature trie over the registry's patterns, built on first use."""
+
+    def __init__(self):
+        self._trie: Optional[SignatureTrie] = None
+        self._lock = threading.Lock()
+
+    def trie(self) -> SignatureTrie:
+        if self._trie is None:
+            with self._lock:
+                if self._trie is None:
+                    from app.data.error_patterns import REGISTRY
+                    from app.data.store import PATTERN_STORE
+
+                    self._trie = SignatureTrie(REGISTRY, PATTERN_STORE.hit_counts())
+        return self._trie
+
+    def suggest(self, prefix: str, language: Optional[str] = None,
+                limit: int = SUGGEST_LIMIT) -> List[Dict[str, object]]:
+        """Return completions of a typed error message."""
+        return self.trie().complete(prefix, language, max(1, min(limit, MAX_SUGGEST_LIMIT)))
+
+    def record_hit(self, pattern_id: str) -> None:
+        """Count an answer served from a pattern, cached or not, once the trie is in use."""
+        if self._trie is not None:
+            self._trie.record_hit(pattern_id)
+
+    def reset(self) -> None:
+        """Rebuild the trie, with fresh counts from the store, on next use."""
+        with self._lock:
+            self._trie = None
+
+
+# Trie behind the type-ahead endpoint
+SUGGESTIONS = SuggestionIndex()
@@ -0,0 +1,279 @@
+"""Tenant Pattern Module
+
+This module lets each team add private patterns on top of the shared
+packs. A tenant's patterns are compiled into a small registry of their own,
+and an OverlayRegistry tries them before the shared registry's patterns.
+The shared registry is referenced, never copied or recompiled, so a tenant
+costs only the memory of its own patterns.
+
+Tenant definitions (patterns and API keys) are plain data and cheap to keep.
+Compiled overlays are built on a tenant's first request and kept in an LRU
+bounded by both the number of tenants and the estimated bytes of their
+compiled patterns; an evicted tenant is compiled again when it returns.
+
+Tenants are defined in a JSON file (TENANTS_FILE or `app.py --tenants`):
+
+    {"tenants": {"payments": {"api_keys": ["..."],
+                              "patterns": {"python": [{"regex": ..., "title": ...}]}}}}
+"""
+import sys
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.data.packs import LANGUAGE_PACKS
+from app.data.patterns.base_pattern import ErrorPattern
+from app.data.registry import MAX_DISPATCH_ORDERS, PatternRegistry
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Compiled tenant overlays kept at most, and their estimated size in bytes
+MAX_TENANTS = 64
+MAX_TENANT_BYTES = 32 * 1024 * 1024
+
+# Most patterns one tenant may define
+MAX_TENANT_PATTERNS = 500
+
+
+class UnknownTenant(LookupError):
+    """Raised for a tenant name or API key that is not defined."""
+
+
+def pattern_nbytes(pattern: ErrorPattern) -> int:
+    """Estimate the memory held by a compiled pattern: record, regex, text blob and indexes."""
+    size = sys.getsizeof(pattern)
+    for field in ("id", "regex", "prefix", "literals", "slots", "_cold"):
+        size += sys.getsizeof(getattr(pattern, field))
+    return size
+
+
+class OverlayRegistry:
+    """A tenant's patterns tried before those of the shared registry.
+
+    Offers the lookups the translator makes on a PatternRegistry. Orders of
+    candidates are combined from the two registries' own cached orders.
+    """
+
+    def __init__(self, tenant: str, version: int, base: PatternRegistry, overlay: PatternRegistry):
+        self.tenant = tenant
+        self.version = version
+        self.base = base
+        self.overlay = overlay
+        self.nbytes = sum(pattern_nbytes(pattern) for pattern in overlay)
+        self._orders: Dict[Tuple[str, Tuple[str, ...]], Tuple[ErrorPattern, ...]] = {}
+
+    @property
+    def cache_namespace(self) -> str:
+        """Distinguishes this tenant's cached translations, and those of its earlier definitions."""
+        return f"tenant:{self.tenant}:{self.version}"
+
+    def candidates(self, language: str, types: Tuple[str, ...]) -> Tuple[ErrorPattern, ...]:
+        if language not in self.overlay:
+            return self.base.candidates(language, types)
+        key = (language, types)
+        order = self._orders.get(key)
+        if order is None:
+            order = self.overlay.candidates(language, types) + self.base.candidates(language, types)
+            if len(self._orders) >= MAX_DISPATCH_ORDERS:
+                self._orders.clear()
+            self._orders[key] = order
+        return order
+
+    def patterns(self, language: str) -> Tuple[ErrorPattern, ...]:
+        return self.overlay.patterns(language) + self.base.patterns(language)
+
+    def languages_for_type(self, name: str) -> Tuple[str, ...]:
+        languages = self.overlay.languages_for_type(name) + self.base.languages_for_type(name)
+        return tuple(dict.fromkeys(languages))
+
+    def has_literals(self, language: str) -> bool:
+        return self.overlay.has_literals(language) or self.base.has_literals(language)
+
+    def languages(self) -> List[str]:
+        return list(dict.fromkeys(self.overlay.languages() + self.base.languages()))
+
+    def __contains__(self, language: str) -> bool:
+        return language in self.overlay or language in self.base
+
+    def __iter__(self) -> Iterator[ErrorPattern]:
+        yield from self.overlay
+        yield from self.base
+
+    def __len__(self) -> int:
+        return len(self.overlay) + len(self.base)
+
+
+class TenantRegistries:
+    """Tenant definitions, and an LRU of their compiled overlay registries."""
+
+    def __init__(self, base: Optional[PatternRegistry] = None, max_tenants: int = MAX_TENANTS,
+                 max_bytes: int = MAX_TENANT_BYTES):
+        self._base = base
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        # When set, the X-Tenant header is believed without an API key
+        self.trust_header = False
+        self._definitions: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._api_keys: Dict[str, str] = {}
+        self._compiled: "OrderedDict[str, OverlayRegistry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._compiling = SingleFlight()
+        self.stats = {"hits": 0, "compiled": 0, "evicted": 0}
+
+    @property
+    def base(self) -> PatternRegistry:
+        if self._base is None:
+            from app.data.error_patterns import REGISTRY
+
+            self._base = REGISTRY
+        return self._base
+
+    def define(self, tenant: str, patterns: Dict[str, List[Dict[str, Any]]], api_keys=()) -> None:
+        """Set a tenant's patterns by language and its API keys, replacing any earlier definition.
+
+        Every pattern is compiled once here, so a bad definition is refused
+        when it is loaded rather than on the tenant's first request.
+
+        Raises:
+            ValueError: the definition is malformed, has too many patterns, or
+                has a pattern that does not compile or whose language no pack provides
+        """
+        if not tenant or not isinstance(patterns, dict) or not all(
+                isinstance(items, list) and all(isinstance(item, dict) for item in items)
+                for items in patterns.values()):
+            raise ValueError(f"Tenant {tenant!r} needs a mapping of languages to lists of patterns")
+        if sum(len(items) for items in patterns.values()) > MAX_TENANT_PATTERNS:
+            raise ValueError(f"Tenant {tenant!r} has more than {MAX_TENANT_PATTERNS} patterns")
+        for language, items in patterns.items():
+            if language not in self.base and LANGUAGE_PACKS.pack(language) is None:
+                raise ValueError(
+                    f"Tenant {tenant!r} has patterns for unknown language {language!r}")
+            for index, data in enumerate(items):
+                try:
+                    ErrorPattern.from_dict(data, language)
+                except (KeyError, ValueError) as e:
+                    raise ValueError(
+                        f"Tenant {tenant!r} has an invalid {language} pattern #{index}: {e}") from e
+        with self._lock:
+            self._definitions[tenant] = {language: [dict(item) for item in items]
+                                         for language, items in patterns.items()}
+            self._versions[tenant] = self._versions.get(tenant, 0) + 1
+            self._api_keys = {key: owner for key, owner in self._api_keys.items()
+                              if owner != tenant}
+            self._api_keys.update((key, tenant) for key in api_keys)
+            self._compiled.pop(tenant, None)
+
+    def remove(self, tenant: str) -> None:
+        with self._lock:
+            self._definitions.pop(tenant, None)
+            self._api_keys = {key: owner for key, owner in self._api_keys.items()
+                              if owner != tenant}
+            self._compiled.pop(tenant, None)
+
+    def tenants(self) -> List[str]:
+        return list(self._definitions)
+
+    def tenant_for_key(self, api_key: str) -> str:
+        """Return the tenant an API key belongs to.
+
+        Raises:
+            UnknownTenant: the key belongs to no tenant
+        """
+        tenant = self._api_keys.get(api_key)
+        if tenant is None:
+            raise UnknownTenant("Unknown API key")
+        return tenant
+
+    def registry(self, tenant: str) -> OverlayRegistry:
+        """Return a tenant's compiled registry, compiling its overlay if it is not cached.
+
+        Raises:
+            UnknownTenant: the tenant is not defined
+        """
+        with self._lock:
+            compiled = self._compiled.get(tenant)
+            if compiled is not None:
+                self._compiled.move_to_end(tenant)
+                self.stats["hits"] += 1
+                return compiled
+            if tenant not in self._definitions:
+                raise UnknownTenant(f"Unknown tenant {tenant!r}")
+        # Concurrent first requests of a tenant share one compilation
+        return self._compiling.do(tenant, lambda: self._compile(tenant))
+
+    def _compile(self, tenant: str) -> OverlayRegistry:
+        with self._lock:
+            definition = self._definitions.get(tenant)
+            version = self._versions.get(tenant, 0)
+        if definition is None:
+            raise UnknownTenant(f"Unknown tenant {tenant!r}")
+
+        overlay = PatternRegistry()
+        for language, patterns in definition.items():
+            # Ids are prefixed with the tenant so they never collide with shared ones
+            overlay.add_language(language, [
+                dict(data, id=f"{tenant}/{data.get('id') or f'{language}:{index}'}")
+                for index, data in enumerate(patterns)
+            ])
+        compiled = OverlayRegistry(tenant, version, self.base, overlay)
+
+        with self._lock:
+            if self._versions.get(tenant) != version:
+                return compiled  # Redefined meanwhile: answer this request, cache nothing
+            self._compiled[tenant] = compiled
+            self.stats["compiled"] += 1
+            self._evict()
+        logger.info(f"Compiled {len(overlay)} patterns for tenant {tenant} "
+                    f"({compiled.nbytes} bytes)")
+        return compiled
+
+    def _evict(self) -> None:
+        """Drop least recently used overlays until both limits hold, keeping the newest one."""
+        while len(self._compiled) > 1 and (
+                len(self._compiled) > self.max_tenants or self.nbytes > self.max_bytes):
+            tenant, _ = self._compiled.popitem(last=False)
+            self.stats["evicted"] += 1
+            logger.debug(f"Evicted compiled patterns of tenant {tenant}")
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated bytes held by the compiled overlays."""
+        return sum(compiled.nbytes for compiled in self._compiled.values())
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, tenants=len(self._definitions), cached=len(self._compiled),
+                        bytes=self.nbytes)
+
+    def load_file(self, path: str) -> int:
+        """Define the tenants in a JSON file. Returns how many were defined.
+
+        Raises:
+            ValueError: the file is not a valid tenants file
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        tenants = data.get("tenants") if isinstance(data, dict) else None
+        if not isinstance(tenants, dict):
+            raise ValueError(f"{path} must hold an object with a 'tenants' mapping")
+        for tenant, definition in tenants.items():
+            if not isinstance(definition, dict):
+                raise ValueError(f"{path}: tenant {tenant!r} must be an object")
+            self.define(tenant, definition.get("patterns", {}), definition.get("api_keys", ()))
+        return len(tenants)
+
+
+# Private pattern sets of the teams using the service
+TENANTS = TenantRegistries()
+
+
+def configure_tenants(path: str, trust_header: bool = False) -> int:
+    """Load tenant definitions from a JSON file; trust_header accepts a bare X-Tenant header."""
+    TENANTS.trust_header = trust_header
+    count = TENANTS.load_file(path)
+    logger.info(f"Tenants {path}: defined {count} tenants")
+    return count
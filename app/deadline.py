@@ -0,0 +1,65 @@
+"""
+Request Deadlines
+
+This module provides the time budget carried through every stage of a
+translation. Stages check the remaining budget and switch to cheaper paths
+when it runs low, so a request finishes within its deadline with a degraded
+answer instead of finishing late with a complete one.
+"""
+import math
+import time
+from typing import Optional
+
+# Time budget for a translation requested over the API
+DEFAULT_REQUEST_BUDGET = 0.5  # seconds
+
+# Below this much remaining time, language detection uses keywords only
+DETECT_PATTERNS_MIN_BUDGET = 0.05  # seconds
+
+# Below this much remaining time, only prefiltered high-priority patterns run
+FULL_MATCH_MIN_BUDGET = 0.02  # seconds
+
+# Names of the degradations recorded in a response's "degraded" list
+KEYWORD_DETECTION = "keyword_detection"
+PREFILTERED_PATTERNS = "prefiltered_patterns"
+GENERAL_RESPONSE = "general_response"
+# Not a deadline stage: patterns disabled by the circuit breaker were skipped
+TRIPPED_PATTERNS = "tripped_patterns"
+
+
+class Deadline:
+    """A point in time (on the time.monotonic() clock) by which work must finish."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        """Create a deadline the given number of seconds from now (None for no deadline)."""
+        return cls(None if seconds is None else time.monotonic() + seconds)
+
+    def earliest(self, other: "Deadline") -> "Deadline":
+        """Return whichever of two deadlines comes first."""
+        if other.expires_at is None:
+            return self
+        if self.expires_at is None or other.expires_at < self.expires_at:
+            return other
+        return self
+
+    def remaining(self) -> float:
+        """Seconds left, negative once expired, infinite if there is no deadline."""
+        if self.expires_at is None:
+            return math.inf
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+# Deadline used when the caller sets none
+NO_DEADLINE = Deadline()
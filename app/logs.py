@@ -0,0 +1,180 @@
+"""
+Logging Pipeline
+
+This module keeps log I/O off the request threads. Records are put on a
+bounded in-memory queue and formatted and written by a background listener
+thread; when the queue is full new records are dropped rather than blocking
+a request. Per-request loggers are sampled by a token bucket so a traffic
+spike cannot flood the output, while warnings and errors always get through.
+Output is plain text or, for log shippers, one JSON object per line.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Format of plain text output
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Records held for the writer thread before new ones are dropped
+LOG_QUEUE_SIZE = 10000
+
+# Per-request records let through per second (and the burst allowed)
+REQUEST_LOG_RATE = 10.0
+
+# Logger for records written once or more per request
+REQUEST_LOGGER = logging.getLogger("app.requests")
+
+# Loggers whose INFO and DEBUG records are sampled: ours and the server's access log
+SAMPLED_LOGGERS = ("app.requests", "werkzeug")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets at most `rate` records per second through, with bursts of up to `rate`.
+
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate: float = REQUEST_LOG_RATE):
+        super().__init__()
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.dropped += 1
+            return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Puts records on the queue unformatted, dropping them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener formats the record, so the message is never built on a request thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The queue, its handler on the root logger and the writer thread."""
+
+    def __init__(self):
+        self.handler: Optional[DroppingQueueHandler] = None
+        self.output: Optional[logging.Handler] = None
+        self.listener: Optional[QueueListener] = None
+        self.sampler: Optional[SamplingFilter] = None
+
+    def start(self, output: logging.Handler, queue_size: int, request_rate: float) -> None:
+        self.stop()
+        self.output = output
+        self.handler = DroppingQueueHandler(queue.Queue(queue_size))
+        self.sampler = SamplingFilter(request_rate)
+        self._start_listener()
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        for name in SAMPLED_LOGGERS:
+            logging.getLogger(name).addFilter(self.sampler)
+
+    def _start_listener(self) -> None:
+        self.listener = QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+    def after_fork(self) -> None:
+        """Give a forked child its own queue and writer thread, as the parent's did not survive."""
+        if self.listener is None:
+            return
+        self.handler.queue = queue.Queue(self.handler.queue.maxsize)
+        self._start_listener()
+
+    def stop(self) -> None:
+        """Write the queued records and stop the writer thread."""
+        if self.listener is not None:
+            try:
+                self.listener.stop()
+            except RuntimeError:
+                pass  # Already stopped
+            self.listener = None
+        if self.handler is not None:
+            logging.getLogger().removeHandler(self.handler)
+        if self.sampler is not None:
+            for name in SAMPLED_LOGGERS:
+                logging.getLogger(name).removeFilter(self.sampler)
+
+    @property
+    def stats(self):
+        return {
+            "queue_dropped": self.handler.dropped if self.handler else 0,
+            "sampled_out": self.sampler.dropped if self.sampler else 0,
+        }
+
+
+# Pipeline installed by configure_logging()
+LOG_PIPELINE = LogPipeline()
+
+atexit.register(LOG_PIPELINE.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=LOG_PIPELINE.after_fork)
+
+
+def configure_logging(level: int = logging.INFO, json_output: bool = False,
+                      request_rate: float = REQUEST_LOG_RATE, stream=None,
+                      queue_size: int = LOG_QUEUE_SIZE) -> None:
+    """Send every log record through the queue to a background writer.
+
+    Args:
+        level: lowest level logged
+        json_output: write JSON lines instead of plain text
+        request_rate: per-request records let through per second
+        stream: where records are written (default sys.stderr)
+        queue_size: records held before new ones are dropped
+    """
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter(LOG_FORMAT))
+    LOG_PIPELINE.start(output, queue_size, request_rate)
+    logging.getLogger().setLevel(level)
@@ -0,0 +1,89 @@
+"""
+Preprocessed Error Messages
+
+This module holds the Message object built once per request from the
+sanitized error text. Every later stage (language detection, prefiltering,
+pattern matching, rendering and caching) reads the derived data it needs
+from the Message instead of deriving it again from the text.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from app.cache import fingerprint
+from app.data.packs import LANGUAGE_PACKS
+from app.data.registry import exception_types
+
+# Fields derived from the text on first use
+_DERIVED_FIELDS = ("_fingerprint", "_folded", "_exception_types", "_file_extensions")
+
+
+class Message:
+    """An error message sanitized and analysed once, shared by every pipeline stage.
+
+    The text, requested language and kept windows are set when the message is
+    built. The cache fingerprint, case-folded text, exception types and file
+    extensions are derived the first time a stage asks for them and then kept.
+    Messages are immutable and compare and hash by text and language, so they
+    can key caches.
+    """
+
+    __slots__ = ("text", "language", "windows") + _DERIVED_FIELDS
+
+    def __init__(self, text: str, language: str = "auto",
+                 windows: Optional[List[Dict[str, object]]] = None):
+        set_field = object.__setattr__
+        set_field(self, "text", text)
+        set_field(self, "language", language)
+        set_field(self, "windows", tuple(windows or ()))
+        for name in _DERIVED_FIELDS:
+            set_field(self, name, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Message is immutable")
+
+    def _derive(self, name: str, value):
+        object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def fingerprint(self) -> str:
+        """The cache key of the text under the requested language."""
+        if self._fingerprint is None:
+            return self._derive("_fingerprint", fingerprint(self.text, self.language))
+        return self._fingerprint
+
+    @property
+    def folded(self) -> str:
+        """The text case-folded, for keyword checks and literal pattern search."""
+        if self._folded is None:
+            return self._derive("_folded", self.text.casefold())
+        return self._folded
+
+    @property
+    def exception_types(self) -> Tuple[str, ...]:
+        """Lowercased exception identifiers in the text, in order of appearance."""
+        if self._exception_types is None:
+            return self._derive("_exception_types", exception_types(self.text))
+        return self._exception_types
+
+    @property
+    def file_extensions(self) -> Tuple[str, ...]:
+        """The file extensions declared by the language packs that occur in the text."""
+        if self._file_extensions is None:
+            extensions = LANGUAGE_PACKS.file_extensions()
+            found = tuple(ext for ext in extensions if ext in self.text)
+            return self._derive("_file_extensions", found)
+        return self._file_extensions
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self.text == other.text and self.language == other.language
+
+    def __hash__(self) -> int:
+        return hash((self.text, self.language))
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __repr__(self) -> str:
+        return f"Message(language={self.language!r}, text={self.text[:40]!r})"
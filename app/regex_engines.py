@@ -0,0 +1,291 @@
+"""
+Regex Engine Backends
+
+This module lets each error pattern run on the regex engine that suits it:
+the standard library's backtracking ``re``, the third-party ``regex`` module
+(which supports match timeouts) and RE2 (linear time, no backtracking) through
+the ``re2`` module. The optional engines are used only when installed.
+
+When patterns are compiled, each is checked against every available engine.
+Patterns without nested quantifiers or chained wildcards cannot backtrack
+catastrophically and stay on ``re``, which is the fastest engine for the short
+messages translated here. The rest go to the first installed, compatible
+engine in ENGINE_PREFERENCE, falling back to ``re`` with a warning when there
+is none.
+"""
+import re
+import logging
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import regex as regex_module
+except ImportError:  # Optional dependency
+    regex_module = None
+
+try:
+    import re2 as re2_module
+except ImportError:  # Optional dependency
+    re2_module = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single search may run on an engine that supports timeouts
+MATCH_TIMEOUT = 0.05
+
+# Engines tried, in order, for patterns that could backtrack catastrophically
+ENGINE_PREFERENCE = ("re2", "regex")
+
+# Characters that repeat the preceding item
+QUANTIFIERS = "*+{"
+
+# re flags and the inline letters RE2 takes them as
+INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.DOTALL, "s"), (re.MULTILINE, "m"))
+
+# Escapes that match a class of characters rather than one literal character
+CLASS_ESCAPES = "dDsSwWbBAZ"
+
+
+class RegexEngineError(ValueError):
+    """Raised when an engine cannot compile a pattern."""
+
+
+class CompiledRegex:
+    """A pattern compiled by a non-stdlib engine, exposing the subset of re.Pattern used here."""
+
+    __slots__ = ("pattern", "groups", "engine", "_search")
+
+    def __init__(self, pattern: str, groups: int, engine: str, search):
+        self.pattern = pattern
+        self.groups = groups
+        self.engine = engine
+        self._search = search
+
+    def search(self, text: str):
+        return self._search(text)
+
+    def __repr__(self) -> str:
+        return f"CompiledRegex({self.pattern!r}, engine={self.engine!r})"
+
+
+class RegexEngine:
+    """Interface for regex engines.
+
+    Subclasses set ``name``, whether they are ``available``, whether their
+    searches run in linear time (``linear``) or are cut off after a timeout
+    (``bounded``), and implement compile(). Patterns that could backtrack
+    catastrophically run only on engines that are one or the other.
+    """
+
+    name = ""
+    available = False
+    linear = False
+    bounded = False
+
+    def compile(self, source: str, flags: int):
+        """Compile a pattern with re flags; raise RegexEngineError if it is unsupported."""
+        raise NotImplementedError
+
+    def compatible(self, source: str, flags: int) -> bool:
+        """Return whether the engine can compile a pattern."""
+        try:
+            self.compile(source, flags)
+        except RegexEngineError:
+            return False
+        return True
+
+
+class StdlibEngine(RegexEngine):
+    """Python's backtracking re module."""
+
+    name = "re"
+    available = True
+
+    def compile(self, source: str, flags: int):
+        try:
+            return re.compile(source, flags)
+        except re.error as e:
+            raise RegexEngineError(str(e)) from e
+
+
+class RegexModuleEngine(RegexEngine):
+    """The regex module, whose searches are cut off after MATCH_TIMEOUT."""
+
+    name = "regex"
+    available = regex_module is not None
+    bounded = True
+
+    def __init__(self, timeout: float = MATCH_TIMEOUT):
+        self.timeout = timeout
+
+    def compile(self, source: str, flags: int):
+        if regex_module is None:
+            raise RegexEngineError("regex module is not installed")
+        engine_flags = regex_module.VERSION0
+        if flags & re.IGNORECASE:
+            engine_flags |= regex_module.IGNORECASE
+        if flags & re.DOTALL:
+            engine_flags |= regex_module.DOTALL
+        if flags & re.MULTILINE:
+            engine_flags |= regex_module.MULTILINE
+        try:
+            compiled = regex_module.compile(source, engine_flags)
+        except regex_module.error as e:
+            raise RegexEngineError(str(e)) from e
+
+        timeout = self.timeout
+
+        def search(text):
+            try:
+                return compiled.search(text, timeout=timeout)
+            except TimeoutError:
+                logger.warning(f"Pattern search timed out after {timeout}s: {source[:60]!r}")
+                return None
+
+        return CompiledRegex(source, compiled.groups, self.name, search)
+
+
+class RE2Engine(RegexEngine):
+    """RE2 through the re2 module: linear time, without backreferences or lookaround."""
+
+    name = "re2"
+    available = re2_module is not None
+    linear = True
+
+    def compile(self, source: str, flags: int):
+        if re2_module is None:
+            raise RegexEngineError("re2 module is not installed")
+        inline = "".join(letter for flag, letter in INLINE_FLAGS if flags & flag)
+        try:
+            compiled = re2_module.compile(f"(?{inline}){source}" if inline else source)
+        except Exception as e:  # re2 bindings differ in the error type they raise
+            raise RegexEngineError(str(e)) from e
+        return CompiledRegex(source, compiled.groups, self.name, compiled.search)
+
+
+# Every engine, keyed by name
+ENGINES: Dict[str, RegexEngine] = {
+    engine.name: engine for engine in (StdlibEngine(), RegexModuleEngine(), RE2Engine())
+}
+
+
+def has_nested_quantifier(source: str) -> bool:
+    """Return True if a quantified group itself contains a quantifier, as in (a+)+.
+
+    Nested quantifiers are what makes backtracking engines take exponential time.
+    """
+    stack: List[bool] = []  # Whether each open group contains a quantifier
+    contains = False
+    closed_group = None
+    in_class = False
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            closed_group = None
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            closed_group = None
+        elif char == "(":
+            stack.append(contains)
+            contains = False
+            closed_group = None
+        elif char == ")":
+            closed_group = contains
+            contains = (stack.pop() if stack else False) or contains
+        elif char in QUANTIFIERS:
+            if closed_group:
+                return True
+            contains = True
+            closed_group = None
+        else:
+            closed_group = None
+        i += 1
+    return False
+
+
+def has_wildcard_chain(source: str) -> bool:
+    r"""Return True if two unbounded wildcards have no literal between them, as in .*?(\w+).*?x.
+
+    A failing search then tries every way of splitting the text between the
+    wildcards, which takes polynomial time. A required literal character
+    between them limits the splits to its occurrences. Literals inside
+    optional groups are counted as required, so a chain written that way is
+    not detected.
+    """
+    wildcard = False
+    i = 0
+    while i < len(source):
+        char = source[i]
+        literal = False
+        if char == "\\":
+            literal = source[i + 1:i + 2] not in CLASS_ESCAPES
+            i += 2
+        elif char == "[":
+            i += 2 if source[i + 1:i + 2] == "^" else 1
+            if source[i:i + 1] == "]":
+                i += 1  # A leading ] belongs to the class
+            while i < len(source) and source[i] != "]":
+                i += 2 if source[i] == "\\" else 1
+            i += 1
+        elif char == "(":
+            i += 1
+            if source[i:i + 2] in ("?:", "?=", "?!"):
+                i += 2
+            elif source[i:i + 3] in ("?<=", "?<!"):
+                i += 3
+            elif source[i:i + 3] == "?P<":
+                i = source.find(">", i) + 1
+            continue
+        elif char == "|":
+            wildcard = False
+            i += 1
+            continue
+        elif char == ".":
+            i += 1
+            if source[i:i + 1] in ("*", "+"):
+                if wildcard:
+                    return True
+                wildcard = True
+            continue
+        else:
+            literal = char not in "^$)?*+{}"
+            i += 1
+        if literal and source[i:i + 1] not in ("*", "?") and source[i:i + 2] != "{0":
+            wildcard = False
+    return False
+
+
+def available_engines() -> List[str]:
+    """Return the names of the installed engines."""
+    return [name for name, engine in ENGINES.items() if engine.available]
+
+
+def select_engine(source: str, flags: int,
+                  preference: Optional[Iterable[str]] = None) -> RegexEngine:
+    """Pick the engine a pattern runs on.
+
+    Args:
+        source: the regular expression
+        flags: re flags it is compiled with
+        preference: engine names to try in order for patterns that could
+            backtrack catastrophically (default ENGINE_PREFERENCE)
+    """
+    if not has_nested_quantifier(source) and not has_wildcard_chain(source):
+        return ENGINES["re"]
+    for name in preference or ENGINE_PREFERENCE:
+        engine = ENGINES.get(name)
+        if (engine is not None and engine.available and (engine.linear or engine.bounded)
+                and engine.compatible(source, flags)):
+            return engine
+    logger.warning(f"No linear-time or bounded engine available for pattern that could "
+                   f"backtrack: {source[:60]!r}")
+    return ENGINES["re"]
+
+
+def compile_pattern(source: str, flags: int, preference: Optional[Iterable[str]] = None):
+    """Compile a pattern on the engine select_engine() picks for it."""
+    return select_engine(source, flags, preference).compile(source, flags)
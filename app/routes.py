@@ -0,0 +1,190 @@
+"""
+Routes for the Error Message Translator application.
+
+This module registers the page and JSON API routes on the Flask application.
+"""
+import time
+from functools import wraps
+
+from flask import abort, g, jsonify, render_template, request
+from werkzeug.exceptions import ServiceUnavailable
+
+from app.web import app
+from app.admission import ADMISSION, Overloaded
+from app.breaker import BREAKER
+from app.cache import TRANSLATION_CACHE
+from app.data.packs import LANGUAGE_PACKS
+from app.data.store import PATTERN_STORE, SEARCH_LIMIT
+from app.data.suggest import SUGGEST_LIMIT, SUGGESTIONS
+from app.data.tenants import TENANTS, UnknownTenant
+from app.deadline import DEFAULT_REQUEST_BUDGET, Deadline
+from app.tracing import TRACER, current_trace, span
+from app.translator import COALESCER, translate_error, translate_errors
+
+# Most error messages accepted in one batch request
+MAX_BATCH_SIZE = 50
+
+# Offered before the languages of the pattern packs
+AUTO_LANGUAGE = {"id": "auto", "name": "Auto-detect"}
+
+
+def _json_body():
+    """Return the request body as a dict, rejecting anything else with a 400."""
+    with span("parse"):
+        data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, description="Request body must be a JSON object")
+    return data
+
+
+def _client_deadline():
+    """Return the client's deadline, or a deadline that never expires if it sent none.
+
+    Clients send either X-Request-Timeout (seconds left, measured from when the
+    request arrives) or X-Request-Deadline (absolute Unix time in seconds).
+    """
+    now = time.monotonic()
+    deadlines = []
+    try:
+        if "X-Request-Timeout" in request.headers:
+            deadlines.append(now + float(request.headers["X-Request-Timeout"]))
+        if "X-Request-Deadline" in request.headers:
+            deadlines.append(now + float(request.headers["X-Request-Deadline"]) - time.time())
+    except ValueError:
+        abort(400, description="Request deadline headers must be numbers")
+    return Deadline(min(deadlines) if deadlines else None)
+
+
+def _tenant_registry():
+    """Return the registry of the tenant making the request, or None for the shared patterns.
+
+    The tenant is the owner of the X-API-Key header, or the X-Tenant header
+    itself when the server trusts it (behind a proxy that authenticates).
+    """
+    try:
+        if "X-API-Key" in request.headers:
+            return TENANTS.registry(TENANTS.tenant_for_key(request.headers["X-API-Key"]))
+        if "X-Tenant" in request.headers and TENANTS.trust_header:
+            return TENANTS.registry(request.headers["X-Tenant"])
+    except UnknownTenant as e:
+        abort(401 if "X-API-Key" in request.headers else 404, description=str(e))
+    return None
+
+
+def admission_controlled(view):
+    """Run a view only when the admission controller grants it a work slot.
+
+    Once admitted, the earlier of the client's deadline and the server's own
+    translation budget is stored as g.deadline for the view to pass on.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        client_deadline = _client_deadline()
+        try:
+            with ADMISSION.admit(client_deadline):
+                g.deadline = Deadline.after(DEFAULT_REQUEST_BUDGET).earliest(client_deadline)
+                return view(*args, **kwargs)
+        except Overloaded as e:
+            raise ServiceUnavailable(description=str(e), retry_after=e.retry_after)
+    return wrapper
+
+
+@app.before_request
+def start_trace():
+    """Trace API requests when tracing is enabled."""
+    if TRACER.enabled and request.path.startswith("/api/"):
+        g.trace_token = TRACER.start(f"{request.method} {request.path}")
+
+
+@app.after_request
+def add_server_timing(response):
+    """Report the time spent in each stage of a traced request."""
+    trace = current_trace()
+    if trace is not None and TRACER.server_timing:
+        trace.finish()
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def end_trace(error=None):
+    """Export the trace of the request that just ended."""
+    token = g.pop("trace_token", None)
+    if token is not None:
+        TRACER.end(token)
+
+
+@app.route("/")
+def index():
+    """Render the main page of the application."""
+    # Render and return the main HTML template with hasattr included in the context
+    return render_template("index.html", hasattr=hasattr)
+
+
+@app.route("/api/languages")
+def languages():
+    """Return the languages that can be selected for translation, from the installed packs."""
+    packs = [{"id": pack.language, "name": pack.name} for pack in LANGUAGE_PACKS.packs()]
+    return jsonify([AUTO_LANGUAGE] + packs)
+
+
+@app.route("/api/translate", methods=["POST"])
+@admission_controlled
+def translate():
+    """Translate a single error message."""
+    data = _json_body()
+    result = translate_error(data.get("error_message", ""), data.get("language", "auto"),
+                             deadline=g.deadline, registry=_tenant_registry())
+    with span("serialize"):
+        return jsonify(result)
+
+
+@app.route("/api/translate/batch", methods=["POST"])
+@admission_controlled
+def translate_batch():
+    """Translate several error messages in one request."""
+    data = _json_body()
+    errors = data.get("errors")
+    if not isinstance(errors, list) or not all(isinstance(item, dict) for item in errors):
+        abort(400, description="'errors' must be a list of objects")
+    if len(errors) > MAX_BATCH_SIZE:
+        abort(400, description=f"At most {MAX_BATCH_SIZE} errors can be translated per request")
+    results = translate_errors(
+        [(item.get("error_message", ""), item.get("language", "auto")) for item in errors],
+        deadline=g.deadline,
+        registry=_tenant_registry(),
+    )
+    with span("serialize"):
+        return jsonify({"results": results})
+
+
+@app.route("/api/patterns/search")
+def search_patterns():
+    """Full-text search over pattern titles, explanations and related errors."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        abort(400, description="Query parameter 'q' is required")
+    language = request.args.get("language") or None
+    limit = request.args.get("limit", SEARCH_LIMIT, type=int)
+    return jsonify({"query": query, "results": PATTERN_STORE.search(query, language, limit)})
+
+
+@app.route("/api/suggest")
+def suggest():
+    """Complete a partly typed error message with known error signatures, most matched first."""
+    prefix = request.args.get("prefix", "")
+    language = request.args.get("language") or None
+    limit = request.args.get("limit", SUGGEST_LIMIT, type=int)
+    return jsonify({"prefix": prefix, "suggestions": SUGGESTIONS.suggest(prefix, language, limit)})
+
+
+@app.route("/api/metrics")
+def metrics():
+    """Return runtime counters for monitoring."""
+    return jsonify({
+        "cache": dict(TRANSLATION_CACHE.stats),
+        "coalescing": dict(COALESCER.stats),
+        "admission": ADMISSION.stats,
+        "breaker": dict(BREAKER.stats, tripped=BREAKER.tripped()),
+        "tenants": TENANTS.metrics(),
+    })
@@ -0,0 +1,233 @@
+"""
+Pre-forking production server.
+
+The master process loads and warms the pattern registry once, freezes the
+heap so the pattern memory stays copy-on-write shared, and forks worker
+processes that each serve requests from a listening socket. Crashed workers
+are restarted by the master.
+"""
+import gc
+import os
+import time
+import signal
+import socket
+import logging
+from typing import Dict, List, Optional
+
+from werkzeug.serving import make_server
+
+from app.cache import disable_shared_cache, enable_shared_cache
+from app.sharding import enable_sharding
+
+logger = logging.getLogger(__name__)
+
+# Minimum delay between restarts of the same worker slot, to avoid a crash loop
+RESTART_DELAY = 1.0  # seconds
+
+# How often the master checks for exited workers
+SUPERVISE_INTERVAL = 0.1  # seconds
+
+# Seconds to wait for workers to exit before they are killed on shutdown
+SHUTDOWN_TIMEOUT = 10.0
+
+# Pending connection queue size for each listening socket
+LISTEN_BACKLOG = 128
+
+# One sample message per language, used to warm the translator before forking
+WARM_UP_MESSAGES = {
+    "python": "NameError: name 'x' is not defined",
+    "javascript": "Uncaught ReferenceError: x is not defined",
+    "java": "Exception in thread \"main\" java.lang.NullPointerException",
+    "ruby": "NoMethodError: undefined method `x' for nil:NilClass",
+    "html": "Stray end tag div",
+    "css": "Unknown property: colour",
+    "general": "Permission denied",
+}
+
+
+def warm_up() -> None:
+    """Exercise the translator so lazily built state exists before forking."""
+    from app.data.similarity import SIMILARITY_INDEX
+    from app.data.suggest import SUGGESTIONS
+    from app.translator import translate_error
+
+    for language, message in WARM_UP_MESSAGES.items():
+        translate_error(message, language)
+        translate_error(message, "auto")
+    SIMILARITY_INDEX.index()
+    SUGGESTIONS.trie()
+
+
+def create_listeners(host: str, port: int, count: int) -> List[socket.socket]:
+    """Create the listening sockets shared by the workers.
+
+    With SO_REUSEPORT every worker gets its own socket bound to the same
+    address, so the kernel balances connections between them. Without it a
+    single socket is created and all workers accept from it.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    listeners = []
+    for _ in range(count if reuse_port else 1):
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(LISTEN_BACKLOG)
+        sock.set_inheritable(True)
+        listeners.append(sock)
+        # Later sockets must bind to the port picked for the first one
+        port = sock.getsockname()[1]
+    return listeners
+
+
+class PreforkServer:
+    """Master process that supervises a fixed number of forked workers."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 5001,
+                 workers: Optional[int] = None, threaded: bool = True, shared_cache: bool = False,
+                 shards: int = 0, shard_by: str = "hash"):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.worker_count = max(1, workers or os.cpu_count() or 1)
+        self.threaded = threaded
+        self.shared_cache = shared_cache
+        self.shards = shards
+        self.shard_by = shard_by
+        self.listeners: List[socket.socket] = []
+        self.workers: Dict[int, int] = {}  # pid -> worker slot
+        self.last_started: Dict[int, float] = {}  # worker slot -> start time
+        self.stopping = False
+
+    def listener_for(self, slot: int) -> socket.socket:
+        """Return the listening socket used by a worker slot."""
+        return self.listeners[slot % len(self.listeners)]
+
+    def spawn(self, slot: int) -> int:
+        """Fork a worker for a slot and return its pid."""
+        delay = self.last_started.get(slot, 0) + RESTART_DELAY - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.last_started[slot] = time.monotonic()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self.run_worker(slot)
+            except BaseException:
+                logger.exception(f"Worker {slot} failed")
+                status = 1
+            finally:
+                # Never return into the master's code path
+                os._exit(status)
+        self.workers[pid] = slot
+        logger.info(f"Started worker {slot} (pid {pid})")
+        return pid
+
+    def run_worker(self, slot: int) -> None:
+        """Serve requests from this worker's listening socket until terminated."""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # The master handles Ctrl-C
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        listener = self.listener_for(slot)
+        for other in self.listeners:
+            if other is not listener:
+                other.close()
+
+        # Each worker scatters to its own shard processes, forked from it
+        if self.shards:
+            enable_sharding(self.shards, self.shard_by)
+
+        server = make_server(self.host, self.port, self.app, threaded=self.threaded,
+                             fd=listener.fileno())
+        server.serve_forever()
+
+    def stop(self, signum=None, frame=None) -> None:
+        """Ask the master to shut down its workers and exit."""
+        self.stopping = True
+
+    def terminate_workers(self) -> None:
+        """Send SIGTERM to every worker and wait for them, killing stragglers."""
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.workers.pop(pid, None)
+            else:
+                time.sleep(0.05)
+
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
+
+    def serve_forever(self) -> None:
+        """Warm up, fork the workers and restart any that exit until stopped."""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The pre-forking server requires os.fork()")
+
+        self.listeners = create_listeners(self.host, self.port, self.worker_count)
+        self.port = self.listeners[0].getsockname()[1]
+
+        # The shared cache must exist before forking so every worker maps it
+        if self.shared_cache:
+            enable_shared_cache()
+
+        warm_up()
+        # Move everything allocated so far out of the collector's reach so that
+        # garbage collection in the workers doesn't touch (and copy) shared pages
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for slot in range(self.worker_count):
+            self.spawn(slot)
+        logger.info(f"Serving on http://{self.host}:{self.port} with {self.worker_count} workers")
+
+        try:
+            while not self.stopping:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if not pid:
+                    time.sleep(SUPERVISE_INTERVAL)
+                    continue
+
+                slot = self.workers.pop(pid, None)
+                if slot is None or self.stopping:
+                    continue
+                logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                self.spawn(slot)
+        finally:
+            self.terminate_workers()
+            for listener in self.listeners:
+                listener.close()
+            if self.shared_cache:
+                disable_shared_cache()
+
+
+def serve(app, host: str = "127.0.0.1", port: int = 5001, workers: Optional[int] = None,
+          shared_cache: bool = False, shards: int = 0, shard_by: str = "hash") -> None:
+    """Run the application with the pre-forking server."""
+    PreforkServer(app, host=host, port=port, workers=workers, shared_cache=shared_cache,
+                  shards=shards, shard_by=shard_by).serve_forever()
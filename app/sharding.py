@@ -0,0 +1,312 @@
+"""
+Sharded Pattern Matching
+
+This module splits the pattern registry across a pool of worker processes so
+that a very large registry is scanned in parallel. Each shard owns the
+patterns assigned to it by hash of the pattern id or by language. A request
+is scattered to the shards that own patterns for its language; each returns
+the position of its first matching pattern in the language's candidate order
+and the lowest position wins, so the result is the same as a single-process
+scan.
+
+Shards are forked from the process that starts them and inherit its
+registry. Each request carries the patterns the circuit breaker has tripped,
+which the shards skip, and the shards send back the search times the breaker
+needs, so a slow pattern trips the same way as in a single-process scan. A
+shard that dies is forked again.
+
+Each request pays an inter-process round trip (about 0.1 ms), so sharding
+only pays off once a language has more patterns than the README's threshold
+(see ``scripts/benchmark.py shards``).
+"""
+import os
+import time
+import zlib
+import signal
+import logging
+import itertools
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.breaker import BREAKER
+
+logger = logging.getLogger(__name__)
+
+# Ways of assigning patterns to shards
+SHARD_STRATEGIES = ("hash", "language")
+
+# Seconds to wait for every shard to answer before scanning locally instead
+SHARD_TIMEOUT = 1.0
+
+# Least seconds between restarts of a shard that keeps dying
+RESTART_BACKOFF = 1.0
+
+
+class ShardError(Exception):
+    """Raised when the shards cannot answer a request."""
+
+
+def shard_of(pattern, shards: int, strategy: str) -> int:
+    """Return the shard a pattern belongs to."""
+    key = pattern.language if strategy == "language" else pattern.id
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def _shard_main(conn, index: int, shards: int, strategy: str) -> None:
+    """Answer match requests for the patterns one shard owns until the pipe closes."""
+    from app.data.error_patterns import REGISTRY
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl-C
+    owned = {pattern.id for pattern in REGISTRY if shard_of(pattern, shards, strategy) == index}
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        request_id, text, language, types, skip, watch, threshold = request
+        folded = text.casefold() if REGISTRY.has_literals(language) else None
+        found = None
+        first_skipped = None
+        timings = []
+        for rank, pattern in enumerate(REGISTRY.candidates(language, types)):
+            if pattern.id not in owned:
+                continue
+            if pattern.id in skip:
+                if first_skipped is None:
+                    first_skipped = (rank, pattern.id)
+                continue
+            started = time.perf_counter()
+            if pattern.literals is None:
+                matched = pattern.regex.search(text)
+            else:
+                matched = pattern.search(text, folded)
+            duration = time.perf_counter() - started
+            # Only the times that can change the breaker's state are sent back
+            if duration >= threshold or pattern.id in watch:
+                timings.append((pattern.id, duration))
+            if matched:
+                found = rank
+                break
+        conn.send((request_id, found, timings, first_skipped))
+
+
+class _Gather:
+    """Collects the answers of the shards a request was sent to."""
+
+    __slots__ = ("remaining", "best", "timings", "first_skipped", "failed", "done")
+
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+        self.best: Optional[int] = None
+        self.timings: List[Tuple[str, float]] = []
+        self.first_skipped: Optional[Tuple[int, str]] = None
+        self.failed = False
+        self.done = threading.Event()
+
+
+class _Shard:
+    """Parent-side handle of one shard process."""
+
+    def __init__(self, index: int, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.started_at = time.monotonic()
+
+
+class ShardPool:
+    """Pool of shard processes that scan the registry in parallel."""
+
+    def __init__(self, timeout: float = SHARD_TIMEOUT):
+        self.timeout = timeout
+        self.strategy = "hash"
+        self._count = 0
+        self._shards: Tuple[_Shard, ...] = ()
+        self._language_shards: Dict[str, Tuple[_Shard, ...]] = {}
+        self._pending: Dict[int, _Gather] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.stats = {"requests": 0, "failures": 0, "restarts": 0}
+
+    @property
+    def active(self) -> bool:
+        return bool(self._shards)
+
+    def start(self, shards: Optional[int] = None, strategy: str = "hash") -> None:
+        """Fork the shard processes. The registry must be fully loaded first."""
+        from app.data.error_patterns import REGISTRY
+
+        if strategy not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown shard strategy {strategy!r}, "
+                             f"expected one of {SHARD_STRATEGIES}")
+        self.stop()
+        count = max(1, shards or os.cpu_count() or 1)
+        started = [_Shard(index, *_fork_shard(index, count, strategy)) for index in range(count)]
+
+        owners: Dict[str, Set[int]] = {}
+        for pattern in REGISTRY:
+            owners.setdefault(pattern.language, set()).add(shard_of(pattern, count, strategy))
+        self.strategy = strategy
+        self._count = count
+        self._language_shards = {
+            language: tuple(started[index] for index in sorted(indexes))
+            for language, indexes in owners.items()
+        }
+        self._shards = tuple(started)
+        for shard in started:
+            threading.Thread(target=self._receive, args=(shard,),
+                             name=f"shard-reader-{shard.index}", daemon=True).start()
+        logger.info(f"Started {count} pattern shards by {strategy}")
+
+    def _receive(self, shard: _Shard) -> None:
+        """Deliver a shard's answers to the requests waiting for them, restarting it if it dies."""
+        while True:
+            try:
+                request_id, rank, timings, first_skipped = shard.conn.recv()
+            except (EOFError, OSError):
+                if not self._restart(shard):
+                    return
+                continue
+            with self._lock:
+                gather = self._pending.get(request_id)
+                if gather is None:
+                    continue  # The request already gave up
+                if rank is not None and (gather.best is None or rank < gather.best):
+                    gather.best = rank
+                gather.timings.extend(timings)
+                if first_skipped is not None and (gather.first_skipped is None
+                                                  or first_skipped < gather.first_skipped):
+                    gather.first_skipped = first_skipped
+                gather.remaining -= 1
+                if gather.remaining == 0:
+                    gather.done.set()
+
+    def _restart(self, shard: _Shard) -> bool:
+        """Replace a shard that exited with a new process; return whether it was replaced."""
+        # Fail everything still waiting so callers fall back at once
+        with self._lock:
+            for gather in self._pending.values():
+                gather.failed = True
+                gather.done.set()
+        if shard not in self._shards:
+            return False  # The pool was stopped
+        delay = shard.started_at + RESTART_BACKOFF - time.monotonic()
+        logger.warning(f"Pattern shard {shard.index} exited, restarting it")
+        if delay > 0:
+            time.sleep(delay)
+        with shard.send_lock:
+            if shard not in self._shards:
+                return False
+            shard.process.join(timeout=1.0)
+            shard.conn.close()
+            try:
+                shard.process, shard.conn = _fork_shard(shard.index, self._count, self.strategy)
+            except OSError as e:
+                logger.error(f"Could not restart pattern shard {shard.index}, "
+                             f"matching in process: {e}")
+                threading.Thread(target=self.stop, name="shard-stop", daemon=True).start()
+                return False
+            shard.started_at = time.monotonic()
+        with self._lock:
+            self.stats["restarts"] += 1
+        return True
+
+    def covers(self, language: str) -> bool:
+        """Return whether the shards hold patterns for a language."""
+        return language in self._language_shards
+
+    def first_match(self, text: str, language: str, types: Tuple[str, ...],
+                    timeout: Optional[float] = None,
+                    skipped: Optional[List[str]] = None) -> Optional[int]:
+        """Return the candidate-order position of the first matching pattern, or None.
+
+        Patterns tripped by the circuit breaker are skipped, and the search
+        times the shards report are recorded with it. A tripped pattern ranked
+        before the match (or any, if nothing matched) is added to `skipped`.
+
+        Raises:
+            ShardError: a shard is down or did not answer in time
+        """
+        shards = self._language_shards.get(language, ())
+        if not shards:
+            return None
+        request_id = next(self._ids)
+        gather = _Gather(len(shards))
+        skip, watch, trials = BREAKER.scan_plan()
+        request = (request_id, text, language, types, skip, watch,
+                   BREAKER.threshold_for(len(text)))
+        with self._lock:
+            self._pending[request_id] = gather
+            self.stats["requests"] += 1
+        try:
+            for shard in shards:
+                with shard.send_lock:
+                    shard.conn.send(request)
+            if not gather.done.wait(self.timeout if timeout is None else timeout) or gather.failed:
+                raise ShardError("Pattern shards did not answer")
+            first_skipped = gather.first_skipped
+            if skipped is not None and first_skipped is not None and (
+                    gather.best is None or first_skipped[0] < gather.best):
+                skipped.append(first_skipped[1])
+            return gather.best
+        except (OSError, ValueError, ShardError) as e:
+            with self._lock:
+                self.stats["failures"] += 1
+            raise ShardError(str(e)) from e
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+                timings = gather.timings
+            searched = set()
+            for pattern_id, duration in timings:
+                BREAKER.record(pattern_id, duration, len(text))
+                searched.add(pattern_id)
+            for pattern_id in trials:
+                if pattern_id not in searched:
+                    BREAKER.end_trial(pattern_id)
+
+    def stop(self) -> None:
+        """Shut the shard processes down."""
+        shards, self._shards = self._shards, ()
+        self._language_shards = {}
+        for shard in shards:
+            try:
+                with shard.send_lock:
+                    shard.conn.send(None)
+            except OSError:
+                pass
+            shard.process.join(timeout=1.0)
+            if shard.process.is_alive():
+                shard.process.kill()
+                shard.process.join()
+            shard.conn.close()
+
+
+def _fork_shard(index: int, shards: int, strategy: str):
+    """Fork one shard process and return it with the parent's end of its pipe."""
+    import multiprocessing
+
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_shard_main, args=(child_conn, index, shards, strategy),
+                              name=f"pattern-shard-{index}", daemon=True)
+    process.start()
+    child_conn.close()
+    return process, parent_conn
+
+
+# Pool used by the translator once start() is called
+SHARD_POOL = ShardPool()
+
+
+def enable_sharding(shards: Optional[int] = None, strategy: str = "hash") -> None:
+    """Start scanning patterns on a pool of shard processes (default: one per CPU)."""
+    SHARD_POOL.start(shards, strategy)
+
+
+def disable_sharding() -> None:
+    """Stop the shard processes and scan patterns in this process again."""
+    SHARD_POOL.stop()
@@ -0,0 +1,83 @@
+"""
+Request Coalescing
+
+This module collapses concurrent identical work into a single computation.
+When many threads ask for the same key at once, the first one computes the
+result and the others wait for it and share it.
+"""
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a waiting thread waits for the in-flight computation before computing itself
+COALESCE_TIMEOUT = 1.0
+
+
+class _Call:
+    """An in-flight computation that other threads can wait on."""
+
+    __slots__ = ("done", "result", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its result."""
+
+    def __init__(self, timeout: float = COALESCE_TIMEOUT):
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {"computed": 0, "coalesced": 0, "timeouts": 0, "rejected": 0, "in_flight": 0}
+
+    def do(self, key: str, compute: Callable[[], Any], timeout: Optional[float] = None,
+           accept: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return compute()'s result, sharing one call between concurrent callers of a key.
+
+        A waiting caller computes on its own if the in-flight call fails, does
+        not finish within the timeout (or the caller's `timeout`, if shorter)
+        or returns a result the caller's `accept` rejects.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["in_flight"] = len(self._calls)
+
+        if leader:
+            try:
+                call.result = compute()
+                return call.result
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    self.stats["computed"] += 1
+                    self.stats["in_flight"] = len(self._calls)
+                call.done.set()
+
+        wait = self.timeout if timeout is None else max(0.0, min(self.timeout, timeout))
+        if call.done.wait(wait) and not call.failed:
+            if accept is None or accept(call.result):
+                with self._lock:
+                    self.stats["coalesced"] += 1
+                return call.result
+            with self._lock:
+                self.stats["rejected"] += 1
+            return compute()
+
+        if not call.failed:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            if wait == self.timeout:
+                logger.warning(f"Coalesced request waited over {self.timeout}s, "
+                               f"computing independently")
+        return compute()
@@ -23,11 +23,20 @@ const toastMessage = document.querySelector('.toast-message');
 const toastClose = document.querySelector('.toast-close');
 const themeToggle = document.getElementById('theme-toggle');
 const howItWorksBtn = document.getElementById('how-it-works-btn');
+const suggestionsList = document.getElementById('suggestions-list');
 
 // Constants
 const MAX_RECENT_SEARCHES = 5;
 const STORAGE_KEY = 'error_translator_recent_searches';
 const THEME_STORAGE_KEY = 'error_translator_theme';
+const SUGGEST_DEBOUNCE_MS = 150;
+const SUGGEST_MIN_LENGTH = 3;
+const SUGGEST_MAX_LENGTH = 200;
+
+// Type-ahead state: the pending timer, the request in flight and the highlighted suggestion
+let suggestTimer = null;
+let suggestController = null;
+let activeSuggestion = -1;
 
 /**
  * Initialize the application
@@ -97,6 +106,9 @@ function initApp() {
         console.log('Copy result button event listener attached');
     }
     
+    // Suggest known errors while typing
+    setupSuggestions();
+    
     // Share button functionality
     createShareButton();
     
@@ -446,7 +458,14 @@ async function fetchLanguages() {
         if (response.ok) {
             const fetchedLanguages = await response.json();
             console.log('API returned languages:', fetchedLanguages);
-            // Languages are already in the HTML, so no need to update the dropdown
+            // Add the languages of installed pattern packs missing from the HTML, before "General"
+            const known = new Set(options.map(option => option.value));
+            const general = Array.from(languageSelect.options).find(option => option.value === 'general');
+            fetchedLanguages.forEach(function(language) {
+                if (!known.has(language.id)) {
+                    languageSelect.insertBefore(new Option(language.name, language.id), general || null);
+                }
+            });
         } else {
             console.log('API request failed, using default languages');
         }
@@ -456,6 +475,160 @@ async function fetchLanguages() {
     }
 }
 
+/**
+ * Set up type-ahead suggestions of known error signatures for the error input
+ */
+function setupSuggestions() {
+    if (!errorInput || !suggestionsList) return;
+    
+    errorInput.addEventListener('input', scheduleSuggestions);
+    errorInput.addEventListener('keydown', handleSuggestionKeys);
+    errorInput.addEventListener('blur', function() {
+        // Let a click on a suggestion land before the list disappears
+        setTimeout(hideSuggestions, 150);
+    });
+    suggestionsList.addEventListener('mousedown', function(event) {
+        const item = event.target.closest('li');
+        if (item) {
+            event.preventDefault();
+            applySuggestion(item.dataset.text);
+        }
+    });
+}
+
+/**
+ * Fetch suggestions once typing pauses, for short single-line input only
+ */
+function scheduleSuggestions() {
+    clearTimeout(suggestTimer);
+    const prefix = errorInput.value;
+    if (prefix.trim().length < SUGGEST_MIN_LENGTH || prefix.length > SUGGEST_MAX_LENGTH || prefix.includes('\n')) {
+        cancelSuggestions();
+        hideSuggestions();
+        return;
+    }
+    suggestTimer = setTimeout(function() {
+        fetchSuggestions(prefix);
+    }, SUGGEST_DEBOUNCE_MS);
+}
+
+/**
+ * Abort the suggestion request in flight, if any
+ */
+function cancelSuggestions() {
+    clearTimeout(suggestTimer);
+    if (suggestController) {
+        suggestController.abort();
+        suggestController = null;
+    }
+}
+
+/**
+ * Request completions for a prefix, cancelling any older request still in flight
+ */
+async function fetchSuggestions(prefix) {
+    cancelSuggestions();
+    const controller = new AbortController();
+    suggestController = controller;
+    
+    const params = new URLSearchParams({ prefix: prefix });
+    if (languageSelect && languageSelect.value && languageSelect.value !== 'auto') {
+        params.set('language', languageSelect.value);
+    }
+    
+    try {
+        const response = await fetch(`/api/suggest?${params}`, {
+            signal: controller.signal,
+            credentials: 'same-origin'
+        });
+        if (!response.ok) {
+            hideSuggestions();
+            return;
+        }
+        const data = await response.json();
+        // Ignore answers for text the user has since changed
+        if (controller === suggestController && errorInput.value === prefix) {
+            renderSuggestions(data.suggestions || []);
+        }
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.error('Error fetching suggestions:', error);
+        }
+    } finally {
+        if (controller === suggestController) {
+            suggestController = null;
+        }
+    }
+}
+
+/**
+ * Show suggestions under the error input
+ */
+function renderSuggestions(suggestions) {
+    suggestionsList.innerHTML = '';
+    activeSuggestion = -1;
+    const typed = errorInput.value.trim().toLowerCase();
+    const useful = suggestions.filter(suggestion => suggestion.text.toLowerCase() !== typed);
+    if (!useful.length) {
+        hideSuggestions();
+        return;
+    }
+    useful.forEach(function(suggestion, index) {
+        const item = document.createElement('li');
+        item.id = `suggestion-${index}`;
+        item.setAttribute('role', 'option');
+        item.setAttribute('aria-selected', 'false');
+        item.dataset.text = suggestion.text;
+        item.textContent = suggestion.text;
+        suggestionsList.appendChild(item);
+    });
+    suggestionsList.classList.remove('hidden');
+}
+
+/**
+ * Hide the suggestion list
+ */
+function hideSuggestions() {
+    if (!suggestionsList) return;
+    suggestionsList.classList.add('hidden');
+    errorInput.removeAttribute('aria-activedescendant');
+    activeSuggestion = -1;
+}
+
+/**
+ * Replace the input with a suggestion and hide the list
+ */
+function applySuggestion(text) {
+    cancelSuggestions();
+    errorInput.value = text;
+    hideSuggestions();
+    errorInput.focus();
+}
+
+/**
+ * Move through the suggestions with the arrow keys, pick one with Enter or Tab, close with Escape
+ */
+function handleSuggestionKeys(event) {
+    if (suggestionsList.classList.contains('hidden')) return;
+    const items = suggestionsList.querySelectorAll('li');
+    
+    if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+        event.preventDefault();
+        const step = event.key === 'ArrowDown' ? 1 : -1;
+        activeSuggestion = (activeSuggestion + step + items.length) % items.length;
+        items.forEach(function(item, index) {
+            item.setAttribute('aria-selected', String(index === activeSuggestion));
+        });
+        errorInput.setAttribute('aria-activedescendant', items[activeSuggestion].id);
+    } else if ((event.key === 'Enter' || event.key === 'Tab') && activeSuggestion >= 0) {
+        event.preventDefault();
+        applySuggestion(items[activeSuggestion].dataset.text);
+    } else if (event.key === 'Escape') {
+        cancelSuggestions();
+        hideSuggestions();
+    }
+}
+
 /**
  * Translate the error message with enhanced security
  */
@@ -484,6 +657,10 @@ async function translateError() {
         return;
     }
     
+    // A translation makes pending suggestions pointless
+    cancelSuggestions();
+    hideSuggestions();
+    
     // Show loading overlay
     showLoading(true);
     
@@ -491,8 +668,8 @@ async function translateError() {
         // Validate language input
         let language = 'auto';
         if (languageSelect && languageSelect.value) {
-            // Whitelist check for language values
-            const validLanguages = ['auto', 'python', 'javascript', 'java', 'html', 'css', 'ruby', 'general'];
+            // Whitelist check for language values: only those offered in the selector
+            const validLanguages = Array.from(languageSelect.options).map(option => option.value);
             if (validLanguages.includes(languageSelect.value)) {
                 language = languageSelect.value;
             } else {
@@ -787,6 +964,8 @@ function showError(message) {
  * Clear the input field
  */
 function clearInput() {
+    cancelSuggestions();
+    hideSuggestions();
     errorInput.value = '';
     errorInput.focus();
 }
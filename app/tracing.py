@@ -0,0 +1,210 @@
+"""
+Request Tracing
+
+This module records how long each stage of a translation takes. A trace is
+started per API request; the pipeline wraps its stages (parse, sanitize,
+fingerprint, cache, detect, prefilter, match, render, serialize) in span()
+blocks, and the finished trace is handed to an exporter and, if enabled,
+summarised in a Server-Timing response header.
+
+Tracing is off by default. With no trace active span() returns a shared
+no-op context manager, so the instrumented code costs one context variable
+lookup per stage.
+"""
+import json
+import time
+import uuid
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Span used when no trace is active."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """The spans recorded for one request."""
+
+    __slots__ = ("trace_id", "name", "start", "_started", "duration", "spans")
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        # (name, offset from the start of the trace, duration), in seconds
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def finish(self) -> None:
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+
+    def totals(self) -> Dict[str, float]:
+        """Total seconds spent in each stage, in order of first appearance."""
+        totals: Dict[str, float] = {}
+        for name, _, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def server_timing(self) -> str:
+        """Render the stage totals as a Server-Timing header value (milliseconds)."""
+        metrics = [f"{name};dur={duration * 1000:.3f}" for name, duration in self.totals().items()]
+        if self.duration is not None:
+            metrics.append(f"total;dur={self.duration * 1000:.3f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 3),
+                 "duration_ms": round(duration * 1000, 3)}
+                for name, offset, duration in self.spans
+            ],
+        }
+
+
+class _Span:
+    """Times one stage of the active trace."""
+
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        ended = time.perf_counter()
+        offset = self.started - self.trace._started
+        self.trace.spans.append((self.name, offset, ended - self.started))
+        return False
+
+
+# Trace of the request being handled in the current thread or task
+_CURRENT: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def span(name: str):
+    """Return a context manager timing a stage of the current trace."""
+    trace = _CURRENT.get()
+    if trace is None:
+        return NOOP_SPAN
+    return _Span(trace, name)
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the request being handled, or None."""
+    return _CURRENT.get()
+
+
+class TraceExporter:
+    """Interface for exporters, which receive every finished trace."""
+
+    def export(self, trace: Trace) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class NoopExporter(TraceExporter):
+    """Discards traces."""
+
+    def export(self, trace: Trace) -> None:
+        pass
+
+
+class JsonLinesExporter(TraceExporter):
+    """Appends each trace as one JSON object per line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_dict(), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class InMemoryExporter(TraceExporter):
+    """Keeps traces in a list, for tests."""
+
+    def __init__(self):
+        self.traces: List[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+class Tracer:
+    """Starts and finishes request traces and sends them to the exporter."""
+
+    def __init__(self, exporter: Optional[TraceExporter] = None, server_timing: bool = False):
+        self.exporter = exporter or NoopExporter()
+        self.server_timing = server_timing
+
+    @property
+    def enabled(self) -> bool:
+        """Whether traces are recorded at all."""
+        return self.server_timing or not isinstance(self.exporter, NoopExporter)
+
+    def start(self, name: str):
+        """Make a new trace current; returns the token to pass to end()."""
+        return _CURRENT.set(Trace(name))
+
+    def end(self, token) -> None:
+        """Finish the current trace, export it and restore the previous one."""
+        trace = _CURRENT.get()
+        _CURRENT.reset(token)
+        if trace is None:
+            return
+        trace.finish()
+        try:
+            self.exporter.export(trace)
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+# Tracer used by the API routes
+TRACER = Tracer()
+
+
+def configure_tracing(exporter: Optional[TraceExporter] = None,
+                      server_timing: bool = False) -> None:
+    """Set where traces go and whether API responses carry a Server-Timing header.
+
+    With the defaults (no exporter, no header) tracing is off.
+    """
+    TRACER.exporter.close()
+    TRACER.exporter = exporter or NoopExporter()
+    TRACER.server_timing = server_timing
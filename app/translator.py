@@ -8,15 +8,23 @@ import re
 import time
 import logging
 from functools import lru_cache
-from typing import Dict, Optional
+from typing import Dict, List, Tuple
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Constants for security limits
-MAX_ERROR_LENGTH = 10000  # Maximum allowed error message length
-REGEX_TIMEOUT = 0.5  # Timeout for regex operations in seconds
+from app.cache import TRANSLATION_CACHE, fingerprint
+from app.singleflight import SingleFlight
+from app.breaker import BREAKER
+from app.logs import REQUEST_LOGGER
+from app.data.similarity import SIMILARITY_INDEX
+from app.data.patterns.base_pattern import PLACEHOLDER_RE
+from app.deadline import (
+    NO_DEADLINE,
+    DETECT_PATTERNS_MIN_BUDGET,
+    FULL_MATCH_MIN_BUDGET,
+    KEYWORD_DETECTION,
+    PREFILTERED_PATTERNS,
+    GENERAL_RESPONSE,
+    TRIPPED_PATTERNS,
+)
 from app.data.error_patterns import (
     PYTHON_PATTERNS,
     JAVASCRIPT_PATTERNS,
@@ -25,9 +33,46 @@ from app.data.error_patterns import (
     JAVA_PATTERNS,
     RUBY_PATTERNS,
     GENERAL_PATTERNS,
+    REGISTRY,
 )
+from app.data.packs import GENERAL, LANGUAGE_PACKS
+from app.message import Message
+
+logger = logging.getLogger(__name__)
+
+# Constants for security limits
+MAX_ERROR_LENGTH = 10000  # Maximum allowed error message length
+REGEX_TIMEOUT = 0.5  # Timeout for regex operations in seconds
 
-# Dictionary mapping language codes to pattern dictionaries
+# Scan window for oversized input. The head and tail budgets plus the marker
+# budget add up to MAX_ERROR_LENGTH so the amount of text scanned stays fixed;
+# the separators between windows are taken out of the marker budget.
+WINDOW_HEAD_LENGTH = 2000  # Characters kept from the start of the message
+WINDOW_TAIL_LENGTH = 4000  # Characters kept from the end (final exception line)
+WINDOW_MARKER_LENGTH = MAX_ERROR_LENGTH - WINDOW_HEAD_LENGTH - WINDOW_TAIL_LENGTH
+WINDOW_MARKER_LINE_LENGTH = 400  # Longest single marker line kept
+WINDOW_MAX_MARKERS = 20  # Most marker lines kept from the middle of the message
+WINDOW_SEPARATOR = "\n... [truncated] ...\n"
+
+# Words that identify exception lines inside long tracebacks and stack traces
+EXCEPTION_MARKER_RE = re.compile(r"Error\b|Exception\b|Traceback|Caused by|Uncaught|FATAL")
+
+# Most patterns tried when the deadline only leaves time for a prefiltered match
+DEGRADED_MAX_PATTERNS = 5
+
+# Detection score of an exception type that a single language has patterns for
+EXCEPTION_TYPE_SCORE = 5
+
+# Similarity at which the closest pattern's explanation replaces the general response
+FUZZY_ANSWER_THRESHOLD = 0.6
+
+# Shown in place of a placeholder when a pattern is used without a regex match
+UNKNOWN_PLACEHOLDER = "…"
+
+# Concurrent identical translations share one computation
+COALESCER = SingleFlight()
+
+# Compiled pattern records of the built-in packs, by language
 ERROR_PATTERNS = {
     "python": PYTHON_PATTERNS,
     "javascript": JAVASCRIPT_PATTERNS,
@@ -39,6 +84,75 @@ ERROR_PATTERNS = {
 }
 
 
+def select_windows(text: str) -> Tuple[str, List[Dict[str, object]]]:
+    """Reduce oversized text to a fixed-size scan window.
+
+    Keeps the head of the message, the tail (where tracebacks put the final
+    exception line) and any lines from the middle containing exception markers
+    such as ``Caused by:``. Text within MAX_ERROR_LENGTH is returned unchanged.
+
+    Args:
+        text: The sanitized text to reduce
+
+    Returns:
+        A tuple of the windowed text and a list of kept windows, each a dict
+        with ``kind`` ("head", "marker" or "tail") and the ``start``/``end``
+        offsets in the original text. The list is empty if nothing was cut.
+    """
+    if len(text) <= MAX_ERROR_LENGTH:
+        return text, []
+
+    # Snap the head and tail to line boundaries when one is close by
+    head_end = WINDOW_HEAD_LENGTH
+    newline = text.rfind("\n", WINDOW_HEAD_LENGTH // 2, head_end)
+    if newline != -1:
+        head_end = newline
+    tail_start = len(text) - WINDOW_TAIL_LENGTH
+    newline = text.find("\n", tail_start, tail_start + WINDOW_TAIL_LENGTH // 2)
+    if newline != -1:
+        tail_start = newline + 1
+
+    # Collect every line in the cut region that mentions an exception marker
+    marker_lines = []
+    position = head_end
+    while position < tail_start:
+        match = EXCEPTION_MARKER_RE.search(text, position, tail_start)
+        if not match:
+            break
+        line_start = text.rfind("\n", head_end, match.start())
+        line_start = head_end if line_start == -1 else line_start + 1
+        line_end = text.find("\n", match.end(), tail_start)
+        if line_end == -1:
+            line_end = tail_start
+        # Cut a long line around the marker rather than from its start
+        start, end = line_start, line_end
+        if end - start > WINDOW_MARKER_LINE_LENGTH:
+            start = max(line_start, min(match.start() - WINDOW_MARKER_LINE_LENGTH // 2,
+                                        line_end - WINDOW_MARKER_LINE_LENGTH))
+            end = start + WINDOW_MARKER_LINE_LENGTH
+        marker_lines.append((start, end))
+        position = line_end + 1
+
+    # Prefer the markers closest to the tail, within the marker budget. Each
+    # window after the head is preceded by a separator.
+    kept_markers = []
+    budget = WINDOW_MARKER_LENGTH - len(WINDOW_SEPARATOR)
+    for start, end in reversed(marker_lines):
+        cost = end - start + len(WINDOW_SEPARATOR)
+        if len(kept_markers) >= WINDOW_MAX_MARKERS or cost > budget:
+            break
+        kept_markers.append((start, end))
+        budget -= cost
+    kept_markers.reverse()
+
+    windows = [{"kind": "head", "start": 0, "end": head_end}]
+    windows.extend({"kind": "marker", "start": start, "end": end} for start, end in kept_markers)
+    windows.append({"kind": "tail", "start": tail_start, "end": len(text)})
+
+    windowed = WINDOW_SEPARATOR.join(text[w["start"]:w["end"]] for w in windows)
+    return windowed, windows
+
+
 def translate_text(text, output_language=None):
     """
     Since we're English-only now, this function simply returns the original text.
@@ -62,17 +176,46 @@ def translate_text(text, output_language=None):
     # Limit length to prevent abuse
     if len(text) > MAX_ERROR_LENGTH:
         logger.warning(f"Text exceeding max length ({len(text)} chars) truncated")
-        text = text[:MAX_ERROR_LENGTH] + "... [truncated]"
+        text, _ = select_windows(text)
         
     return text
 
 
-@lru_cache(maxsize=128)  # Cache results to improve performance and reduce regex load
-def detect_language(error_message: str) -> str:
+def search_pattern(pattern, error_message, folded=None, skipped=None):
+    """
+    Search an error message with one pattern, timing the search for the circuit breaker.
+
+    Args:
+        pattern (ErrorPattern): The pattern to search with
+        error_message (str): The sanitized error message
+        folded (str): The message case-folded, shared by the literal patterns
+            (None to fold it here if the pattern needs it)
+        skipped (list): Collects the ids of patterns skipped because they are tripped
+
+    Returns:
+        The match object, or None if there is no match or the pattern is tripped
+    """
+    if not BREAKER.allow(pattern.id):
+        if skipped is not None:
+            skipped.append(pattern.id)
+        return None
+    started = time.perf_counter()
+    try:
+        # Patterns without literals go straight to the regex
+        if pattern.literals is None:
+            return pattern.regex.search(error_message)
+        return pattern.search(error_message, folded)
+    finally:
+        BREAKER.record(pattern.id, time.perf_counter() - started, len(error_message))
+
+
+def detect_language(error_message, use_patterns: bool = True) -> str:
     """Detect programming language from error message.
     
     Args:
-        error_message: The error message to analyze
+        error_message: The error message to analyze, as text or a prepared Message
+        use_patterns: Also score the language patterns, which is slower than
+            the keyword and file extension checks alone
         
     Returns:
         The detected language name
@@ -80,37 +223,53 @@ def detect_language(error_message: str) -> str:
     Raises:
         ValueError: If error_message is empty or invalid
     """
-    if not error_message or not isinstance(error_message, str):
+    # Scores depend on which patterns the breaker has disabled and which packs
+    # are loaded, so results are cached separately for each of their states
+    return _detect_language(error_message, use_patterns, BREAKER.generation,
+                            LANGUAGE_PACKS.generation)[0]
+
+
+@lru_cache(maxsize=128)  # Cache results to improve performance and reduce regex load
+def _detect_language(error_message, use_patterns, breaker_generation, packs_generation):
+    """Return the detected language and whether tripped patterns were skipped scoring it."""
+    if isinstance(error_message, str):
+        error_message = Message(error_message)
+    if not isinstance(error_message, Message) or not error_message.text:
         raise ValueError("Invalid error message")
+    message = error_message
         
-    language_scores: Dict[str, int] = {
-        lang: 0 for lang in SUPPORTED_LANGUAGES
-    }
-    
-    # Common language-specific keywords to boost detection confidence
-    language_keywords = {
-        "python": ["python", "pyfile", "pythonpath", "traceback", "def ", "class ", "import ", "syntaxerror", "indentationerror", "valueerror", "typeerror", "importerror", "attributeerror"],
-        "javascript": ["javascript", "js", "node", "npm", "const ", "let ", "var ", "undefined", "referenceerror", "typeerror", "syntaxerror", "uncaught", "function", "=>", "promise", "async ", "await ", "document."],
-        "java": ["java", "javac", "exception", "nullpointerexception", "classcastexception", "jvm", "runtime", "class ", "public ", "private ", "static ", "void ", "interface ", "abstract ", "extends ", "implements "],
-        "html": ["html", "<html", "</html>", "<div", "</div>", "<body", "</body>", "<head", "</head>", "<!doctype", "markup", "tag", "element"],
-        "css": ["css", "stylesheet", "css file", "selector", "@media", "@keyframes", "color:", "background:", "margin:", "padding:", "width:", "height:", "px;", "em;", "rem;", "%;" ],
-        "ruby": ["ruby", "rb", "gem", "bundler", "nameerror", "nomethoderror", "argumenterror", "runtimeerror", "loaderror", "typeerror", "zerodivisionerror", "syntaxerror", "notenoughargumentserror", "module", "def ", "end", "nil"]
-    }
+    # Every pack but the general one can be detected, built-in packs first
+    packs = [pack for pack in LANGUAGE_PACKS.packs() if pack.language != GENERAL]
+    language_scores: Dict[str, int] = {pack.language: 0 for pack in packs}
+    skipped: List[str] = []
     
     # Check for language-specific keywords in the error message
-    error_lower = error_message.lower()
-    for language, keywords in language_keywords.items():
-        for keyword in keywords:
+    error_lower = message.folded
+    for pack in packs:
+        for keyword in pack.keywords:
             if keyword in error_lower:
-                language_scores[language] += 1
+                language_scores[pack.language] += 1
     
+    # Exception identifiers such as NameError or java.lang.NullPointerException
+    # point at the languages that have patterns for them, without running any
+    # pattern. One owned by a single language outweighs a file extension and
+    # a couple of generic pattern matches from other languages.
+    # Packs not loaded yet are scored by the exception types they declare.
+    # General patterns apply to every language, so they point at none.
+    for name in message.exception_types:
+        owners = [language for language in LANGUAGE_PACKS.languages_for_type(name)
+                  if language in language_scores]
+        for language in owners:
+            language_scores[language] += EXCEPTION_TYPE_SCORE if len(owners) == 1 else 1
+
     # Pattern matching - check if any pattern from a language matches
     # Use timeout to prevent ReDoS attacks
-    for language, patterns in ERROR_PATTERNS.items():
-        if language == "general":
-            continue  # Skip general patterns for now
-            
-        for pattern in patterns:
+    for pack in packs:
+        language = pack.language
+        if not use_patterns or not LANGUAGE_PACKS.is_loaded(language):
+            continue  # Packs are not loaded just to detect their language
+
+        for pattern in REGISTRY.patterns(language):
             try:
                 # Use a timeout to prevent ReDoS attacks
                 start_time = time.time()
@@ -118,7 +277,7 @@ def detect_language(error_message: str) -> str:
                     logger.warning(f"Regex timeout prevention for language: {language}")
                     break
                     
-                if re.search(pattern["regex"], error_message, re.IGNORECASE | re.DOTALL, timeout=REGEX_TIMEOUT):
+                if search_pattern(pattern, message.text, message.folded, skipped):
                     language_scores[language] += 2  # Pattern matches are stronger indicators
             except re.error as e:
                 logger.error(f"Regex error in {language} pattern: {e}")
@@ -128,18 +287,9 @@ def detect_language(error_message: str) -> str:
                 continue
     
     # Check for file extensions in the error message
-    file_extensions = {
-        ".py": "python",
-        ".js": "javascript",
-        ".java": "java",
-        ".html": "html",
-        ".htm": "html",
-        ".css": "css"
-    }
-    
-    for ext, lang in file_extensions.items():
-        if ext in error_message:
-            language_scores[lang] += 3  # File extensions are very strong indicators
+    extensions = LANGUAGE_PACKS.file_extensions()
+    for ext in message.file_extensions:
+        language_scores[extensions[ext]] += 3  # File extensions are very strong indicators
     
     # Determine the language with highest score
     max_score = 0
@@ -153,28 +303,30 @@ def detect_language(error_message: str) -> str:
     # If no strong match is found, default to general
     if max_score <= 1:
         detected_language = "general"
-        
-    print(f"Language detection scores: {language_scores}, detected: {detected_language}")
-    
-    return detected_language
+
+    logger.debug("Language detection scores: %s, detected: %s", language_scores, detected_language)
+
+    return detected_language, bool(skipped)
+
+
+detect_language.cache_clear = _detect_language.cache_clear
 
 
-def translate_error(error_message, language="auto", output_language=None):
+def prepare_error(error_message, language="auto"):
     """
-    Translate an error message to a human-readable explanation (English only).
-    Now with improved security handling.
+    Validate and sanitize an error message and language parameter.
+
+    This is the only place the raw input is processed; every later stage reads
+    the returned Message.
 
     Args:
         error_message (str): The error message to translate
         language (str): The programming language ('auto', 'python', 'javascript', etc.)
-        output_language (str): Ignored, kept for compatibility
 
     Returns:
-        dict: A dictionary containing the explanation
+        Message: The sanitized text, the validated language and the windows
+        kept from an oversized message (empty if it was not cut)
     """
-    # Begin timing the translation process
-    start_time = time.time()
-    
     # Input validation
     if not isinstance(error_message, str):
         logger.warning(f"Non-string input to translate_error: {type(error_message)}")
@@ -183,10 +335,11 @@ def translate_error(error_message, language="auto", output_language=None):
     # Sanitize input - remove control characters that might affect regex
     error_message = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', error_message)
     
-    # Limit input length for security
+    # Limit input length for security, keeping the head, tail and exception lines
+    windows = []
     if len(error_message) > MAX_ERROR_LENGTH:
         logger.warning(f"Error message exceeding max length ({len(error_message)} chars) truncated")
-        error_message = error_message[:MAX_ERROR_LENGTH] + "... [truncated]"
+        error_message, windows = select_windows(error_message)
     
     # Validate language parameter
     if not isinstance(language, str):
@@ -197,105 +350,421 @@ def translate_error(error_message, language="auto", output_language=None):
     language = language.lower()
     
     # Only accept valid language options
-    valid_languages = set(ERROR_PATTERNS.keys()) | {"auto"}
+    valid_languages = set(LANGUAGE_PACKS.languages()) | {"auto"}
     if language not in valid_languages:
         logger.warning(f"Invalid language specified: {language}, defaulting to auto")
         language = "auto"
-        
-    # Log the processing (use logging instead of print for production code)
-    logger.info(f"Processing error: '{error_message[:50]}...' specified language: {language}")
-
-    if not error_message:
-        return {
-            "title": "No error message provided",
-            "explanation": "Please provide an error message to translate.",
-            "original_error": "",
-            "solution": "Enter an error message in the input field above.",
-            "difficulty": "beginner",  # Default difficulty for empty error
-            "language": "unknown",  # Change to 'unknown' for empty messages
-        }
+
+    return Message(error_message, language, windows)
+
+
+def empty_response():
+    """Return the response for an empty error message."""
+    return {
+        "title": "No error message provided",
+        "explanation": "Please provide an error message to translate.",
+        "original_error": "",
+        "solution": "Enter an error message in the input field above.",
+        "difficulty": "beginner",  # Default difficulty for empty error
+        "language": "unknown",  # Change to 'unknown' for empty messages
+    }
+
+
+def translate_error(error_message, language="auto", output_language=None, deadline=None,
+                    registry=None):
+    """
+    Translate an error message to a human-readable explanation (English only).
+    Now with improved security handling.
+
+    Args:
+        error_message (str): The error message to translate
+        language (str): The programming language ('auto', 'python', 'javascript', etc.)
+        output_language (str): Ignored, kept for compatibility
+        deadline (Deadline): When the answer is due; stages degrade as it nears
+        registry: A tenant's OverlayRegistry, or None for the shared patterns
+
+    Returns:
+        dict: A dictionary containing the explanation
+    """
+    from app.tracing import span
+
+    # Begin timing the translation process
+    start_time = time.time()
+
+    with span("sanitize"):
+        message = prepare_error(error_message, language)
+
+    # Per-request records are sampled and only formatted if they are written
+    REQUEST_LOGGER.info("Processing error: %.50r... specified language: %s", message.text,
+                        message.language)
+
+    if not message.text:
+        return empty_response()
+
+    # Reuse the translation of an identical message, possibly from another worker
+    with span("fingerprint"):
+        cache_key = cache_key_for(message, registry)
+    with span("cache"):
+        result = TRANSLATION_CACHE.get(cache_key)
+    if result is None:
+        def compute():
+            computed = match_error(message, start_time=start_time, deadline=deadline,
+                                   registry=registry)
+            # A degraded answer is only good enough for this request
+            if "degraded" not in computed:
+                with span("cache"):
+                    TRANSLATION_CACHE.set(cache_key, computed)
+            return computed
+
+        # Identical requests arriving together wait for one computation, for no
+        # longer than their own budget allows. A degraded answer is only good
+        # enough for the request that computed it, so the others compute theirs.
+        wait = deadline.remaining() if deadline is not None else None
+        result = dict(COALESCER.do(cache_key, compute, timeout=wait,
+                                   accept=lambda shared: "degraded" not in shared))
+
+    record_hit(result)
+    # Record which parts of an oversized message were scanned
+    if message.windows:
+        result["windows"] = list(message.windows)
+    return result
+
+
+def translate_errors(requests, deadline=None, registry=None):
+    """
+    Translate several error messages, resolving cached results in one lookup.
+
+    Args:
+        requests (list): (error_message, language) pairs
+        deadline (Deadline): When the whole batch is due
+        registry: A tenant's OverlayRegistry, or None for the shared patterns
+
+    Returns:
+        list: One result dictionary per request, in order
+    """
+    from app.tracing import span
+
+    start_time = time.time()
+    with span("sanitize"):
+        prepared = [prepare_error(error_message, language) for error_message, language in requests]
+    with span("fingerprint"):
+        keys = [cache_key_for(message, registry) if message.text else None for message in prepared]
+
+    # One cache call for the whole batch, so an external backend is asked once
+    with span("cache"):
+        cached = TRANSLATION_CACHE.get_many([key for key in keys if key])
+    computed = {}
+    results = []
+    for message, key in zip(prepared, keys):
+        if not message.text:
+            results.append(empty_response())
+            continue
+        result = cached.get(key) or computed.get(key)
+        if result is None:
+            result = match_error(message, start_time=start_time, deadline=deadline,
+                                 registry=registry)
+            computed[key] = result
+        record_hit(result)
+        result = dict(result)
+        if message.windows:
+            result["windows"] = list(message.windows)
+        results.append(result)
+
+    with span("cache"):
+        TRANSLATION_CACHE.set_many({key: result for key, result in computed.items()
+                                    if "degraded" not in result})
+    REQUEST_LOGGER.info("Translated batch of %d errors (%d computed)", len(results), len(computed))
+    return results
+
+
+def record_hit(result):
+    """Count a served translation towards its pattern's hit statistics and suggestion ranking.
+
+    Called for every answer, whether it was computed or came from the cache,
+    so the most frequent errors are counted as often as they are seen.
+    """
+    pattern_id = result.get("pattern_id")
+    if pattern_id is not None:
+        from app.data.store import PATTERN_STORE
+        from app.data.suggest import SUGGESTIONS
+
+        PATTERN_STORE.record_hit(pattern_id)
+        SUGGESTIONS.record_hit(pattern_id)
+
+
+def cache_key_for(message, registry=None):
+    """Return the cache key of a message, apart for each tenant's patterns and the packs loaded."""
+    key = message.fingerprint
+    if LANGUAGE_PACKS.cache_namespace:
+        key = fingerprint(key, LANGUAGE_PACKS.cache_namespace)
+    if registry is None or registry is REGISTRY:
+        return key
+    return fingerprint(key, registry.cache_namespace)
+
+
+def prefilter_patterns(patterns, message):
+    """
+    Pick the highest-priority patterns whose literal prefix occurs in the message.
+
+    Args:
+        patterns (tuple): Pattern records in priority order
+        message (Message): The prepared error message
+
+    Returns:
+        list: At most DEGRADED_MAX_PATTERNS patterns that can plausibly match
+    """
+    folded = message.folded
+    candidates = [pattern for pattern in patterns if pattern.prefix and pattern.prefix in folded]
+    return candidates[:DEGRADED_MAX_PATTERNS]
+
+
+def render_match(pattern, match, error_message, language, start_time):
+    """
+    Build the response for a matching pattern, filling placeholders from the match.
+
+    Args:
+        pattern (ErrorPattern): The matching pattern
+        match: The match object of the pattern's search
+        error_message (str): The sanitized error message
+        language (str): The language reported in the response
+        start_time (float): When processing started, for the reported processing time
+
+    Returns:
+        dict: A dictionary containing the explanation
+    """
+    # Display text is decoded lazily, only for the matching pattern
+    fields = pattern.cold_fields()
+    title = fields["title"]
+    explanation = fields["explanation"]
+    solution = fields["solution"]
+    code_example = fields["code_example"]
+    difficulty = pattern.difficulty
+
+    # Safely replace placeholders with captured groups
+    try:
+        # Only the groups referenced by placeholders need replacing
+        for i in pattern.slots:
+            group = match.group(i) if i <= pattern.regex.groups else None
+            if group is None:
+                group = ""  # Handle None values in match groups
+            placeholder = "{{$" + str(i) + "}}"
+            # Ensure group is a string and sanitize it
+            group_str = str(group)
+            # Replace placeholders safely
+            title = title.replace(placeholder, group_str)
+            explanation = explanation.replace(placeholder, group_str)
+            solution = solution.replace(placeholder, group_str)
+            code_example = code_example.replace(placeholder, group_str)
+    except Exception as e:
+        logger.error(f"Error processing match groups: {e}")
+        # Continue with unmodified template text rather than failing
+
+    # Build result dictionary with additional security measures
+    # Sanitize all outputs to ensure they don't contain harmful content
+    result = {
+        "title": translate_text(title)[:200],  # Limit title length
+        "explanation": translate_text(explanation)[:5000],  # Limit explanation length
+        "original_error": error_message,
+        "solution": translate_text(solution)[:5000],  # Limit solution length
+        "language": language,
+        "difficulty": difficulty,
+        "pattern_id": pattern.id,  # Kept with cached results, so cache hits are counted too
+        # Add processing time for monitoring
+        "processing_time": f"{(time.time() - start_time):.3f}s",
+    }
+
+    # Add code example if available, with length limit
+    if code_example:
+        result["code_example"] = code_example[:5000]
+
+    # Add related errors if available
+    related_errors = fields["related_errors"]
+    if related_errors:
+        # Validate related errors format and content
+        if isinstance(related_errors, list):
+            # Limit number of related errors and their length
+            safe_related = []
+            for related in related_errors[:5]:  # Limit to 5 related errors
+                if isinstance(related, dict) and "title" in related and "description" in related:
+                    safe_related.append({
+                        "title": translate_text(related["title"])[:100],
+                        "description": translate_text(related["description"])[:500]
+                    })
+            result["related_errors"] = safe_related
+
+    return result
+
+
+def unmatched_text(text):
+    """Return pattern text with its placeholders blanked, for a pattern used without a match."""
+    return PLACEHOLDER_RE.sub(UNKNOWN_PLACEHOLDER, text)
+
+
+def render_similar(pattern, similarity, error_message, language, start_time):
+    """
+    Build the response from a pattern similar to, but not matching, the message.
+
+    Placeholders have no captured text to fill them, so they are shown as
+    UNKNOWN_PLACEHOLDER.
+
+    Returns:
+        dict: A dictionary containing the explanation, marked as a fuzzy match
+    """
+    fields = pattern.cold_fields()
+    result = {
+        "title": translate_text(unmatched_text(fields["title"]))[:200],
+        "explanation": translate_text(unmatched_text(fields["explanation"]))[:5000],
+        "original_error": error_message,
+        "solution": translate_text(unmatched_text(fields["solution"]))[:5000],
+        "language": language,
+        "difficulty": pattern.difficulty,
+        "match": "fuzzy",
+        "similarity": round(similarity, 3),
+        "processing_time": f"{(time.time() - start_time):.3f}s",
+    }
+    if fields["code_example"]:
+        result["code_example"] = unmatched_text(fields["code_example"])[:5000]
+    return result
+
+
+def match_error(message, language=None, start_time=None, deadline=None, registry=None):
+    """
+    Match a sanitized error message against the known patterns.
+
+    When the deadline draws near, detection falls back to keywords only, then
+    matching to a few prefiltered patterns, then to the general response. The
+    stages skipped are listed under "degraded" in the result.
+
+    Args:
+        message (Message): The prepared, non-empty error message (a sanitized
+            string is also accepted)
+        language (str): A valid language code or 'auto', overriding the
+            message's requested language
+        start_time (float): When processing started, for the reported processing time
+        deadline (Deadline): When the answer is due, or None for no limit
+        registry: The patterns to match against; a tenant's OverlayRegistry,
+            or None for the shared registry
+
+    Returns:
+        dict: A dictionary containing the explanation
+    """
+    from app.sharding import SHARD_POOL, ShardError
+    from app.tracing import span
+
+    if isinstance(message, str):
+        message = Message(message, language or "auto")
+    if language is None:
+        language = message.language
+    error_message = message.text
+    if start_time is None:
+        start_time = time.time()
+    if deadline is None:
+        deadline = NO_DEADLINE
+    if registry is None:
+        registry = REGISTRY
+    degraded = []
+    # Patterns the circuit breaker skipped; an answer found without them is
+    # only good enough for this request, like one cut short by the deadline
+    skipped = []
 
     # Detect programming language if set to auto
     if language == "auto":
-        language = detect_language(error_message)
+        with span("detect"):
+            if deadline.remaining() < DETECT_PATTERNS_MIN_BUDGET:
+                degraded.append(KEYWORD_DETECTION)
+                language = detect_language(message, use_patterns=False)
+            else:
+                language, detection_skipped = _detect_language(
+                    message, True, BREAKER.generation, LANGUAGE_PACKS.generation)
+                if detection_skipped:
+                    degraded.append(TRIPPED_PATTERNS)
 
-    # Load error patterns for the detected language
-    patterns = ERROR_PATTERNS.get(language, GENERAL_PATTERNS)
+    # Load error patterns for the detected language, starting with those for
+    # the exception types named in the message. A plugin pack is compiled the
+    # first time its language is needed.
+    with span("prefilter"):
+        LANGUAGE_PACKS.ensure_loaded(language)
+        pattern_language = language if language in registry else "general"
+        patterns = registry.candidates(pattern_language, message.exception_types)
+        if deadline.remaining() < FULL_MATCH_MIN_BUDGET:
+            degraded.append(PREFILTERED_PATTERNS)
+            patterns = prefilter_patterns(patterns, message)
+        elif SHARD_POOL.active and registry is REGISTRY and SHARD_POOL.covers(pattern_language):
+            # The shards find the first matching pattern and the scan here starts
+            # at it, going on only if the breaker tripped it in the meantime.
+            # They hold the shared patterns loaded before they started only, so
+            # tenants' requests and packs loaded since scan in process.
+            try:
+                rank = SHARD_POOL.first_match(
+                    error_message, pattern_language, message.exception_types,
+                    timeout=min(SHARD_POOL.timeout, deadline.remaining()), skipped=skipped)
+                patterns = patterns[rank:] if rank is not None else ()
+            except ShardError as e:
+                logger.warning(f"Sharded matching failed, scanning in process: {e}")
 
     # Try to match the error with known patterns
     # Use a try/except block to catch and handle any regex errors
-    for pattern in patterns:
-        try:
-            # Use a timeout to prevent ReDoS attacks
-            match = re.search(pattern["regex"], error_message, re.IGNORECASE | re.DOTALL, timeout=REGEX_TIMEOUT)
+    matched = None
+    # Only literal patterns need the case-folded text
+    folded = message.folded if registry.has_literals(pattern_language) else None
+    with span("match"):
+        for pattern in patterns:
+            if deadline.expired():
+                break
+            try:
+                # Use a timeout to prevent ReDoS attacks
+                match = search_pattern(pattern, error_message, folded, skipped)
+            except re.error as e:
+                logger.error(f"Regex error with pattern: {e}")
+                continue
+            except Exception as e:
+                logger.error(f"Unexpected error in pattern matching: {e}")
+                continue
             if match:
-                # Replace placeholders in explanation with captured groups
-                title = pattern["title"]
-                explanation = pattern["explanation"]
-                solution = pattern["solution"]
-                code_example = pattern.get("code_example", "")
-                difficulty = pattern.get(
-                    "difficulty", "intermediate"
-                )  # Default to intermediate if not specified
-
-                # Safely replace placeholders with captured groups
-                try:
-                    for i, group in enumerate(match.groups(), 1):
-                        if group is None:
-                            group = ""  # Handle None values in match groups
-                        placeholder = "{{$" + str(i) + "}}"
-                        # Ensure group is a string and sanitize it
-                        group_str = str(group)
-                        # Replace placeholders safely
-                        title = title.replace(placeholder, group_str)
-                        explanation = explanation.replace(placeholder, group_str)
-                        solution = solution.replace(placeholder, group_str)
-                        code_example = code_example.replace(placeholder, group_str)
-                except Exception as e:
-                    logger.error(f"Error processing match groups: {e}")
-                    # Continue with unmodified template text rather than failing
-
-            # Build result dictionary with additional security measures
-            # Sanitize all outputs to ensure they don't contain harmful content
-            result = {
-                "title": translate_text(title)[:200],  # Limit title length
-                "explanation": translate_text(explanation)[:5000],  # Limit explanation length
-                "original_error": error_message,
-                "solution": translate_text(solution)[:5000],  # Limit solution length
-                "language": language,
-                "difficulty": difficulty,
-                "processing_time": f"{(time.time() - start_time):.3f}s",  # Add processing time for monitoring
-            }
-
-            # Add code example if available, with length limit
-            if code_example:
-                result["code_example"] = code_example[:5000]
-
-            # Add related errors if available
-            if "related_errors" in pattern:
-                # Validate related errors format and content
-                if isinstance(pattern["related_errors"], list):
-                    # Limit number of related errors and their length
-                    safe_related = []
-                    for related in pattern["related_errors"][:5]:  # Limit to 5 related errors
-                        if isinstance(related, dict) and "title" in related and "description" in related:
-                            safe_related.append({
-                                "title": translate_text(related["title"])[:100],
-                                "description": translate_text(related["description"])[:500]
-                            })
-                    result["related_errors"] = safe_related
-
-            logger.info(f"Successfully translated {language} error in {result['processing_time']}")
-            return result
-        except re.error as e:
-            logger.error(f"Regex error with pattern: {e}")
-            continue
+                matched = (pattern, match)
+                break
+
+    if skipped and TRIPPED_PATTERNS not in degraded:
+        degraded.append(TRIPPED_PATTERNS)
+
+    if matched:
+        try:
+            with span("render"):
+                result = render_match(*matched, error_message, language, start_time)
         except Exception as e:
-            logger.error(f"Unexpected error in pattern matching: {e}")
-            continue
+            logger.error(f"Unexpected error rendering pattern {matched[0].id}: {e}")
+        else:
+            if degraded:
+                result["degraded"] = degraded
+            REQUEST_LOGGER.info("Successfully translated %s error in %s", language,
+                                result["processing_time"])
+            return result
 
-    # If no pattern matches, return a general response
-    return get_general_response(error_message, language)
+    # If no pattern matches, answer with the most similar known patterns or a general response
+    similar = []
+    if not deadline.expired():
+        with span("fuzzy"):
+            similar = SIMILARITY_INDEX.similar(error_message, pattern_language)
+    with span("render"):
+        if similar and similar[0][1] >= FUZZY_ANSWER_THRESHOLD:
+            result = render_similar(*similar[0], error_message, language, start_time)
+        else:
+            result = get_general_response(error_message, language)
+        if similar:
+            result["similar_errors"] = [
+                {
+                    "id": pattern.id,
+                    "title": unmatched_text(pattern.title)[:200],
+                    "language": pattern.language,
+                    "similarity": round(similarity, 3),
+                }
+                for pattern, similarity in similar
+            ]
+    if deadline.expired():
+        degraded.append(GENERAL_RESPONSE)
+    if degraded:
+        result["degraded"] = degraded
+    return result
 
 
 def get_general_response(error_message, language, output_language=None):
@@ -310,19 +779,8 @@ def get_general_response(error_message, language, output_language=None):
     Returns:
         dict: A dictionary with generic error information
     """
-    # General responses for different languages
-    generic_titles = {
-        "python": "Python Error",
-        "javascript": "JavaScript Error",
-        "html": "HTML Error",
-        "css": "CSS Error",
-        "java": "Java Error",
-        "ruby": "Ruby Error",
-        "general": "Code Error",
-    }
-
-    # Get the title based on the language
-    title = generic_titles.get(language, "Code Error")
+    # Get the title based on the language's pack
+    title = LANGUAGE_PACKS.generic_title(language)
     if language == "general":
         title = "Unknown Error"
 
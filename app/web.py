@@ -0,0 +1,189 @@
+"""
+Web application.
+
+This module creates the Flask application, its error handlers and routes,
+and main() runs it with the options of app.py. It is imported the first time
+`app.app` is used, so code that only translates (such as the daemon client
+and `error-translator translate`) starts without loading Flask.
+"""
+import os
+import argparse
+
+from flask import Flask, jsonify
+from werkzeug.exceptions import HTTPException
+
+from app import configure_from_environment
+
+# Create the Flask application instance
+app = Flask("app")
+
+# Log format, external cache and tenants given through environment variables
+configure_from_environment()
+
+
+# Error handlers
+@app.errorhandler(HTTPException)
+def handle_http_error(error):
+    """Handle HTTP errors."""
+    response = jsonify({
+        "error": {
+            "code": error.code,
+            "name": error.name,
+            "description": error.description
+        }
+    })
+    response.status_code = error.code
+    # Keep headers such as Retry-After that the exception carries
+    for name, value in error.get_headers():
+        if name.lower() != "content-type":
+            response.headers[name] = value
+    return response
+
+
+@app.errorhandler(Exception)
+def handle_generic_error(error):
+    """Handle non-HTTP errors."""
+    app.logger.error(f"Unhandled error: {str(error)}", exc_info=True)
+    response = jsonify({
+        "error": {
+            "code": 500,
+            "name": "Internal Server Error",
+            "description": "An unexpected error occurred"
+        }
+    })
+    response.status_code = 500
+    return response
+
+
+# Register the page and API routes
+from app import routes  # noqa: E402, F401
+
+
+# Main function to run the Flask application
+def main(argv=None, prog=None):
+    """Run the Flask application."""
+    # Set up argument parser for command-line options
+    parser = argparse.ArgumentParser(prog=prog, description="Run the Error Message Translator app")
+    parser.add_argument("--port", type=int, default=5001, help="Port to run the app on")
+    parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Host to bind to (use 0.0.0.0 for all interfaces)")
+    parser.add_argument("--prod", action="store_true",
+                        help="Run in production mode with secure settings")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes in production mode (default: CPU count)")
+    parser.add_argument("--shared-cache", action="store_true",
+                        help="Share translation results between worker processes (production mode)")
+    parser.add_argument("--cache-backend", type=str, default=None,
+                        help="External cache shared between nodes: "
+                             "memory://, disk:///path or redis://host:port/db")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Scan patterns on this many shard processes "
+                             "(per worker in production mode)")
+    parser.add_argument("--shard-by", choices=["hash", "language"], default="hash",
+                        help="How patterns are assigned to shards")
+    parser.add_argument("--trace", type=str, default=None, metavar="PATH",
+                        help="Append a JSON line with the stage timings of every API request "
+                             "to PATH")
+    parser.add_argument("--server-timing", action="store_true",
+                        help="Report stage timings in a Server-Timing header on API responses")
+    parser.add_argument("--tenants", type=str, default=None, metavar="PATH",
+                        help="JSON file of tenants' private patterns and API keys")
+    parser.add_argument("--trust-tenant-header", action="store_true",
+                        help="Pick the tenant from the X-Tenant header without an API key "
+                             "(behind an authenticating proxy)")
+    parser.add_argument("--daemon", type=str, default=None, metavar="SOCKET",
+                        help="Serve translations over a Unix socket for local clients "
+                             "instead of HTTP")
+    parser.add_argument("--log-json", action="store_true", help="Write logs as JSON lines")
+    parser.add_argument("--log-rate", type=float, default=None,
+                        help="Per-request log records written per second (default: 10)")
+    args = parser.parse_args(argv)
+
+    # Determine if we're running in debug mode
+    # In production mode, override any debug flags for security
+    debug_mode = False if args.prod else (
+        args.debug or os.environ.get('FLASK_DEBUG', 'False').lower() == 'true')
+
+    # In production, only bind to loopback unless explicitly specified
+    host = args.host
+
+    # Configure production settings
+    if args.prod:
+        # Default to loopback in production for security
+        host = os.environ.get('HOST', '127.0.0.1')
+
+        # Ensure we're not exposing debug features
+        os.environ['FLASK_DEBUG'] = 'False'
+        app.config['DEBUG'] = False
+
+        # Ensure secure cookie settings
+        app.config['SESSION_COOKIE_SECURE'] = True
+        app.config['SESSION_COOKIE_HTTPONLY'] = True
+        app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+
+        # Disable JSON key sorting to prevent potential information leakage
+        app.config['JSON_SORT_KEYS'] = False
+
+        # Add additional security headers in production
+        os.environ['ENABLE_STRICT_TRANSPORT_SECURITY'] = 'True'
+
+        print("Running in production mode with secure settings")
+    elif debug_mode:
+        print("WARNING: Running in debug mode. Not recommended for production!")
+        if host == '0.0.0.0':
+            print("SECURITY WARNING: Debug mode is enabled and the server is accessible "
+                  "from all interfaces")
+            print("Consider using 127.0.0.1 instead for local development")
+
+    # Share translation results with other nodes through an external cache
+    if args.cache_backend:
+        from app.cache import configure_backend
+
+        configure_backend(args.cache_backend)
+
+    # Teams' private patterns, compiled on their first request
+    if args.tenants:
+        from app.data.tenants import configure_tenants
+
+        configure_tenants(args.tenants, trust_header=args.trust_tenant_header)
+
+    # Log format and per-request sampling
+    if args.log_json or args.log_rate is not None:
+        from app.logs import REQUEST_LOG_RATE, configure_logging
+
+        configure_logging(json_output=args.log_json,
+                          request_rate=REQUEST_LOG_RATE if args.log_rate is None else args.log_rate)
+
+    # Record stage timings of API requests
+    if args.trace or args.server_timing:
+        from app.tracing import JsonLinesExporter, configure_tracing
+
+        configure_tracing(JsonLinesExporter(args.trace) if args.trace else None,
+                          server_timing=args.server_timing)
+
+    # Serve local clients over a Unix socket (see app/daemon_client.py)
+    if args.daemon:
+        from app.daemon import serve_daemon
+
+        serve_daemon(args.daemon, shards=args.shards, shard_by=args.shard_by)
+        return
+
+    # Apply maximum request size limits to prevent DOS attacks
+    app.config['MAX_CONTENT_LENGTH'] = 1 * 1024 * 1024  # 1 MB limit
+
+    # Start the Flask application with appropriate settings
+    # In production mode, use the pre-forking server to scale across CPU cores
+    if args.prod:
+        from app.server import serve
+
+        serve(app, host=host, port=args.port, workers=args.workers, shared_cache=args.shared_cache,
+              shards=args.shards, shard_by=args.shard_by)
+        return
+
+    if args.shards:
+        from app.sharding import enable_sharding
+
+        enable_sharding(args.shards, args.shard_by)
+
+    app.run(debug=debug_mode, host=host, port=args.port, threaded=True)
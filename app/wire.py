@@ -0,0 +1,268 @@
+"""
+Binary Frame Protocol
+
+This module frames messages for the local daemon: each frame is a 4-byte
+big-endian body length followed by the body encoded as msgpack. Frames are
+self-delimiting, so a client can write many requests before reading any
+response (pipelining) and both sides read them back from one buffer.
+
+The ``msgpack`` package is used when installed. Otherwise a small built-in
+codec handles the types the protocol carries (nil, booleans, integers,
+floats, strings, binary, arrays and maps), producing the same bytes.
+"""
+import struct
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+# Length prefix of every frame
+HEADER = struct.Struct(">I")
+
+# Largest frame body accepted, well above the longest message translated
+MAX_FRAME_SIZE = 4 * 1024 * 1024
+
+# Bytes asked of the socket per read
+RECV_SIZE = 64 * 1024
+
+# Deepest nesting of arrays and maps decoded
+MAX_DEPTH = 32
+
+
+class FrameError(ValueError):
+    """Raised for a frame that is oversized, truncated or not valid msgpack."""
+
+
+def _pack(obj: Any, out: bytearray, depth: int = 0) -> None:
+    if depth > MAX_DEPTH:
+        raise FrameError("Value is nested too deeply")
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -0x20 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif 0 <= obj <= 0xFF:
+            out += struct.pack(">BB", 0xCC, obj)
+        elif 0 <= obj <= 0xFFFF:
+            out += struct.pack(">BH", 0xCD, obj)
+        elif 0 <= obj <= 0xFFFFFFFF:
+            out += struct.pack(">BI", 0xCE, obj)
+        elif 0 <= obj <= 0xFFFFFFFFFFFFFFFF:
+            out += struct.pack(">BQ", 0xCF, obj)
+        elif -0x80 <= obj:
+            out += struct.pack(">Bb", 0xD0, obj)
+        elif -0x8000 <= obj:
+            out += struct.pack(">Bh", 0xD1, obj)
+        elif -0x80000000 <= obj:
+            out += struct.pack(">Bi", 0xD2, obj)
+        elif -0x8000000000000000 <= obj:
+            out += struct.pack(">Bq", 0xD3, obj)
+        else:
+            raise FrameError(f"Integer {obj} does not fit in 64 bits")
+    elif isinstance(obj, float):
+        out += struct.pack(">Bd", 0xCB, obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8", "surrogatepass")
+        size = len(data)
+        if size < 0x20:
+            out.append(0xA0 | size)
+        elif size <= 0xFF:
+            out += struct.pack(">BB", 0xD9, size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDA, size)
+        else:
+            out += struct.pack(">BI", 0xDB, size)
+        out += data
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        size = len(obj)
+        if size <= 0xFF:
+            out += struct.pack(">BB", 0xC4, size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xC5, size)
+        else:
+            out += struct.pack(">BI", 0xC6, size)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 0x10:
+            out.append(0x90 | size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDC, size)
+        else:
+            out += struct.pack(">BI", 0xDD, size)
+        for item in obj:
+            _pack(item, out, depth + 1)
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 0x10:
+            out.append(0x80 | size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDE, size)
+        else:
+            out += struct.pack(">BI", 0xDF, size)
+        for key, value in obj.items():
+            _pack(key, out, depth + 1)
+            _pack(value, out, depth + 1)
+    else:
+        raise FrameError(f"Cannot encode {type(obj).__name__}")
+
+
+# Fixed-size values: tag -> (struct format, size)
+_FIXED = {
+    0xCA: (">f", 4), 0xCB: (">d", 8),
+    0xCC: (">B", 1), 0xCD: (">H", 2), 0xCE: (">I", 4), 0xCF: (">Q", 8),
+    0xD0: (">b", 1), 0xD1: (">h", 2), 0xD2: (">i", 4), 0xD3: (">q", 8),
+}
+
+# Length-prefixed values: tag -> (kind, struct format of the length, its size)
+_SIZED = {
+    0xD9: ("str", ">B", 1), 0xDA: ("str", ">H", 2), 0xDB: ("str", ">I", 4),
+    0xC4: ("bin", ">B", 1), 0xC5: ("bin", ">H", 2), 0xC6: ("bin", ">I", 4),
+    0xDC: ("array", ">H", 2), 0xDD: ("array", ">I", 4),
+    0xDE: ("map", ">H", 2), 0xDF: ("map", ">I", 4),
+}
+
+
+def _unpack(data: bytes, pos: int, depth: int = 0):
+    """Decode the value at pos; returns it and the position after it."""
+    if depth > MAX_DEPTH:
+        raise FrameError("Value is nested too deeply")
+    tag = data[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xE0:
+        return tag - 0x100, pos
+    if tag in _FIXED:
+        fmt, size = _FIXED[tag]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if tag == 0xC0:
+        return None, pos
+    if tag in (0xC2, 0xC3):
+        return tag == 0xC3, pos
+
+    if 0xA0 <= tag <= 0xBF:
+        kind, size = "str", tag & 0x1F
+    elif 0x90 <= tag <= 0x9F:
+        kind, size = "array", tag & 0x0F
+    elif 0x80 <= tag <= 0x8F:
+        kind, size = "map", tag & 0x0F
+    elif tag in _SIZED:
+        kind, fmt, width = _SIZED[tag]
+        size = struct.unpack_from(fmt, data, pos)[0]
+        pos += width
+    else:
+        raise FrameError(f"Unsupported msgpack type 0x{tag:02x}")
+
+    if kind in ("str", "bin"):
+        end = pos + size
+        if end > len(data):
+            raise FrameError("Truncated value")
+        value = data[pos:end]
+        return (value.decode("utf-8", "surrogatepass") if kind == "str" else bytes(value)), end
+    if kind == "array":
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(data, pos, depth + 1)
+            items.append(item)
+        return items, pos
+    mapping = {}
+    for _ in range(size):
+        key, pos = _unpack(data, pos, depth + 1)
+        value, pos = _unpack(data, pos, depth + 1)
+        try:
+            mapping[key] = value
+        except TypeError:
+            raise FrameError(f"Unhashable map key of type {type(key).__name__}")
+    return mapping, pos
+
+
+def packb(obj: Any) -> bytes:
+    """Encode a value as msgpack."""
+    if msgpack is not None:
+        try:
+            return msgpack.packb(obj, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise FrameError(str(e))
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode one msgpack value that fills the whole of data.
+
+    Raises:
+        FrameError: data is not exactly one supported msgpack value
+    """
+    if msgpack is not None:
+        try:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False,
+                                   max_buffer_size=MAX_FRAME_SIZE)
+        except Exception as e:
+            raise FrameError(f"Invalid msgpack frame: {e}")
+    try:
+        value, end = _unpack(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise FrameError(f"Invalid msgpack frame: {e}")
+    if end != len(data):
+        raise FrameError("Invalid msgpack frame: trailing bytes")
+    return value
+
+
+def encode_frame(obj: Any) -> bytes:
+    """Encode a value as a length-prefixed frame."""
+    body = packb(obj)
+    if len(body) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(body)} bytes exceeds {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(body)) + body
+
+
+class FrameReader:
+    """Reads frames from a socket, keeping bytes that arrived ahead of them."""
+
+    def __init__(self, sock, max_size: int = MAX_FRAME_SIZE):
+        self._sock = sock
+        self._buffer = bytearray()
+        self.max_size = max_size
+
+    def _frame_size(self):
+        """Size of the buffered frame, header included, or None if its header has not arrived."""
+        if len(self._buffer) < HEADER.size:
+            return None
+        size = HEADER.unpack_from(self._buffer)[0]
+        if size > self.max_size:
+            raise FrameError(f"Frame of {size} bytes exceeds {self.max_size}")
+        return HEADER.size + size
+
+    def has_frame(self) -> bool:
+        """Whether a whole frame is already buffered, so read() will not block."""
+        size = self._frame_size()
+        return size is not None and len(self._buffer) >= size
+
+    def read(self) -> Any:
+        """Return the next frame's value, waiting for it to arrive.
+
+        Raises:
+            EOFError: the peer closed the connection between frames
+            FrameError: the frame is invalid or the connection closed inside it
+        """
+        while not self.has_frame():
+            chunk = self._sock.recv(RECV_SIZE)
+            if not chunk:
+                if self._buffer:
+                    raise FrameError("Connection closed inside a frame")
+                raise EOFError("Connection closed")
+            self._buffer += chunk
+        size = self._frame_size()
+        body = bytes(self._buffer[HEADER.size:size])
+        del self._buffer[:size]
+        return unpackb(body)
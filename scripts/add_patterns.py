@@ -18,8 +18,11 @@ import argparse
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
 
-# Languages supported by the application
-SUPPORTED_LANGUAGES = ["python", "javascript", "java", "ruby", "html", "css", "general"]
+from app.data.packs import BUILTIN_PACKS  # noqa: E402
+
+# Languages of the built-in packs, whose patterns live under app/data/patterns
+# (plugin packs ship their own patterns)
+SUPPORTED_LANGUAGES = [pack.language for pack in BUILTIN_PACKS]
 
 # Pattern template
 PATTERN_TEMPLATE = """\
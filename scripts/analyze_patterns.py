@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Pattern Analysis Script
+
+This script lists the patterns that can never be the first match for any
+message: exact duplicates and patterns shadowed by an earlier pattern. The
+translator already skips them at load time; the report shows which ones to
+delete from the pattern modules.
+
+With --backup it also checks the legacy app/data/error_patterns_backup.py
+lists against the live patterns, showing which backup entries add nothing
+and which still match messages no live pattern answers.
+
+Usage:
+    python scripts/analyze_patterns.py
+    python scripts/analyze_patterns.py --corpus messages.txt --json report.json
+    python scripts/analyze_patterns.py --backup
+    python scripts/analyze_patterns.py --prebuild
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add the parent directory to sys.path to allow importing app modules
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+# Analyse the registry as written, before dead patterns are set aside
+os.environ["PRUNE_DEAD_PATTERNS"] = "0"
+
+# Lists in the backup module, by language
+BACKUP_LISTS = {
+    "python": "PYTHON_PATTERNS",
+    "javascript": "JAVASCRIPT_PATTERNS",
+    "java": "JAVA_PATTERNS",
+    "ruby": "RUBY_PATTERNS",
+    "html": "HTML_PATTERNS",
+    "css": "CSS_PATTERNS",
+    "general": "GENERAL_PATTERNS",
+}
+
+
+def load_corpus(path):
+    """Read messages from a text file (one per line) or a JSON array of strings."""
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return [item for item in json.loads(text) if isinstance(item, str)]
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def analyze_backup(registry, corpus):
+    """Append the backup lists after the live patterns and report the backup entries."""
+    from app.data import error_patterns_backup
+    from app.data.analysis import find_dead_patterns
+    from app.data.registry import PatternRegistry
+
+    combined = PatternRegistry()
+    live_counts = {}
+    for language, name in BACKUP_LISTS.items():
+        live = [pattern.to_dict() for pattern in registry.patterns(language)]
+        live_counts[language] = len(live)
+        combined.add_language(language, live + list(getattr(error_patterns_backup, name, [])))
+
+    dead = {issue["id"]: issue for issue in find_dead_patterns(combined, corpus)}
+    redundant, unique = [], []
+    for language, count in live_counts.items():
+        for pattern in combined.patterns(language)[count:]:
+            if pattern.id in dead:
+                redundant.append(dead[pattern.id])
+            else:
+                unique.append({"id": pattern.id, "language": language, "regex": pattern.source})
+    return {"redundant": redundant, "unique": unique}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate and shadowed error patterns")
+    parser.add_argument("--corpus",
+                        help="Extra messages to probe with: text file (one per line) or JSON array")
+    parser.add_argument("--backup", action="store_true",
+                        help="Also check the legacy error_patterns_backup.py lists")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    parser.add_argument("--prebuild", action="store_true",
+                        help="Save the dead patterns of the shipped packs for the translator "
+                             "to load at startup")
+    args = parser.parse_args()
+
+    from app.data.analysis import find_dead_patterns, save_prebuilt_dead_patterns
+    from app.data.error_patterns import PREBUILT_DEAD_PATTERNS, REGISTRY
+
+    if args.prebuild:
+        dead = save_prebuilt_dead_patterns(REGISTRY, PREBUILT_DEAD_PATTERNS)
+        print(f"Saved {len(dead)} dead patterns to {PREBUILT_DEAD_PATTERNS}")
+        return
+
+    corpus = load_corpus(args.corpus)
+    report = {"dead": find_dead_patterns(REGISTRY, corpus)}
+
+    print(f"{len(report['dead'])} of {len(REGISTRY)} patterns can never match first:")
+    for issue in report["dead"]:
+        print(f"  {issue['id']:<16} {issue['kind']:<10} by {', '.join(issue['by']):<24} "
+              f"{issue['regex'][:70]}")
+
+    if args.backup:
+        report["backup"] = analyze_backup(REGISTRY, corpus)
+        backup = report["backup"]
+        print(f"\nBackup patterns: {len(backup['redundant'])} redundant with the live patterns, "
+              f"{len(backup['unique'])} still unique:")
+        for entry in backup["unique"]:
+            print(f"  {entry['language']:<11} {entry['regex'][:90]}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,907 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script
+
+This script measures the performance characteristics of the translator.
+
+Usage:
+    python scripts/benchmark.py memory
+    python scripts/benchmark.py server --workers 1 2 4
+    python scripts/benchmark.py dispatch
+    python scripts/benchmark.py literals
+    python scripts/benchmark.py allocations
+    python scripts/benchmark.py engines
+    python scripts/benchmark.py shards --patterns 1000 10000
+    python scripts/benchmark.py logging --threads 1 4
+    python scripts/benchmark.py fuzzy
+    python scripts/benchmark.py suggest
+    python scripts/benchmark.py tenants --tenants 100 --patterns 20
+    python scripts/benchmark.py packs --packs 10 --patterns 200
+    python scripts/benchmark.py daemon --requests 2000
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import http.client
+import multiprocessing
+
+# Add the parent directory to sys.path to allow importing app modules
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+# Code run in a fresh interpreter for each memory measurement. Each snippet
+# prints the resident set size (KiB) and traced Python allocations (bytes)
+# once the patterns are loaded.
+MEMORY_PROBE = """
+import sys, gc, json, tracemalloc, resource
+sys.path.insert(0, {root!r})
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# Import the package, Flask and the registry code up front so only pattern data
+# is measured (the package no longer imports Flask itself)
+import re, zlib, logging, flask, app
+import app.data.registry, app.data.packs, app.data.analysis, app.data.patterns
+before = rss_kib()
+tracemalloc.start()
+{load}
+gc.collect()
+traced = tracemalloc.get_traced_memory()[0]
+print(json.dumps({{"rss_before_kib": before, "rss_after_kib": rss_kib(), "traced_bytes": traced}}))
+"""
+
+# Pattern dictionaries kept resident, as the translator used to hold them
+LOAD_DICTS = """
+import app.data.patterns as patterns
+compiled = [re.compile(p["regex"], re.IGNORECASE | re.DOTALL) for p in patterns.ALL_PATTERNS]
+"""
+
+# Compact registry records with compressed display text
+LOAD_REGISTRY = """
+from app.data.error_patterns import REGISTRY
+"""
+
+
+def measure_memory(load):
+    """Run a loader snippet in a fresh interpreter and return its memory figures."""
+    code = MEMORY_PROBE.format(root=parent_dir, load=load)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    # Pattern modules print their counts while loading; the figures are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark_memory(args):
+    """Report per-worker memory used by the pattern data before and after compaction."""
+    results = {
+        "dicts": measure_memory(LOAD_DICTS),
+        "registry": measure_memory(LOAD_REGISTRY),
+    }
+    for name, figures in results.items():
+        figures["rss_delta_kib"] = figures["rss_after_kib"] - figures["rss_before_kib"]
+        print(
+            f"{name:>10}: RSS {figures['rss_after_kib']} KiB "
+            f"(+{figures['rss_delta_kib']} KiB while loading), "
+            f"traced allocations {figures['traced_bytes'] / 1024:.1f} KiB"
+        )
+    return results
+
+
+# Request body sent by the server throughput benchmark
+SERVER_REQUEST = json.dumps({
+    "error_message": "NameError: name 'total' is not defined",
+    "language": "auto",
+})
+
+
+def free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    """Block until something accepts connections on the port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+def drive_server(port, duration):
+    """Send translate requests back to back for a duration and return the count."""
+    completed = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("POST", "/api/translate", SERVER_REQUEST,
+                           {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        if response.status == 200:
+            completed += 1
+    return completed
+
+
+def benchmark_server(args):
+    """Measure /api/translate throughput of the production server per worker count."""
+    results = {}
+    for workers in args.workers:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(parent_dir, "app.py"), "--prod",
+             "--port", str(port), "--workers", str(workers)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            with multiprocessing.Pool(args.clients) as pool:
+                counts = pool.starmap(drive_server, [(port, args.duration)] * args.clients)
+        finally:
+            server.terminate()
+            server.wait()
+        throughput = sum(counts) / args.duration
+        results[workers] = {"requests": sum(counts), "requests_per_second": throughput}
+        print(f"{workers:>3} workers: {throughput:8.1f} req/s ({sum(counts)} requests)")
+    print(f"CPU cores available: {os.cpu_count()}")
+    return results
+
+
+# Error messages matched by the dispatch benchmark, with their languages
+DISPATCH_MESSAGES = [
+    ("python", "Traceback (most recent call last):\n  File \"app.py\", line 3, in <module>\n"
+               "IndentationError: unexpected indent"),
+    ("python", "AttributeError: 'NoneType' object has no attribute 'split'"),
+    ("python", "SyntaxError: unexpected character after line continuation character"),
+    ("javascript", "Uncaught TypeError: Assignment to constant variable."),
+    ("javascript", "ReferenceError: total is not defined"),
+    ("java", "Exception in thread \"main\" java.util.NoSuchElementException\n"
+             "    at Main.main(Main.java:5)"),
+    ("java", "java.lang.OutOfMemoryError: Java heap space"),
+    ("ruby", "LoadError: cannot load such file -- nokogiri"),
+    ("ruby", "NoMethodError: undefined method `upcase' for nil:NilClass"),
+    ("python", "ValueError: invalid literal for int() with base 10: 'x'"),
+]
+
+
+def first_match(patterns, message):
+    """Return how many patterns were tried until the first match (all if none matched)."""
+    for tried, pattern in enumerate(patterns, 1):
+        if pattern.regex.search(message):
+            return tried
+    return len(patterns)
+
+
+def benchmark_dispatch(args):
+    """Compare a full pattern scan with exception type dispatch."""
+    from app.data.error_patterns import REGISTRY
+    from app.data.registry import exception_types
+
+    def full_scan(language, message):
+        return first_match(REGISTRY.patterns(language), message)
+
+    def dispatch(language, message):
+        types = exception_types(message)
+        return first_match(REGISTRY.candidates(language, types), message)
+
+    results = {}
+    for name, strategy in (("full_scan", full_scan), ("dispatch", dispatch)):
+        tried = sum(strategy(language, message) for language, message in DISPATCH_MESSAGES)
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for language, message in DISPATCH_MESSAGES:
+                strategy(language, message)
+        elapsed = time.perf_counter() - started
+        per_message = elapsed / (args.iterations * len(DISPATCH_MESSAGES)) * 1e6
+        results[name] = {"microseconds_per_message": per_message, "patterns_tried": tried}
+        print(f"{name:>10}: {per_message:7.2f} us/message, {tried} patterns tried "
+              f"for {len(DISPATCH_MESSAGES)} messages")
+    return results
+
+
+# Extra messages for the literal benchmark, so the CSS and general packs also see hits
+LITERAL_MESSAGES = [
+    "Unknown property 'colr' at line 4",
+    "Error: ENOENT: No such file or directory, open 'config.json'",
+    "PermissionError: [Errno 13] Permission denied: '/etc/hosts'",
+]
+
+
+def benchmark_literals(args):
+    """Compare regex-only matching with the literal fast path, per pattern pack."""
+    from app.data.error_patterns import REGISTRY
+
+    messages = [message for _, message in DISPATCH_MESSAGES] + LITERAL_MESSAGES
+
+    def regex_only(patterns):
+        for message in messages:
+            for pattern in patterns:
+                pattern.regex.search(message)
+
+    def fast_path(patterns):
+        # As the translator does: fold only for literal patterns, which alone
+        # go through ErrorPattern.search
+        has_literals = any(pattern.literals is not None for pattern in patterns)
+        for message in messages:
+            folded = message.casefold() if has_literals else None
+            for pattern in patterns:
+                if pattern.literals is None:
+                    pattern.regex.search(message)
+                else:
+                    pattern.search(message, folded)
+
+    results = {}
+    for language in REGISTRY.languages():
+        patterns = REGISTRY.patterns(language)
+        timings = {}
+        for name, strategy in (("regex", regex_only), ("literal", fast_path)):
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                strategy(patterns)
+            elapsed = time.perf_counter() - started
+            timings[name] = elapsed / (args.iterations * len(messages)) * 1e6
+        literal_count = sum(1 for pattern in patterns if pattern.literals is not None)
+        speedup = timings["regex"] / timings["literal"]
+        results[language] = {
+            "patterns": len(patterns),
+            "literal_patterns": literal_count,
+            "regex_microseconds_per_message": timings["regex"],
+            "literal_microseconds_per_message": timings["literal"],
+            "speedup": speedup,
+        }
+        print(f"{language:>10}: {literal_count:2}/{len(patterns):2} literal, "
+              f"{timings['regex']:6.2f} -> {timings['literal']:6.2f} us/message ({speedup:.2f}x)")
+    return results
+
+
+# A long traceback, so per-request copies of the message dominate allocations
+ALLOCATION_MESSAGE = (
+    "Traceback (most recent call last):\n"
+    + '  File "app.py", line 12, in handler\n    result = compute(values)\n' * 120
+    + "NameError: name 'total_{}' is not defined"
+)
+
+
+def benchmark_allocations(args):
+    """Measure peak memory allocated and time per uncached translation."""
+    import logging
+    from app.translator import TRANSLATION_CACHE, detect_language, translate_error
+
+    logging.disable(logging.INFO)
+    messages = [ALLOCATION_MESSAGE.format(i) for i in range(args.requests)]
+
+    def translate_uncached(message):
+        TRANSLATION_CACHE.clear()
+        detect_language.cache_clear()
+        return translate_error(message)
+
+    for message in messages[:10]:
+        translate_uncached(message)  # Warm up lazily built state
+
+    peaks = []
+    tracemalloc.start()
+    for message in messages:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        translate_uncached(message)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for message in messages:
+        translate_uncached(message)
+    elapsed = (time.perf_counter() - started) / len(messages)
+
+    results = {
+        "message_length": len(messages[0]),
+        "peak_bytes_per_request": sum(peaks) / len(peaks),
+        "microseconds_per_request": elapsed * 1e6,
+    }
+    print(f"{results['message_length']} character message: "
+          f"{results['peak_bytes_per_request'] / 1024:.1f} KiB peak allocation, "
+          f"{results['microseconds_per_request']:.0f} us per uncached request")
+    return results
+
+
+# Pattern and input that make backtracking engines take exponential time
+REDOS_PATTERN = r"(\w+\s?)+$"
+
+
+def benchmark_engines(args):
+    """Compare the installed regex engines on every pattern and on a pathological one."""
+    from app.data.error_patterns import REGISTRY
+    from app.regex_engines import ENGINES, RegexEngineError
+
+    messages = [message for _, message in DISPATCH_MESSAGES] + LITERAL_MESSAGES
+    redos_input = "a" * args.redos_length + "!"
+    results = {}
+    for name, engine in ENGINES.items():
+        if not engine.available:
+            print(f"{name:>6}: not installed")
+            continue
+        compiled = []
+        for pattern in REGISTRY:
+            try:
+                compiled.append(engine.compile(pattern.source, pattern.flags))
+            except RegexEngineError:
+                pass
+
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for message in messages:
+                for regex in compiled:
+                    regex.search(message)
+        per_message = (time.perf_counter() - started) / (args.iterations * len(messages)) * 1e6
+
+        redos = engine.compile(REDOS_PATTERN, 0)
+        started = time.perf_counter()
+        redos.search(redos_input)
+        redos_ms = (time.perf_counter() - started) * 1000
+
+        results[name] = {
+            "compatible_patterns": len(compiled),
+            "microseconds_per_message": per_message,
+            "pathological_milliseconds": redos_ms,
+        }
+        print(f"{name:>6}: {len(compiled)}/{len(REGISTRY)} patterns compatible, "
+              f"{per_message:7.2f} us/message, {redos_ms:9.2f} ms on {REDOS_PATTERN} "
+              f"with {len(redos_input)} characters")
+    return results
+
+
+def synthetic_patterns(count):
+    """Community-style patterns that each need a full regex scan of the message."""
+    return [
+        {
+            "regex": rf"(?:fatal|error) E{i:05d}: ([\w.]+) failed at line (\d+)",
+            "title": f"Synthetic error {i}",
+            "explanation": "Generated for benchmarking.",
+            "solution": "None needed.",
+        }
+        for i in range(count)
+    ]
+
+
+def benchmark_shards(args):
+    """Compare single-process scans with scatter-gather across shard processes by registry size."""
+    import logging
+    from app.data.error_patterns import REGISTRY
+    from app.sharding import ShardPool
+
+    logging.disable(logging.WARNING)
+    padding = "  at com.example.Service.handle(Service.java:42)\n" * 150
+    cases = {}
+    for count in args.patterns:
+        language = f"synthetic{count}"
+        REGISTRY.add_language(language, synthetic_patterns(count))
+        # Only the lowest-priority pattern matches, so every pattern is scanned
+        cases[count] = (language, padding + f"error E{count - 1:05d}: app.main failed at line 7")
+    REGISTRY.add_language("synthetic_overhead", synthetic_patterns(1))
+
+    def local_first_match(language, text):
+        folded = text.casefold()
+        for rank, pattern in enumerate(REGISTRY.patterns(language)):
+            if pattern.search(text, folded):
+                return rank
+        return None
+
+    def timed(function, *call_args):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            function(*call_args)
+        return (time.perf_counter() - started) / args.repeat * 1000
+
+    pool = ShardPool(timeout=60)
+    pool.start(args.shards, "hash")
+    try:
+        overhead_ms = timed(pool.first_match, "error", "synthetic_overhead", ())
+        results = {"shards": args.shards, "cpu_count": os.cpu_count(), "round_trip_ms": overhead_ms,
+                   "sizes": {}}
+        print(f"{args.shards} shards on {os.cpu_count()} CPU(s), round trip {overhead_ms:.3f} ms")
+        for count, (language, text) in cases.items():
+            local_ms = timed(local_first_match, language, text)
+            sharded_ms = timed(pool.first_match, text, language, ())
+            results["sizes"][count] = {"local_ms": local_ms, "sharded_ms": sharded_ms}
+            print(f"{count:>7} patterns: single process {local_ms:9.3f} ms, "
+                  f"sharded {sharded_ms:9.3f} ms")
+    finally:
+        pool.stop()
+
+    # Sharding wins once the scan time it saves exceeds the round trip
+    largest = max(cases)
+    per_pattern_ms = results["sizes"][largest]["local_ms"] / largest
+    parallel = min(args.shards, os.cpu_count() or 1)
+    if parallel > 1:
+        threshold = overhead_ms / (per_pattern_ms * (1 - 1 / parallel))
+        results["break_even_patterns"] = threshold
+        print(f"Estimated break-even: {threshold:.0f} patterns per language")
+    else:
+        results["break_even_patterns"] = None
+        print("Sharding cannot beat a single process with one CPU")
+    return results
+
+
+def benchmark_logging(args):
+    """Measure translation throughput with synchronous logging and with the queued pipeline."""
+    import logging
+    import tempfile
+    import threading
+    from app.logs import LOG_FORMAT, LOG_PIPELINE, configure_logging
+    from app.translator import TRANSLATION_CACHE, detect_language, translate_error
+
+    messages = [f"NameError: name 'total_{i}' is not defined" for i in range(args.requests)]
+
+    def synchronous(stream):
+        # What logging.basicConfig sets up: every record formatted and written by the caller
+        LOG_PIPELINE.stop()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logging.getLogger().addHandler(handler)
+        return lambda: logging.getLogger().removeHandler(handler)
+
+    def queued(stream):
+        configure_logging(stream=stream, request_rate=args.rate)
+        return LOG_PIPELINE.stop
+
+    def run(threads):
+        TRANSLATION_CACHE.clear()
+        detect_language.cache_clear()
+        share = [messages[i::threads] for i in range(threads)]
+        workers = [
+            threading.Thread(target=lambda part=part: [translate_error(m, "python") for m in part])
+            for part in share
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return len(messages) / (time.perf_counter() - started)
+
+    results = {}
+    for threads in args.threads:
+        results[threads] = {}
+        for name, setup in (("synchronous", synchronous), ("queued", queued)):
+            with tempfile.TemporaryFile("w+") as stream:
+                teardown = setup(stream)
+                run(threads)  # Warm up
+                throughput = run(threads)
+                teardown()
+                stream.seek(0)
+                lines = sum(1 for _ in stream)
+            results[threads][name] = {"requests_per_second": throughput, "log_lines": lines}
+        synchronous_rate = results[threads]["synchronous"]["requests_per_second"]
+        queued_rate = results[threads]["queued"]["requests_per_second"]
+        gain = queued_rate / synchronous_rate
+        results[threads]["speedup"] = gain
+        print(f"{threads:>3} threads: synchronous {synchronous_rate:8.0f} req/s, "
+              f"queued {queued_rate:8.0f} req/s ({gain:.2f}x)")
+    configure_logging()
+    return results
+
+
+# Messages no pattern matches, as seen in unmatched traffic
+FUZZY_MESSAGES = [
+    "NameErro: name 'x' is not definedd",
+    "TypeError: foo.bar is not a functon",
+    "Segmentation fault (core dumped)",
+    "IndexError: list index out of range",
+    "java.lang.ClassCastExeption: Integer cannot be cast to String",
+    "undefined method 'each' for nil",
+    "Unexpected token } in JSON at position 4",
+    "ValueError: could not convert string to float: 'abc'",
+]
+
+
+def benchmark_fuzzy(args):
+    """Compare the trigram index with comparing a message against every document."""
+    from app.data.error_patterns import REGISTRY
+    from app.data.similarity import SIMILARITY_THRESHOLD, TrigramIndex, query_text, trigrams
+
+    started = time.perf_counter()
+    index = TrigramIndex(REGISTRY)
+    build = time.perf_counter() - started
+
+    def brute_force(message):
+        query = trigrams(query_text(message))
+        best = {}
+        for grams, pattern in zip(index._grams, index._patterns):
+            shared = len(query & grams)
+            similarity = shared / (len(query) + len(grams) - shared)
+            if similarity >= SIMILARITY_THRESHOLD and similarity > best.get(pattern.id, 0.0):
+                best[pattern.id] = similarity
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:3]
+
+    for message in FUZZY_MESSAGES:
+        indexed = [(pattern.id, similarity) for pattern, similarity in index.search(message)]
+        assert indexed == brute_force(message), message  # Pruning must not change the answer
+
+    timings = {}
+    for name, search in (("brute_force", brute_force), ("indexed", index.search)):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for message in FUZZY_MESSAGES:
+                search(message)
+        timings[name] = (time.perf_counter() - started) / (args.iterations * len(FUZZY_MESSAGES))
+
+    queries = (args.iterations + 1) * len(FUZZY_MESSAGES)
+    results = {
+        "documents": len(index),
+        "build_ms": build * 1000,
+        "brute_force_us": timings["brute_force"] * 1e6,
+        "indexed_us": timings["indexed"] * 1e6,
+        "compared_per_query": index.stats["compared"] / queries,
+    }
+    print(f"{results['documents']} documents indexed in {results['build_ms']:.0f} ms")
+    print(f"brute force {results['brute_force_us']:7.1f} us/query")
+    print(f"indexed     {results['indexed_us']:7.1f} us/query "
+          f"({results['compared_per_query']:.0f} documents compared, "
+          f"{timings['brute_force'] / timings['indexed']:.1f}x faster)")
+    return results
+
+
+# Error messages typed one character at a time for the type-ahead benchmark
+TYPED_MESSAGES = [
+    "TypeError: Cannot read properties of undefined",
+    "SyntaxError: unexpected EOF while parsing",
+    "java.lang.NullPointerException",
+    "NoMethodError: undefined method",
+    "Permission denied",
+]
+
+
+def benchmark_suggest(args):
+    """Time type-ahead completions from the signature trie and through the endpoint."""
+    from app import app
+    from app.data.error_patterns import REGISTRY
+    from app.data.suggest import SignatureTrie, normalize_prefix
+
+    started = time.perf_counter()
+    trie = SignatureTrie(REGISTRY)
+    build = time.perf_counter() - started
+    prefixes = [message[:length]
+                for message in TYPED_MESSAGES for length in range(3, len(message) + 1)]
+
+    def linear_scan(prefix):
+        key = normalize_prefix(prefix)
+        found = [(-trie.signature_hits(signature), len(signature.text), signature.text)
+                 for signature in trie.signatures
+                 if normalize_prefix(signature.text).startswith(key)]
+        return [text for _, _, text in sorted(found)[:5]]
+
+    for prefix in prefixes:
+        texts = [suggestion["text"] for suggestion in trie.complete(prefix)]
+        assert texts == linear_scan(prefix), prefix
+
+    timings = {}
+    for name, complete in (("linear_scan", linear_scan), ("trie", trie.complete)):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for prefix in prefixes:
+                complete(prefix)
+        timings[name] = (time.perf_counter() - started) / (args.iterations * len(prefixes))
+
+    client = app.test_client()
+    # Builds the trie behind the endpoint
+    client.get("/api/suggest", query_string={"prefix": prefixes[0]})
+    started = time.perf_counter()
+    for prefix in prefixes:
+        client.get("/api/suggest", query_string={"prefix": prefix})
+    endpoint = (time.perf_counter() - started) / len(prefixes)
+
+    results = {
+        "signatures": len(trie),
+        "build_ms": build * 1000,
+        "linear_scan_us": timings["linear_scan"] * 1e6,
+        "trie_us": timings["trie"] * 1e6,
+        "endpoint_us": endpoint * 1e6,
+    }
+    print(f"{results['signatures']} signatures in the trie, built in {results['build_ms']:.1f} ms")
+    print(f"linear scan {results['linear_scan_us']:7.1f} us/prefix")
+    print(f"trie        {results['trie_us']:7.1f} us/prefix "
+          f"({timings['linear_scan'] / timings['trie']:.1f}x faster)")
+    print(f"endpoint    {results['endpoint_us']:7.1f} us/request (Flask test client)")
+    return results
+
+
+def benchmark_tenants(args):
+    """Time compiling tenant overlays against the shared registry, and matching through them."""
+    from app.data.error_patterns import REGISTRY
+    from app.data.registry import PatternRegistry
+    from app.data.tenants import TenantRegistries
+    from app.translator import match_error
+
+    shared = [(language, [pattern.to_dict() for pattern in REGISTRY.patterns(language)])
+              for language in REGISTRY.languages()]
+    started = time.perf_counter()
+    rebuilt = PatternRegistry()
+    for language, patterns in shared:
+        rebuilt.add_language(language, patterns)
+    shared_ms = (time.perf_counter() - started) * 1000
+
+    tenants = TenantRegistries(REGISTRY, max_tenants=args.cached)
+    for index in range(args.tenants):
+        tenants.define(f"team{index}", {"python": synthetic_patterns(args.patterns)})
+
+    started = time.perf_counter()
+    for index in range(args.tenants):
+        tenants.registry(f"team{index}")
+    compile_ms = (time.perf_counter() - started) * 1000 / args.tenants
+
+    message = "NameError: name 'x' is not defined"
+    overlay = tenants.registry(f"team{args.tenants - 1}")
+    timings = {}
+    for name, registry in (("shared", REGISTRY), ("overlay", overlay)):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            match_error(message, "python", registry=registry)
+        timings[name] = (time.perf_counter() - started) / args.iterations * 1e6
+
+    metrics = tenants.metrics()
+    results = {
+        "shared_compile_ms": shared_ms,
+        "tenant_compile_ms": compile_ms,
+        "tenant_bytes": overlay.nbytes,
+        "cached": metrics["cached"],
+        "evicted": metrics["evicted"],
+        "shared_match_us": timings["shared"],
+        "overlay_match_us": timings["overlay"],
+    }
+    print(f"shared registry ({len(REGISTRY)} patterns) compiled in {shared_ms:.1f} ms")
+    print(f"tenant overlay ({args.patterns} patterns) compiled in {compile_ms:.2f} ms, "
+          f"{overlay.nbytes / 1024:.0f} KiB")
+    print(f"{metrics['cached']} of {args.tenants} tenants cached, {metrics['evicted']} evicted, "
+          f"{metrics['bytes'] / 1024:.0f} KiB in total")
+    print(f"match through shared {timings['shared']:6.1f} us, "
+          f"through overlay {timings['overlay']:6.1f} us")
+    return results
+
+
+def benchmark_packs(args):
+    """Compare the startup cost of extra packs compiled eagerly against loading on first use."""
+    from app.data.packs import PackRegistry, PatternPack
+    from app.data.registry import PatternRegistry
+
+    extra = tuple(PatternPack(f"lang{index}", f"Lang{index}",
+                              lambda: synthetic_patterns(args.patterns),
+                              keywords=[f"lang{index}c"], file_extensions=[f".lang{index}"])
+                  for index in range(args.packs))
+
+    def startup(eager):
+        """Milliseconds to make the extra packs available, best of a few runs."""
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            packs = PackRegistry(PatternRegistry(), builtin=extra, discover=False)
+            packs.file_extensions()
+            if eager:
+                for language in packs.languages():
+                    packs.ensure_loaded(language)
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return packs, best
+
+    _, eager_ms = startup(eager=True)
+    packs, lazy_ms = startup(eager=False)
+    started = time.perf_counter()
+    packs.ensure_loaded("lang0")
+    first_use_ms = (time.perf_counter() - started) * 1000
+
+    results = {
+        "extra_packs": args.packs,
+        "patterns_per_pack": args.patterns,
+        "eager_startup_ms": eager_ms,
+        "lazy_startup_ms": lazy_ms,
+        "first_use_ms": first_use_ms,
+    }
+    print(f"{args.packs} extra packs of {args.patterns} patterns")
+    print(f"compiled at startup  {eager_ms:8.2f} ms")
+    print(f"declared at startup  {lazy_ms:8.2f} ms, first use of one pack {first_use_ms:.2f} ms")
+    return results
+
+
+# One process per message, as a shell loop without the daemon runs the translator
+COLD_TRANSLATE = """
+import sys, json
+sys.path.insert(0, {root!r})
+from app import app
+from app.translator import translate_error
+print(json.dumps(translate_error(sys.argv[1], sys.argv[2])))
+"""
+
+
+def benchmark_daemon(args):
+    """Compare round trips through the Unix socket daemon with HTTP and a process per message."""
+    from app.daemon_client import DaemonClient
+
+    messages = [(message, language) for language, message in DISPATCH_MESSAGES]
+    requests = [messages[i % len(messages)] for i in range(args.requests)]
+    socket_path = os.path.join(tempfile.gettempdir(),
+                               f"error-translator-benchmark-{os.getpid()}.sock")
+    port = free_port()
+    app_py = os.path.join(parent_dir, "app.py")
+    daemon = subprocess.Popen([sys.executable, app_py, "--daemon", socket_path],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    http_server = subprocess.Popen([sys.executable, app_py, "--port", str(port)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Daemon did not start listening on {socket_path}")
+            time.sleep(0.1)
+
+        timings = {}
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+
+        def post(message, language):
+            body = json.dumps({"error_message": message, "language": language})
+            connection.request("POST", "/api/translate", body, {"Content-Type": "application/json"})
+            connection.getresponse().read()
+
+        for message, language in messages:  # Warm the server's cache like the daemon's
+            post(message, language)
+        started = time.perf_counter()
+        for message, language in requests:
+            post(message, language)
+        timings["http_keepalive"] = (time.perf_counter() - started) / len(requests)
+        connection.close()
+
+        with DaemonClient(socket_path) as client:
+            client.translate_many(messages)
+            started = time.perf_counter()
+            for message, language in requests:
+                client.translate(message, language)
+            timings["daemon"] = (time.perf_counter() - started) / len(requests)
+            started = time.perf_counter()
+            client.translate_many(requests)
+            timings["daemon_pipelined"] = (time.perf_counter() - started) / len(requests)
+
+        spawns = requests[:args.spawns]
+        started = time.perf_counter()
+        for message, language in spawns:
+            subprocess.run([sys.executable, "-m", "app.daemon_client", "--socket", socket_path,
+                            "--language", language, message],
+                           cwd=parent_dir, stdout=subprocess.DEVNULL, check=True)
+        timings["client_cli"] = (time.perf_counter() - started) / len(spawns)
+        started = time.perf_counter()
+        for message, language in spawns:
+            subprocess.run([sys.executable, "-c", COLD_TRANSLATE.format(root=parent_dir),
+                            message, language],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings["cold_process"] = (time.perf_counter() - started) / len(spawns)
+    finally:
+        for process in (daemon, http_server):
+            process.terminate()
+            process.wait()
+
+    results = {f"{name}_ms": seconds * 1000 for name, seconds in timings.items()}
+    print(f"cold process per message  {results['cold_process_ms']:8.2f} ms")
+    print(f"client CLI per message    {results['client_cli_ms']:8.2f} ms")
+    print(f"HTTP keep-alive           {results['http_keepalive_ms']:8.3f} ms")
+    print(f"daemon round trip         {results['daemon_ms']:8.3f} ms")
+    print(f"daemon pipelined          {results['daemon_pipelined_ms']:8.3f} ms per message")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the error message translator")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    subparsers.add_parser("memory", help="Per-worker memory used by the pattern data")
+    server_parser = subparsers.add_parser("server",
+                                          help="Production server throughput per worker count")
+    server_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                               help="Worker counts to measure")
+    server_parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes")
+    server_parser.add_argument("--duration", type=float, default=5.0,
+                               help="Seconds per measurement")
+    dispatch_parser = subparsers.add_parser(
+        "dispatch", help="Full pattern scan against exception type dispatch")
+    dispatch_parser.add_argument("--iterations", type=int, default=2000,
+                                 help="Passes over the sample messages")
+    literals_parser = subparsers.add_parser(
+        "literals", help="Regex-only matching against the literal fast path per pack")
+    literals_parser.add_argument("--iterations", type=int, default=2000,
+                                 help="Passes over the sample messages")
+    allocations_parser = subparsers.add_parser(
+        "allocations", help="Peak allocation and time per uncached request")
+    allocations_parser.add_argument("--requests", type=int, default=200,
+                                    help="Distinct messages translated")
+    engines_parser = subparsers.add_parser("engines", help="Installed regex engines compared")
+    engines_parser.add_argument("--iterations", type=int, default=200,
+                                help="Passes over the sample messages")
+    engines_parser.add_argument("--redos-length", type=int, default=20,
+                                help="Input length for the pathological pattern")
+    shards_parser = subparsers.add_parser(
+        "shards", help="Single-process scan against sharded scatter-gather")
+    shards_parser.add_argument("--patterns", type=int, nargs="+", default=[100, 1000, 5000, 20000],
+                               help="Registry sizes (patterns per language) to measure")
+    shards_parser.add_argument("--shards", type=int, default=max(2, os.cpu_count() or 1),
+                               help="Shard processes")
+    shards_parser.add_argument("--repeat", type=int, default=20, help="Scans timed per measurement")
+    fuzzy_parser = subparsers.add_parser(
+        "fuzzy", help="Trigram index against brute-force similarity search")
+    fuzzy_parser.add_argument("--iterations", type=int, default=500,
+                              help="Passes over the sample messages")
+    suggest_parser = subparsers.add_parser(
+        "suggest", help="Type-ahead completions from the trie and the endpoint")
+    suggest_parser.add_argument("--iterations", type=int, default=200,
+                                help="Passes over the typed prefixes")
+    tenants_parser = subparsers.add_parser(
+        "tenants", help="Tenant overlay compile cost, memory and match time")
+    tenants_parser.add_argument("--tenants", type=int, default=100, help="Tenants defined")
+    tenants_parser.add_argument("--patterns", type=int, default=20,
+                                help="Private patterns per tenant")
+    tenants_parser.add_argument("--cached", type=int, default=64, help="Compiled overlays kept")
+    tenants_parser.add_argument("--iterations", type=int, default=2000,
+                                help="Matches timed per registry")
+    packs_parser = subparsers.add_parser(
+        "packs", help="Startup with extra packs compiled eagerly or on first use")
+    packs_parser.add_argument("--packs", type=int, default=10, help="Extra packs declared")
+    packs_parser.add_argument("--patterns", type=int, default=200, help="Patterns per extra pack")
+    packs_parser.add_argument("--repeat", type=int, default=5,
+                              help="Startups timed, keeping the best")
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Daemon round trips against HTTP and a process per message")
+    daemon_parser.add_argument("--requests", type=int, default=2000,
+                               help="Requests timed over sockets")
+    daemon_parser.add_argument("--spawns", type=int, default=10,
+                               help="Processes timed for the per-process paths")
+    logging_parser = subparsers.add_parser(
+        "logging", help="Throughput with synchronous against queued logging")
+    logging_parser.add_argument("--threads", type=int, nargs="+", default=[1, 4],
+                                help="Request threads")
+    logging_parser.add_argument("--requests", type=int, default=5000,
+                                help="Distinct messages translated")
+    logging_parser.add_argument("--rate", type=float, default=10.0,
+                                help="Per-request log records per second")
+
+    args = parser.parse_args()
+    benchmarks = {
+        "memory": benchmark_memory,
+        "server": benchmark_server,
+        "dispatch": benchmark_dispatch,
+        "literals": benchmark_literals,
+        "allocations": benchmark_allocations,
+        "engines": benchmark_engines,
+        "shards": benchmark_shards,
+        "logging": benchmark_logging,
+        "fuzzy": benchmark_fuzzy,
+        "suggest": benchmark_suggest,
+        "tenants": benchmark_tenants,
+        "packs": benchmark_packs,
+        "daemon": benchmark_daemon,
+    }
+    results = benchmarks[args.benchmark](args)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
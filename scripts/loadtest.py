@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Load Test Script
+
+This script drives the translate API over HTTP and reports throughput,
+latency percentiles and error rates, so releases can be compared end to end.
+
+Requests are sent either closed-loop (each client sends its next request as
+soon as the previous one returns) or open-loop at a fixed arrival rate
+(--rate). In open-loop mode latency is measured from when a request was due
+to be sent, so time spent waiting behind slow requests is counted instead of
+hidden (coordinated omission).
+
+Usage:
+    python scripts/loadtest.py --start --duration 10 --concurrency 8
+    python scripts/loadtest.py --start --prod --workers 4 --rate 500 --json run.json
+    python scripts/loadtest.py --url http://127.0.0.1:5001 --endpoint batch --batch-size 10
+    python scripts/loadtest.py --start --corpus messages.jsonl --compare baseline.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import queue
+import random
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+# Add the parent directory to sys.path to allow importing app modules
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+# Messages sent when no corpus is given, with their languages
+DEFAULT_CORPUS = [
+    {"error_message": "NameError: name 'total' is not defined", "language": "python"},
+    {"error_message": "Traceback (most recent call last):\n  File \"app.py\", line 3, in <module>\n"
+                      "IndentationError: unexpected indent", "language": "auto"},
+    {"error_message": "TypeError: unsupported operand type(s) for +: 'int' and 'str'",
+     "language": "auto"},
+    {"error_message": "Uncaught ReferenceError: total is not defined", "language": "javascript"},
+    {"error_message": "Uncaught TypeError: Cannot read properties of undefined (reading 'map')",
+     "language": "auto"},
+    {"error_message": "Exception in thread \"main\" java.lang.NullPointerException\n"
+                      "    at Main.main(Main.java:5)", "language": "auto"},
+    {"error_message": "NoMethodError: undefined method `upcase' for nil:NilClass",
+     "language": "ruby"},
+    {"error_message": "Unknown property: colour", "language": "css"},
+    {"error_message": "Permission denied", "language": "general"},
+]
+
+# Percentiles reported
+PERCENTILES = (50, 90, 99, 99.9)
+
+ENDPOINTS = {"translate": "/api/translate", "batch": "/api/translate/batch"}
+
+
+class LatencyHistogram:
+    """HDR-style histogram of latencies in microseconds.
+
+    Values are counted in log-linear buckets: each power of two is split into
+    2 ** sub_bucket_bits linear sub-buckets, so every recorded value is kept
+    to within 1 / 2 ** sub_bucket_bits of its true value (under 0.1% with the
+    default 10 bits) over the whole range, in constant memory.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 10):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int):
+        magnitude = max(0, value.bit_length() - self.sub_bucket_bits)
+        return magnitude, value >> magnitude
+
+    def _value(self, magnitude: int, sub_bucket: int) -> int:
+        """Highest value counted in a bucket."""
+        return ((sub_bucket + 1) << magnitude) - 1
+
+    def record(self, microseconds: float) -> None:
+        value = max(0, int(microseconds))
+        key = self._index(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """Return the latency at or below which `percent` of the values fall."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(self.total * percent / 100))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._value(*key), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.total,
+            "min_ms": (self.min or 0) / 1000,
+            "max_ms": self.max / 1000,
+            "percentiles_ms": {
+                f"p{str(p).replace('.', '')}": self.percentile(p) / 1000 for p in PERCENTILES
+            },
+        }
+
+
+def load_corpus(path):
+    """Load request bodies from a JSON array, a JSON lines file or plain text, one per line."""
+    if not path:
+        return DEFAULT_CORPUS
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+    elif text.lstrip().startswith("{"):
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        items = [line for line in text.splitlines() if line.strip()]
+    corpus = [{"error_message": item} if isinstance(item, str) else item for item in items]
+    if not corpus:
+        raise SystemExit(f"Corpus {path} is empty")
+    return corpus
+
+
+def request_body(corpus, endpoint, batch_size, rng):
+    if endpoint == "batch":
+        return json.dumps({"errors": [rng.choice(corpus) for _ in range(batch_size)]})
+    return json.dumps(rng.choice(corpus))
+
+
+class Client(threading.Thread):
+    """Sends requests over one keep-alive connection and records their latency."""
+
+    def __init__(self, target, path, bodies, schedule, stop_at, timeout):
+        super().__init__(daemon=True)
+        self.target = target
+        self.path = path
+        self.bodies = bodies
+        self.schedule = schedule
+        self.stop_at = stop_at
+        self.timeout = timeout
+        self.histogram = LatencyHistogram()
+        self.statuses = {}
+        self.errors = 0
+        self.connection = None
+
+    def connect(self):
+        self.connection = http.client.HTTPConnection(self.target.hostname, self.target.port or 80,
+                                                     timeout=self.timeout)
+
+    def send(self, body):
+        for attempt in range(2):
+            if self.connection is None:
+                self.connect()
+            try:
+                self.connection.request("POST", self.path, body,
+                                        {"Content-Type": "application/json"})
+                response = self.connection.getresponse()
+                response.read()
+                return response.status
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a new one
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def run(self):
+        while True:
+            if self.schedule is None:
+                due = time.perf_counter()
+                if due >= self.stop_at:
+                    break
+            else:
+                due = self.schedule.get()
+                if due is None:
+                    break
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                status = self.send(next(self.bodies))
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                if self.connection is not None:
+                    self.connection.close()
+                    self.connection = None
+                continue
+            self.histogram.record((time.perf_counter() - due) * 1e6)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        if self.connection is not None:
+            self.connection.close()
+
+
+def body_stream(corpus, endpoint, batch_size, seed):
+    rng = random.Random(seed)
+    while True:
+        yield request_body(corpus, endpoint, batch_size, rng)
+
+
+def run_load(url, endpoint="translate", corpus=None, concurrency=8, duration=10.0, rate=None,
+             batch_size=10, warmup=1.0, timeout=10.0, seed=0):
+    """Drive the API and return the report as a dict."""
+    target = urlsplit(url)
+    path = ENDPOINTS[endpoint]
+    corpus = corpus or DEFAULT_CORPUS
+
+    # Warm the server up (pattern caches, connections) without recording
+    if warmup > 0:
+        run_phase(target, path, corpus, endpoint, batch_size, concurrency, warmup, None, timeout,
+                  seed + 1)
+    clients, elapsed = run_phase(target, path, corpus, endpoint, batch_size, concurrency, duration,
+                                 rate, timeout, seed)
+
+    histogram = LatencyHistogram()
+    statuses = {}
+    failures = 0
+    for client in clients:
+        histogram.merge(client.histogram)
+        failures += client.errors
+        for status, count in client.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    completed = sum(statuses.values())
+    non_2xx = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+    attempted = completed + failures
+    return {
+        "url": url,
+        "endpoint": path,
+        "mode": "open" if rate else "closed",
+        "concurrency": concurrency,
+        "target_rate": rate,
+        "batch_size": batch_size if endpoint == "batch" else None,
+        "duration_s": elapsed,
+        "requests": attempted,
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "connection_errors": failures,
+        "error_rate": (non_2xx + failures) / attempted if attempted else 0.0,
+        "latency": histogram.to_dict(),
+    }
+
+
+def run_phase(target, path, corpus, endpoint, batch_size, concurrency, duration, rate, timeout,
+              seed):
+    started = time.perf_counter()
+    stop_at = started + duration
+    schedule = None
+    if rate:
+        # Open loop: requests are due at fixed intervals whatever the server does
+        schedule = queue.Queue()
+        count = int(duration * rate)
+        for i in range(count):
+            schedule.put(started + i / rate)
+        for _ in range(concurrency):
+            schedule.put(None)
+    clients = [
+        Client(target, path, body_stream(corpus, endpoint, batch_size, seed + i), schedule, stop_at,
+               timeout)
+        for i in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    return clients, time.perf_counter() - started
+
+
+def free_port():
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(prod, workers):
+    """Start app.py on a free port and return the process and its URL."""
+    port = free_port()
+    command = [sys.executable, os.path.join(parent_dir, "app.py"), "--port", str(port)]
+    if prod:
+        command.append("--prod")
+        if workers:
+            command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit("Server exited before it started listening")
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"Server did not start listening on port {port}")
+
+
+def print_report(report, baseline=None):
+    latency = report["latency"]
+    if baseline and (baseline["endpoint"], baseline["mode"]) != (
+            report["endpoint"], report["mode"]):
+        print(f"Warning: baseline drove {baseline['endpoint']} ({baseline['mode']} loop), "
+              f"this run {report['endpoint']} ({report['mode']} loop)")
+    print(f"{report['requests']} requests to {report['endpoint']} in {report['duration_s']:.1f}s "
+          f"({report['mode']} loop, concurrency {report['concurrency']})")
+    print(f"  throughput  {report['throughput_rps']:10.1f} req/s")
+    for name, value in latency["percentiles_ms"].items():
+        line = f"  {name:<10}  {value:10.2f} ms"
+        if baseline:
+            before = baseline["latency"]["percentiles_ms"].get(name)
+            if before:
+                line += f"  ({(value - before) / before:+.1%} vs baseline)"
+        print(line)
+    print(f"  max         {latency['max_ms']:10.2f} ms")
+    print(f"  error rate  {report['error_rate']:10.2%}  statuses {report['statuses']}, "
+          f"connection errors {report['connection_errors']}")
+    if baseline:
+        before = baseline["throughput_rps"]
+        print(f"  throughput {(report['throughput_rps'] - before) / before:+.1%} vs baseline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the error message translator API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server, such as http://127.0.0.1:5001")
+    target.add_argument("--start", action="store_true",
+                        help="Start app.py on a free port for the run")
+    parser.add_argument("--prod", action="store_true",
+                        help="With --start, run the production server")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="With --start --prod, worker processes")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="translate",
+                        help="API endpoint to drive")
+    parser.add_argument("--batch-size", type=int, default=10, help="Messages per batch request")
+    parser.add_argument("--corpus",
+                        help="JSON array, JSON lines or text file of messages (default: built-in)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Open-loop arrival rate in requests per second (default: closed loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to measure")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="Seconds of unrecorded load first")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="Seconds before a request fails")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for picking corpus messages")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if args.start:
+        process, url = start_server(args.prod, args.workers)
+    try:
+        report = run_load(url, args.endpoint, load_corpus(args.corpus), args.concurrency,
+                          args.duration, args.rate, args.batch_size, args.warmup, args.timeout,
+                          args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,13 @@ setup(
         "python-dotenv>=0.19.0",
     ],
     extras_require={
+        "engines": [
+            "regex>=2022.1.18",
+            "google-re2>=1.0",
+        ],
+        "daemon": [
+            "msgpack>=1.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
@@ -43,12 +50,13 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "error-translator=app.app:main",
+            "error-translator=app.cli:main",
+            "error-translator-client=app.daemon_client:main",
         ],
     },
     include_package_data=True,
     package_data={
-        "app": ["templates/*.html", "static/css/*.css", "static/js/*.js"],
+        "app": ["templates/*.html", "static/css/*.css", "static/js/*.js", "data/*.json"],
     },
     zip_safe=False,
 )
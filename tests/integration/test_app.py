@@ -1,6 +1,8 @@
 """
 Integration tests for the Flask application.
 """
+import json
+
 import pytest
 
 # No need for manual import path manipulation - that's handled in conftest.py
@@ -20,5 +22,148 @@ def test_not_found(client):
     assert response.status_code == 404
 
 
+def test_translate_api(client):
+    """Test translating an error message through the API."""
+    response = client.post(
+        "/api/translate",
+        json={"error_message": "NameError: name 'total' is not defined", "language": "python"},
+    )
+    assert response.status_code == 200
+    assert "total" in response.get_json()["title"]
+
+
+def test_translate_api_rejects_non_json(client):
+    """Test that a body that is not a JSON object is rejected."""
+    response = client.post("/api/translate", data="not json", content_type="text/plain")
+    assert response.status_code == 400
+
+
+def test_translate_batch_api(client):
+    """Test translating several error messages in one request."""
+    response = client.post(
+        "/api/translate/batch",
+        json={"errors": [
+            {"error_message": "NameError: name 'total' is not defined", "language": "python"},
+            {"error_message": ""},
+            {"error_message": "NameError: name 'total' is not defined", "language": "python"},
+        ]},
+    )
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert len(results) == 3
+    assert results[0] == results[2]
+    assert results[1]["title"] == "No error message provided"
+
+
+def test_translate_batch_api_rejects_bad_payload(client):
+    """Test that the batch endpoint validates its input."""
+    assert client.post("/api/translate/batch", json={"errors": "x"}).status_code == 400
+    too_many = {"errors": [{"error_message": "x"}] * 51}
+    assert client.post("/api/translate/batch", json=too_many).status_code == 400
+
+
+def test_languages_api(client):
+    """Test listing the supported languages."""
+    response = client.get("/api/languages")
+    assert response.status_code == 200
+    assert {"id": "python", "name": "Python"} in response.get_json()
+
+
+def test_metrics_api(client):
+    """Test that runtime counters are exported."""
+    client.post("/api/translate", json={"error_message": "Permission denied"})
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    metrics = response.get_json()
+    assert "coalesced" in metrics["coalescing"]
+    assert "local_hits" in metrics["cache"]
+    assert metrics["breaker"]["tripped"] == []
+
+
+def test_translate_api_drops_expired_deadline(client):
+    """Test that a request whose client deadline passed is rejected with Retry-After."""
+    response = client.post(
+        "/api/translate",
+        json={"error_message": "Permission denied"},
+        headers={"X-Request-Timeout": "-1"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/api/metrics").get_json()["admission"]["expired"] >= 1
+
+
+def test_translate_api_server_timing(client):
+    """Test that traced API responses report their stage timings."""
+    from app.tracing import InMemoryExporter, configure_tracing
+
+    exporter = InMemoryExporter()
+    configure_tracing(exporter, server_timing=True)
+    try:
+        response = client.post(
+            "/api/translate",
+            json={"error_message": "NameError: name 'timed_total' is not defined",
+                  "language": "python"},
+        )
+        untraced = client.get("/")
+    finally:
+        configure_tracing()
+
+    assert response.status_code == 200
+    stages = [metric.split(";")[0] for metric in response.headers["Server-Timing"].split(", ")]
+    assert stages[0] == "parse"
+    assert {"sanitize", "cache", "match", "render", "serialize"} <= set(stages)
+    assert stages[-1] == "total"
+    assert "Server-Timing" not in untraced.headers
+    assert [trace.name for trace in exporter.traces] == ["POST /api/translate"]
+    assert "Server-Timing" not in client.post("/api/translate", json={"error_message": "x"}).headers
+
+
+def test_pattern_search_api(client):
+    """Test full-text search over the patterns."""
+    response = client.get("/api/patterns/search",
+                          query_string={"q": "indentation", "language": "python"})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results and all(result["language"] == "python" for result in results)
+    assert "Indent" in results[0]["title"]
+    assert client.get("/api/patterns/search").status_code == 400
+
+
+def test_suggest_api(client):
+    """Test type-ahead completions of a partly typed error message."""
+    response = client.get("/api/suggest",
+                          query_string={"prefix": "indentationerror: un", "language": "python"})
+    assert response.status_code == 200
+    assert response.get_json()["suggestions"][0]["text"] == "IndentationError: unexpected indent"
+    assert client.get("/api/suggest").get_json()["suggestions"] == []
+
+
+def test_tenant_patterns_api(client, tmp_path):
+    """Test that a tenant's API key adds its private patterns, and unknown keys are refused."""
+    from app.data.tenants import TENANTS, configure_tenants
+
+    tenants_file = tmp_path / "tenants.json"
+    pattern = {
+        "regex": r"BillingError: invoice (\d+) locked", "title": "Invoice {{$1}} Locked",
+        "explanation": "The invoice is being edited elsewhere.", "solution": "Retry later.",
+    }
+    tenants_file.write_text(json.dumps(
+        {"tenants": {"team": {"api_keys": ["team-key"], "patterns": {"python": [pattern]}}}}))
+    configure_tenants(str(tenants_file))
+    try:
+        message = {"error_message": "BillingError: invoice 42 locked", "language": "python"}
+        response = client.post("/api/translate", json=message, headers={"X-API-Key": "team-key"})
+        assert response.get_json()["title"] == "Invoice 42 Locked"
+        response = client.post("/api/translate", json=message)
+        assert response.get_json()["title"] != "Invoice 42 Locked"
+        response = client.post("/api/translate", json=message, headers={"X-API-Key": "nope"})
+        assert response.status_code == 401
+        # Without a trusted proxy the tenant header is ignored
+        response = client.post("/api/translate", json=message, headers={"X-Tenant": "team"})
+        assert response.get_json()["title"] != "Invoice 42 Locked"
+    finally:
+        TENANTS.remove("team")
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,94 @@
+"""
+Integration tests for the error-translator command line.
+"""
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Most milliseconds `error-translator translate` may spend importing modules,
+# Python's own start-up included (best of IMPORT_RUNS runs)
+IMPORT_BUDGET_MS = 250
+IMPORT_RUNS = 3
+
+# Modules of the web application that `translate` must never import
+WEB_MODULES = ("flask", "werkzeug", "jinja2", "app.web", "app.routes")
+
+IMPORT_TIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _run(*args, input=None, options=()):
+    return subprocess.run([sys.executable, *options, "-m", "app.cli", *args], input=input,
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+
+
+@pytest.mark.integration
+def test_translate_argument_stdin_and_file(tmp_path):
+    """Test that a message is read from an argument, stdin or a file, and shown as text or JSON."""
+    text = _run("translate", "NameError: name 'x' is not defined", "--language", "python")
+    assert text.returncode == 0
+    assert text.stdout.startswith('Variable "x" Not Defined (python)\n')
+
+    traceback = ("Traceback (most recent call last):\n  File \"a.py\", line 2\n"
+                 "NameError: name 'y' is not defined\n")
+    piped = _run("translate", "--json", "-l", "python", input=traceback)
+    assert json.loads(piped.stdout)["title"] == 'Variable "y" Not Defined'
+
+    log = tmp_path / "build.log"
+    log.write_text(traceback)
+    from_file = _run("translate", "--file", str(log), "--json", "--language", "python")
+    result = json.loads(from_file.stdout)
+    assert result == {**json.loads(piped.stdout), "processing_time": result["processing_time"]}
+
+    assert _run("translate", "--file", str(tmp_path / "missing.log")).returncode == 2
+    assert _run("translate", input="").returncode == 2
+
+
+@pytest.mark.integration
+def test_translate_auto_detects_language():
+    """Test that the default auto-detection explains messages in their own language."""
+    python = _run("translate", "NameError: name 'x' is not defined")
+    assert python.returncode == 0
+    assert python.stdout.startswith('Variable "x" Not Defined (python)\n')
+
+    javascript = _run("translate", "--json", input="Uncaught ReferenceError: foo is not defined\n")
+    assert json.loads(javascript.stdout)["language"] == "javascript"
+
+
+@pytest.mark.integration
+def test_translate_import_budget():
+    """Test that translating imports no web modules and stays within the import-time budget."""
+    best = None
+    for _ in range(IMPORT_RUNS):
+        result = _run("translate", "Permission denied", "--json", options=("-X", "importtime"))
+        assert result.returncode == 0, result.stderr
+        modules = []
+        total_us = 0
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_RE.match(line)
+            if match:
+                modules.append(match.group(3))
+                # Top-level imports; their cumulative time includes the nested ones
+                if not match.group(2):
+                    total_us += int(match.group(1))
+        web = [name for name in modules if name.startswith(WEB_MODULES)]
+        assert not web, f"translate imported web modules: {web}"
+        best = total_us if best is None else min(best, total_us)
+    assert best / 1000 < IMPORT_BUDGET_MS, \
+        f"imports took {best / 1000:.0f} ms, budget {IMPORT_BUDGET_MS} ms"
+
+
+@pytest.mark.integration
+def test_translator_imports_optional_stages_lazily():
+    """Test that importing the translator leaves the store, shards, tracing and suggestions out."""
+    lazy = ("sqlite3", "app.data.store", "app.sharding", "app.tracing", "app.data.suggest")
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.translator; print(' '.join(sys.modules))"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert not set(lazy) & set(result.stdout.split())
@@ -0,0 +1,144 @@
+"""
+Integration tests for the local daemon and its client.
+"""
+import os
+import sys
+import json
+import stat
+import time
+import signal
+import threading
+import subprocess
+import socketserver
+from pathlib import Path
+
+import pytest
+
+from app.daemon import SOCKET_MODE, DaemonHandler, DaemonServer
+from app.daemon_client import DaemonClient, DaemonError
+from app.wire import HEADER, encode_frame
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires Unix domain sockets")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Unix socket paths are limited to about 100 characters
+    path = f"/tmp/error-translator-test-{os.getpid()}-{tmp_path.name[-12:]}.sock"
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    server = DaemonServer(socket_path, DaemonHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+@pytest.mark.integration
+def test_pipelined_requests_answered_in_order(daemon):
+    """Test that many pipelined requests, including bad ones, get their own responses in order."""
+    messages = [(f"NameError: name 'v{i}' is not defined", "python") for i in range(300)]
+    with DaemonClient(daemon) as client:
+        results = client.translate_many(messages)
+        assert [result["original_error"] for result in results] == [
+            message for message, _ in messages]
+        assert results[0]["title"] == 'Variable "v0" Not Defined'
+
+        mixed = client.call_many([
+            {"op": "ping"}, {"op": "explode"}, {"op": "translate", "timeout": "soon"},
+            {"op": "batch", "errors": [{"error_message": "Permission denied"}]},
+        ])
+        assert mixed[0]["pid"] == os.getpid()
+        assert isinstance(mixed[1], DaemonError) and mixed[1].code == 400
+        assert isinstance(mixed[2], DaemonError) and mixed[2].code == 400
+        assert mixed[3]["results"][0]["title"] == "Permission Denied"
+        with pytest.raises(DaemonError):
+            client.translate("Permission denied", api_key="nobody")
+
+
+@pytest.mark.integration
+def test_bad_frame_closes_connection(daemon):
+    """Test that an oversized frame is answered with an error before the daemon hangs up."""
+    client = DaemonClient(daemon)
+    client._sock.sendall(HEADER.pack(2 ** 31))
+    with pytest.raises(DaemonError) as excinfo:
+        client.ping()
+    assert excinfo.value.code == 400
+    client.close()
+
+
+@pytest.mark.integration
+def test_bad_frame_after_pipelined_request(daemon):
+    """Test that requests pipelined before an oversized frame are still answered."""
+    client = DaemonClient(daemon)
+    client._sock.sendall(encode_frame({"id": 1, "op": "ping"}) + HEADER.pack(2 ** 31))
+    assert client._reader.read() == {"id": 1, "result": {"pid": os.getpid()}}
+    assert client._reader.read()["error"]["code"] == 400
+    client.close()
+
+
+@pytest.mark.integration
+def test_second_daemon_keeps_live_socket(daemon):
+    """Test that starting on a socket a live daemon uses fails without removing it."""
+    with pytest.raises(OSError):
+        DaemonServer(daemon, DaemonHandler)
+    with DaemonClient(daemon) as client:
+        assert client.ping()
+
+
+@pytest.mark.integration
+def test_socket_is_created_owner_only(socket_path, monkeypatch):
+    """Test that the socket file is created with owner-only permissions and the umask restored."""
+    modes = []
+    bind = socketserver.UnixStreamServer.server_bind
+
+    def record_mode(server):
+        bind(server)
+        modes.append(stat.S_IMODE(os.stat(server.server_address).st_mode))
+
+    monkeypatch.setattr(socketserver.UnixStreamServer, "server_bind", record_mode)
+    old_umask = os.umask(0o022)
+    try:
+        server = DaemonServer(socket_path, DaemonHandler)
+        server.server_close()
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(old_umask)
+    assert modes == [SOCKET_MODE]
+
+
+@pytest.mark.integration
+def test_daemon_process_and_client_cli(socket_path):
+    """Test the daemon started from app.py with the command line client, and shutdown on SIGTERM."""
+    server = subprocess.Popen(
+        [sys.executable, "app.py", "--daemon", socket_path],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(socket_path):
+            assert time.monotonic() < deadline and server.poll() is None
+            time.sleep(0.1)
+        output = subprocess.run(
+            [sys.executable, "-m", "app.daemon_client", "--socket", socket_path,
+             "--language", "python"],
+            input="NameError: name 'x' is not defined\n\nPermission denied\n",
+            cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=30,
+        )
+        assert output.returncode == 0, output.stderr
+        results = [json.loads(line) for line in output.stdout.splitlines()]
+        assert [result["title"] for result in results] == [
+            'Variable "x" Not Defined', "Permission Denied"]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=15) == 0
+    assert not os.path.exists(socket_path)
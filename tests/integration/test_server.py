@@ -0,0 +1,73 @@
+"""
+Integration tests for the pre-forking production server.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import subprocess
+import http.client
+from pathlib import Path
+
+import pytest
+
+from app.server import create_listeners
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _translate(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request(
+        "POST", "/api/translate",
+        json.dumps({"error_message": "NameError: name 'x' is not defined", "language": "python"}),
+        {"Content-Type": "application/json"},
+    )
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+    return response.status, body
+
+
+def test_create_listeners_share_one_port():
+    """Test that every worker socket is bound to the same port."""
+    listeners = create_listeners("127.0.0.1", 0, 3)
+    try:
+        ports = {sock.getsockname()[1] for sock in listeners}
+        assert len(ports) == 1
+    finally:
+        for sock in listeners:
+            sock.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_prefork_server_serves_and_stops():
+    """Test that the production server answers requests and shuts down on SIGTERM."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "app.py", "--prod", "--port", str(port), "--workers", "2"],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                status, body = _translate(port)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        assert status == 200
+        assert body["language"] == "python"
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=15) == 0
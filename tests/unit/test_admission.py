@@ -0,0 +1,75 @@
+"""
+Unit tests for admission control.
+"""
+import threading
+import time
+
+import pytest
+
+from app.admission import AdmissionController, DeadlineExpired, Overloaded
+from app.deadline import Deadline
+
+
+@pytest.mark.unit
+def test_requests_beyond_queue_are_shed():
+    """Test that work beyond the in-flight cap and queue is rejected immediately."""
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    with controller.admit():
+        with pytest.raises(Overloaded):
+            with controller.admit():
+                pass
+    assert controller.stats["shed"] == 1
+    assert controller.stats["in_flight"] == 0
+
+
+@pytest.mark.unit
+def test_queued_request_runs_when_slot_frees():
+    """Test that a queued request is admitted once a running one finishes."""
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+    release = threading.Event()
+    admitted = threading.Event()
+
+    def hold_slot():
+        with controller.admit():
+            admitted.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    admitted.wait()
+
+    def wait_for_slot():
+        with controller.admit():
+            pass
+
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+    while controller.stats["queued"] == 0:
+        time.sleep(0.01)
+    release.set()
+    holder.join()
+    waiter.join()
+    assert controller.stats["admitted"] == 2
+    assert controller.stats["in_flight"] == 0
+
+
+@pytest.mark.unit
+def test_expired_deadline_is_dropped_before_work():
+    """Test that a request whose deadline has passed never runs."""
+    controller = AdmissionController()
+    with pytest.raises(DeadlineExpired):
+        with controller.admit(deadline=Deadline.after(-1)):
+            pytest.fail("expired request was admitted")
+    assert controller.stats["expired"] == 1
+
+
+@pytest.mark.unit
+def test_queue_wait_is_bounded_by_deadline():
+    """Test that a queued request gives up when its deadline passes."""
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+    with controller.admit():
+        started = time.monotonic()
+        with pytest.raises(DeadlineExpired):
+            with controller.admit(deadline=Deadline.after(0.05)):
+                pass
+        assert time.monotonic() - started < 1
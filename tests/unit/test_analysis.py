@@ -0,0 +1,115 @@
+"""
+Unit tests for the dead pattern analyzer.
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from app.data.analysis import (
+    DUPLICATE, SHADOWED, find_dead_patterns, generate_probes, load_prebuilt_dead_patterns,
+    save_prebuilt_dead_patterns,
+)
+from app.data.registry import PatternRegistry
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _pattern(regex, title="Title"):
+    return {"regex": regex, "title": title, "explanation": "Explanation", "solution": "Solution"}
+
+
+def _registry(*regexes):
+    registry = PatternRegistry()
+    registry.add_language("python", [_pattern(regex) for regex in regexes])
+    return registry
+
+
+@pytest.mark.unit
+def test_probes_cover_alternatives_and_optional_parts():
+    """Test that generated probes match the pattern and exercise each alternative."""
+    registry = _registry(r"ClassCastException(?:: (\w+) cannot be cast)?|Bad (cast|coercion)")
+    probes = generate_probes(registry.patterns("python")[0])
+    assert "ClassCastException" in probes
+    assert any("cannot be cast" in probe for probe in probes)
+    assert any("coercion" in probe for probe in probes)
+
+
+@pytest.mark.unit
+def test_duplicates_and_shadowed_patterns_are_found():
+    """Test that exact copies and patterns covered by an earlier one are reported."""
+    registry = _registry(
+        r"TypeError: ([^(]*) is not a function",
+        r"SyntaxError: invalid syntax",
+        r"TypeError: ([^(]+) is not a function or its return value is not iterable",
+        r"SyntaxError: invalid syntax",
+    )
+    dead = {issue["id"]: issue for issue in find_dead_patterns(registry)}
+    assert dead["python:2"]["kind"] == SHADOWED
+    assert dead["python:2"]["by"] == ["python:0"]
+    assert dead["python:3"]["kind"] == DUPLICATE
+    assert dead["python:3"]["by"] == ["python:1"]
+    assert set(dead) == {"python:2", "python:3"}
+
+
+@pytest.mark.unit
+def test_overlapping_pattern_that_still_wins_is_kept():
+    """Test that a pattern is live if any probe reaches it first."""
+    registry = _registry(r"TypeError: (\w+) is bad", r"TypeError: (.+) is bad")
+    assert find_dead_patterns(registry) == []
+    # A corpus message can also prove a pattern live
+    registry = _registry(r"KeyError: '(\w+)'", r"KeyError: (.+)")
+    assert find_dead_patterns(registry, corpus=["KeyError: 0"]) == []
+
+
+@pytest.mark.unit
+def test_excluded_patterns_are_not_candidates():
+    """Test that the registry stops offering excluded patterns."""
+    registry = _registry(r"ValueError: (.*)", r"ValueError: bad value")
+    assert registry.exclude(issue["id"] for issue in find_dead_patterns(registry)) == 1
+    assert [p.id for p in registry.candidates("python", ("valueerror",))] == ["python:0"]
+    assert list(registry.excluded) == ["python:1"]
+
+
+@pytest.mark.unit
+def test_shipped_dead_patterns_are_excluded():
+    """Test that the loaded registry no longer holds the known shadowed patterns."""
+    from app.data.error_patterns import DEAD_PATTERNS, REGISTRY
+
+    ids = {issue["id"] for issue in DEAD_PATTERNS}
+    assert {"python:16", "java:12"} <= ids
+    assert not ids & {pattern.id for pattern in REGISTRY}
+
+
+@pytest.mark.unit
+def test_prebuilt_dead_patterns_need_the_same_patterns(tmp_path):
+    """Test that saved dead patterns are loaded back only for the registry they were found in."""
+    path = str(tmp_path / "dead_patterns.json")
+    registry = _registry(r"ValueError: (.*)", r"ValueError: bad value")
+    assert load_prebuilt_dead_patterns(registry, path) is None
+    saved = save_prebuilt_dead_patterns(registry, path)
+    same = _registry(r"ValueError: (.*)", r"ValueError: bad value")
+    assert load_prebuilt_dead_patterns(same, path) == saved
+    changed = _registry(r"ValueError: (.*)", r"ValueError: bad values")
+    assert load_prebuilt_dead_patterns(changed, path) is None
+
+
+@pytest.mark.unit
+def test_shipped_prebuilt_dead_patterns_are_current():
+    """Test that app/data/dead_patterns.json matches the shipped patterns.
+
+    If it does not, run `scripts/analyze_patterns.py --prebuild`.
+    """
+    code = (
+        "from app.data.analysis import find_dead_patterns, load_prebuilt_dead_patterns\n"
+        "from app.data.error_patterns import PREBUILT_DEAD_PATTERNS, REGISTRY\n"
+        "prebuilt = load_prebuilt_dead_patterns(REGISTRY, PREBUILT_DEAD_PATTERNS)\n"
+        "print(prebuilt == find_dead_patterns(REGISTRY))\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key != "PATTERN_DB"}
+    env["PRUNE_DEAD_PATTERNS"] = "0"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.stdout.strip() == "True", result.stderr
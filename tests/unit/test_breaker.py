@@ -0,0 +1,115 @@
+"""
+Unit tests for the pattern circuit breaker.
+"""
+import pytest
+
+from app.breaker import BREAKER, PatternBreaker
+from app.cache import TRANSLATION_CACHE
+from app.deadline import TRIPPED_PATTERNS
+from app.data.error_patterns import REGISTRY
+from app.translator import (
+    ERROR_PATTERNS,
+    MAX_ERROR_LENGTH,
+    detect_language,
+    match_error,
+    search_pattern,
+    translate_error,
+)
+
+
+@pytest.mark.unit
+def test_repeatedly_slow_pattern_is_tripped():
+    """Test that only consecutive slow searches trip a pattern."""
+    breaker = PatternBreaker(threshold=0.01, trip_after=3, cool_down=60)
+    breaker.record("python:0", 0.5)
+    breaker.record("python:0", 0.5)
+    breaker.record("python:0", 0.001)  # A fast search resets the streak
+    breaker.record("python:0", 0.5)
+    assert breaker.allow("python:0")
+
+    breaker.record("python:0", 0.5)
+    breaker.record("python:0", 0.5)
+    assert not breaker.allow("python:0")
+    assert [trip["id"] for trip in breaker.tripped()] == ["python:0"]
+    assert breaker.stats["trips"] == 1
+
+
+@pytest.mark.unit
+def test_slow_threshold_grows_with_input_length():
+    """Test that a search is judged slow against an allowance for the length searched."""
+    breaker = PatternBreaker(threshold=0.01, trip_after=1, cool_down=60, threshold_per_kib=0.01)
+    breaker.record("python:0", 0.05, length=8 * 1024)
+    assert breaker.allow("python:0")
+    breaker.record("python:0", 0.05, length=100)
+    assert not breaker.allow("python:0")
+
+
+@pytest.mark.unit
+def test_max_length_benign_message_trips_nothing():
+    """Test that an ordinary traceback of the maximum length trips none of the shipped patterns."""
+    frames = '  File "app.py", line 12, in handler\n    result = compute(values)\n' * 200
+    final_line = "\nNameError: name 'total' is not defined"
+    message = ("Traceback (most recent call last):\n" + frames)[:MAX_ERROR_LENGTH - len(final_line)]
+    message += final_line
+    try:
+        for _ in range(BREAKER.trip_after):
+            for pattern in REGISTRY:
+                search_pattern(pattern, message, message.casefold())
+        assert BREAKER.tripped() == []
+    finally:
+        BREAKER.reset()
+
+
+@pytest.mark.unit
+def test_tripped_pattern_is_retried_after_cool_down():
+    """Test that one trial search decides whether a pattern is restored."""
+    breaker = PatternBreaker(threshold=0.01, trip_after=1, cool_down=0)
+    breaker.record("python:0", 0.5)
+
+    assert breaker.allow("python:0")  # Trial
+    assert not breaker.allow("python:0")  # Only one trial at a time
+    breaker.record("python:0", 0.5)
+    assert breaker.stats["trips"] == 2
+
+    assert breaker.allow("python:0")
+    breaker.record("python:0", 0.001)
+    assert breaker.tripped() == []
+    assert breaker.stats["recoveries"] == 1
+
+
+@pytest.mark.unit
+def test_match_skips_tripped_pattern():
+    """Test that the matcher skips a tripped pattern and falls through to the rest."""
+    message = "NameError: name 'foo' is not defined"
+    pattern = ERROR_PATTERNS["python"][0]
+    assert match_error(message, "python")["title"] == 'Variable "foo" Not Defined'
+    try:
+        for _ in range(BREAKER.trip_after):
+            BREAKER.record(pattern.id, BREAKER.threshold)
+        # The regex is not run; only the similarity fallback can still suggest the pattern
+        result = match_error(message, "python")
+        assert result["title"] != 'Variable "foo" Not Defined'
+        assert result.get("match") == "fuzzy"
+    finally:
+        BREAKER.reset()
+
+
+@pytest.mark.unit
+def test_results_computed_without_tripped_patterns_are_not_kept():
+    """Test that answers and detections made while a pattern is tripped do not outlive the trip."""
+    message = "Unclosed tag 'div'"
+    pattern = next(pattern for pattern in ERROR_PATTERNS["html"]
+                   if pattern.search(message, message.casefold()))
+    TRANSLATION_CACHE.clear()
+    try:
+        for _ in range(BREAKER.trip_after):
+            BREAKER.record(pattern.id, BREAKER.threshold)
+        assert detect_language(message) == "general"
+        result = translate_error(message)
+        assert TRIPPED_PATTERNS in result["degraded"]
+    finally:
+        BREAKER.reset()
+    assert detect_language(message) == "html"
+    result = translate_error(message)
+    assert result["title"] == "Unclosed HTML Tag: div"
+    assert "degraded" not in result
@@ -0,0 +1,133 @@
+"""
+Unit tests for the translation cache.
+"""
+import os
+import struct
+import multiprocessing
+
+import pytest
+
+from app import cache
+from app.cache import LocalCache, SharedMemoryCache, TranslationCache, fingerprint
+
+
+@pytest.fixture
+def shared():
+    table = SharedMemoryCache.create(slots=8, slot_size=256)
+    yield table
+    table.unlink()
+
+
+@pytest.mark.unit
+def test_fingerprint_depends_on_language():
+    """Test that the same message in different languages gets different keys."""
+    assert fingerprint("SyntaxError", "python") != fingerprint("SyntaxError", "ruby")
+    assert fingerprint("SyntaxError", "python") == fingerprint("SyntaxError", "python")
+
+
+@pytest.mark.unit
+def test_local_cache_evicts_least_recently_used():
+    """Test LRU eviction in the per-process cache."""
+    local = LocalCache(maxsize=2)
+    local.set("a", {"title": "A"})
+    local.set("b", {"title": "B"})
+    local.get("a")
+    local.set("c", {"title": "C"})
+    assert local.get("b") is None
+    assert local.get("a") == {"title": "A"}
+
+
+@pytest.mark.unit
+def test_shared_cache_round_trip_and_oversized_values(shared):
+    """Test storing results and skipping those too large for a slot."""
+    key = fingerprint("NameError", "python")
+    assert shared.get(key) is None
+    assert shared.set(key, {"title": "Name Error"})
+    assert shared.get(key) == {"title": "Name Error"}
+    assert not shared.set(key, {"title": "x" * 1000})
+    assert shared.get(key) == {"title": "Name Error"}
+
+
+@pytest.mark.unit
+def test_shared_cache_evicts_oldest_in_bucket(shared):
+    """Test that a full bucket evicts its oldest entry."""
+    keys = [fingerprint(f"error {i}", "python") for i in range(64)]
+    for i, key in enumerate(keys):
+        shared.set(key, {"n": i})
+    # Only the table size can survive and the last write always does
+    assert sum(shared.get(key) is not None for key in keys) <= shared.slots
+    assert shared.get(keys[-1]) == {"n": 63}
+
+
+def _store_in_child(table, key):
+    table.set(key, {"title": "from child"})
+    os._exit(0)
+
+
+@pytest.mark.unit
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_shared_cache_visible_across_processes(shared):
+    """Test that a result stored by a forked worker is read by another process."""
+    key = fingerprint("ReferenceError", "javascript")
+    child = multiprocessing.get_context("fork").Process(target=_store_in_child, args=(shared, key))
+    child.start()
+    child.join()
+    assert shared.get(key) == {"title": "from child"}
+
+
+def _die_holding_lock(table):
+    table._lock.acquire()
+    os._exit(0)
+
+
+@pytest.mark.unit
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+def test_shared_cache_skips_writes_when_lock_holder_died(shared):
+    """Test that a worker killed while holding the lock does not block other writers."""
+    child = multiprocessing.get_context("fork").Process(target=_die_holding_lock, args=(shared,))
+    child.start()
+    child.join()
+    key = fingerprint("NameError", "python")
+    assert not shared.set(key, {"title": "Name Error"})
+    assert shared.skipped_writes == 1
+    assert shared.get(key) is None
+
+
+@pytest.mark.unit
+def test_shared_cache_recovers_slot_left_mid_write(shared):
+    """Test that a slot whose writer died between sequence increments is usable again."""
+    key = fingerprint("NameError", "python")
+    shared.set(key, {"title": "Old"})
+    digest = bytes.fromhex(key)
+    offset = next(shared._offset(slot) for slot in shared._bucket(digest)
+                  if cache._SLOT_HEADER.unpack_from(shared._buffer,
+                                                    shared._offset(slot))[2] == digest)
+    sequence = cache._SLOT_HEADER.unpack_from(shared._buffer, offset)[0]
+    struct.pack_into("<I", shared._buffer, offset, sequence + 1)  # Odd, as if mid-write
+    assert shared.get(key) is None
+
+    assert shared.set(key, {"title": "New"})
+    assert shared.get(key) == {"title": "New"}
+
+
+@pytest.mark.unit
+def test_translation_cache_promotes_shared_hits(shared):
+    """Test that a shared hit is copied into the local tier."""
+    translations = TranslationCache()
+    translations.shared = shared
+    key = fingerprint("NameError", "python")
+    shared.set(key, {"title": "Name Error"})
+    assert translations.get(key) == {"title": "Name Error"}
+    assert translations.stats["shared_hits"] == 1
+    assert translations.local.get(key) == {"title": "Name Error"}
+
+
+@pytest.mark.unit
+def test_enable_shared_cache_degrades_without_shared_memory(monkeypatch):
+    """Test that the cache falls back to per-process caching when shared memory fails."""
+    def unavailable(*args, **kwargs):
+        raise OSError("no /dev/shm")
+
+    monkeypatch.setattr(SharedMemoryCache, "create", unavailable)
+    assert cache.enable_shared_cache() is False
+    assert cache.TRANSLATION_CACHE.shared is None
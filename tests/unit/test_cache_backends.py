@@ -0,0 +1,143 @@
+"""
+Unit tests for the external translation cache backends.
+"""
+import time
+import threading
+import socketserver
+
+import pytest
+
+from app.cache import TranslationCache, fingerprint
+from app.cache_backends import (
+    DiskBackend,
+    MemoryBackend,
+    RedisBackend,
+    backend_from_url,
+)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Answers the subset of RESP commands used by RedisBackend."""
+
+    def read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        server = self.server
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            server.commands.append(command[0].upper())
+            time.sleep(server.delay)
+            name = command[0].upper()
+            if name == b"PING":
+                self.wfile.write(b"+PONG\r\n")
+            elif name == b"MGET":
+                values = [server.data.get(key) for key in command[1:]]
+                self.wfile.write(b"*%d\r\n" % len(values))
+                for value in values:
+                    if value is None:
+                        self.wfile.write(b"$-1\r\n")
+                    else:
+                        self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif name == b"SET":
+                server.data[command[1]] = command[2]
+                self.wfile.write(b"+OK\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeRedisHandler)
+    server.daemon_threads = True
+    server.data = {}
+    server.commands = []
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "disk", "redis"])
+def backend(request, tmp_path, fake_redis):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    elif request.param == "disk":
+        backend = DiskBackend(str(tmp_path))
+    else:
+        backend = RedisBackend(port=fake_redis.server_address[1], timeout=1.0)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.unit
+def test_backend_batch_round_trip(backend):
+    """Test batch set and get on every backend."""
+    keys = [fingerprint(f"error {i}", "python") for i in range(3)]
+    backend.set_many({keys[0]: {"title": "A"}, keys[1]: {"title": "B"}})
+    assert backend.get_many(keys) == {keys[0]: {"title": "A"}, keys[1]: {"title": "B"}}
+    assert backend.get(keys[2]) is None
+
+
+@pytest.mark.unit
+def test_redis_backend_uses_one_round_trip_per_batch(fake_redis):
+    """Test that a batch lookup is a single MGET."""
+    backend = RedisBackend(port=fake_redis.server_address[1], timeout=1.0)
+    backend.get_many([fingerprint(f"error {i}", "python") for i in range(10)])
+    assert fake_redis.commands == [b"MGET"]
+
+
+@pytest.mark.unit
+def test_backend_from_url(tmp_path):
+    """Test creating backends from URLs."""
+    assert isinstance(backend_from_url("memory://"), MemoryBackend)
+    assert backend_from_url(f"disk://{tmp_path}").directory == str(tmp_path)
+    redis = backend_from_url("redis://:secret@cache:6380/2?timeout=0.2")
+    assert (redis.host, redis.port, redis.db, redis.password, redis.timeout) == (
+        "cache", 6380, 2, "secret", 0.2)
+    with pytest.raises(ValueError):
+        backend_from_url("ftp://cache")
+
+
+@pytest.mark.unit
+def test_translation_cache_reads_through_backend():
+    """Test that another node's result is served from the backend and kept locally."""
+    shared_backend = MemoryBackend()
+    key = fingerprint("NameError", "python")
+    other_node = TranslationCache()
+    other_node.backend = shared_backend
+    other_node.set(key, {"title": "Name Error"})
+
+    this_node = TranslationCache()
+    this_node.backend = shared_backend
+    assert this_node.get(key) == {"title": "Name Error"}
+    assert this_node.stats["backend_hits"] == 1
+    assert this_node.local.get(key) == {"title": "Name Error"}
+
+
+@pytest.mark.unit
+def test_translation_cache_skips_slow_backend(fake_redis):
+    """Test that a slow backend is bypassed in favour of the local cache."""
+    fake_redis.delay = 0.2
+    translations = TranslationCache()
+    translations.backend = RedisBackend(port=fake_redis.server_address[1], timeout=0.05)
+    key = fingerprint("NameError", "python")
+
+    assert translations.get(key) is None
+    assert translations.stats["backend_errors"] == 1
+    calls = len(fake_redis.commands)
+
+    translations.set(key, {"title": "Name Error"})
+    assert translations.get(key) == {"title": "Name Error"}
+    assert len(fake_redis.commands) == calls  # Backend skipped while backing off
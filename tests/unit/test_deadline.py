@@ -0,0 +1,77 @@
+"""
+Unit tests for request deadlines and degraded translation.
+"""
+import pytest
+
+from app.data.patterns.base_pattern import literal_prefix
+from app.deadline import (
+    NO_DEADLINE,
+    Deadline,
+    GENERAL_RESPONSE,
+    KEYWORD_DETECTION,
+    PREFILTERED_PATTERNS,
+)
+from app.translator import TRANSLATION_CACHE, fingerprint, match_error, translate_error
+
+NAME_ERROR = "NameError: name 'foo' is not defined"
+TRACEBACK = ('Traceback (most recent call last):\n  File "app.py", line 1, in <module>\n'
+             + NAME_ERROR)
+
+
+@pytest.mark.unit
+def test_deadline_earliest_and_remaining():
+    """Test combining deadlines and measuring the time left."""
+    soon = Deadline.after(1)
+    later = Deadline.after(10)
+    assert soon.earliest(later) is soon
+    assert later.earliest(soon) is soon
+    assert soon.earliest(NO_DEADLINE) is soon
+    assert NO_DEADLINE.remaining() == float("inf")
+    assert not NO_DEADLINE.expired()
+    assert Deadline.after(-1).expired()
+
+
+@pytest.mark.unit
+def test_literal_prefix():
+    """Test extracting the literal text a pattern must start with."""
+    assert literal_prefix(r"NameError: name \'([^\']+)\'") == "nameerror: name '"
+    assert literal_prefix(r"java\.lang\.NullPointerException(?::\s*(.+))?") == \
+        "java.lang.nullpointerexception"
+    assert literal_prefix(r"ab?c") == "a"
+    assert literal_prefix(r"(?:error:)?\s*';' expected") == ""
+    assert literal_prefix(r"Timeout|timed out") == ""
+
+
+@pytest.mark.unit
+def test_match_without_deadline_is_not_degraded():
+    """Test that a translation with time to spare runs every stage."""
+    result = match_error(NAME_ERROR, "python")
+    assert result["title"] == 'Variable "foo" Not Defined'
+    assert "degraded" not in result
+
+
+@pytest.mark.unit
+def test_short_budget_uses_keywords_and_prefiltered_patterns():
+    """Test that a nearly spent budget still finds a match through the cheap stages."""
+    match_error(TRACEBACK, "auto")  # Load lazily built state outside the budget
+    deadline = Deadline.after(0.01)
+    result = match_error(TRACEBACK, "auto", deadline=deadline)
+    assert result["degraded"] == [KEYWORD_DETECTION, PREFILTERED_PATTERNS]
+    assert result["title"] == 'Variable "foo" Not Defined'
+
+
+@pytest.mark.unit
+def test_expired_deadline_returns_general_response():
+    """Test that no patterns run once the deadline has passed."""
+    result = match_error(NAME_ERROR, "python", deadline=Deadline.after(-1))
+    assert result["title"] == "Python Error"
+    assert result["degraded"] == [PREFILTERED_PATTERNS, GENERAL_RESPONSE]
+
+
+@pytest.mark.unit
+def test_degraded_results_are_not_cached():
+    """Test that a degraded answer is not served to later requests."""
+    TRANSLATION_CACHE.clear()
+    translate_error(NAME_ERROR, "python", deadline=Deadline.after(-1))
+    assert TRANSLATION_CACHE.get(fingerprint(NAME_ERROR, "python")) is None
+    assert "degraded" not in translate_error(NAME_ERROR, "python")
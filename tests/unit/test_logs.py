@@ -0,0 +1,67 @@
+"""
+Unit tests for the logging pipeline.
+"""
+import io
+import json
+import logging
+import time
+
+import pytest
+
+from app.logs import LOG_PIPELINE, REQUEST_LOGGER, SamplingFilter, configure_logging
+
+
+@pytest.fixture
+def log_output():
+    """Route logging through a fresh pipeline into a buffer, restoring the default afterwards."""
+    stream = io.StringIO()
+    configure_logging(json_output=True, request_rate=2, stream=stream)
+    yield stream
+    configure_logging()
+
+
+def _records(stream):
+    LOG_PIPELINE.stop()  # Flush the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+@pytest.mark.unit
+def test_records_are_written_as_json_lines(log_output):
+    """Test that records reach the output formatted by the writer thread."""
+    logging.getLogger("app.test").warning("disk %s is %d%% full", "/tmp", 93)
+    records = _records(log_output)
+    assert records[0]["message"] == "disk /tmp is 93% full"
+    assert records[0]["level"] == "WARNING"
+    assert records[0]["logger"] == "app.test"
+
+
+@pytest.mark.unit
+def test_request_logs_are_sampled(log_output):
+    """Test that per-request records are rate limited but warnings are kept."""
+    for i in range(50):
+        REQUEST_LOGGER.info("request %d", i)
+    REQUEST_LOGGER.warning("slow request")
+    messages = [record["message"] for record in _records(log_output)]
+    assert messages == ["request 0", "request 1", "slow request"]
+
+
+@pytest.mark.unit
+def test_sampling_filter_refills():
+    """Test that the token bucket lets records through again over time."""
+    sampler = SamplingFilter(rate=100)
+    record = logging.LogRecord("app.requests", logging.INFO, __file__, 1, "x", None, None)
+    allowed = sum(sampler.filter(record) for _ in range(150))
+    assert allowed == 100
+    assert sampler.dropped == 50
+    time.sleep(0.05)
+    assert sampler.filter(record)
+
+
+@pytest.mark.unit
+def test_detect_language_does_not_print(capsys):
+    """Test that language detection keeps its scores off stdout."""
+    from app.translator import detect_language
+
+    detect_language("Traceback (most recent call last):\n"
+                    "  File \"quiet.py\", line 1\nKeyError: 'q'")
+    assert capsys.readouterr().out == ""
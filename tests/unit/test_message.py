@@ -0,0 +1,49 @@
+"""
+Unit tests for the preprocessed Message object.
+"""
+import pytest
+
+from app.cache import fingerprint
+from app.message import Message
+from app.translator import detect_language, match_error, prepare_error
+
+TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    '  File "app.py", line 3, in <module>\n'
+    "    print(total)\n"
+    "NameError: name 'total' is not defined"
+)
+
+
+@pytest.mark.unit
+def test_message_derives_fields_once():
+    """Test the derived fields and that they are computed only once."""
+    message = Message(TRACEBACK, "python")
+    assert message.fingerprint == fingerprint(TRACEBACK, "python")
+    assert message.folded == TRACEBACK.casefold()
+    assert message.folded is message.folded
+    assert message.exception_types == ("nameerror",)
+    assert message.file_extensions == (".py",)
+
+
+@pytest.mark.unit
+def test_message_is_immutable_and_hashable():
+    """Test that a message cannot be changed and can key caches."""
+    message = Message(TRACEBACK)
+    with pytest.raises(AttributeError):
+        message.text = "changed"
+    assert message == Message(TRACEBACK)
+    assert message != Message(TRACEBACK, "python")
+    assert len({message, Message(TRACEBACK)}) == 1
+
+
+@pytest.mark.unit
+def test_pipeline_stages_share_the_message():
+    """Test that preparation builds a Message that detection and matching consume."""
+    message = prepare_error("\x00" + TRACEBACK, "PYTHON")
+    assert isinstance(message, Message)
+    assert (message.text, message.language, message.windows) == (TRACEBACK, "python", ())
+    assert detect_language(message, use_patterns=False) == "python"
+    result = match_error(message)
+    assert result["original_error"] == TRACEBACK
+    assert result["title"] == 'Variable "total" Not Defined'
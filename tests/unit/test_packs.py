@@ -0,0 +1,120 @@
+"""
+Unit tests for pattern packs and their lazy loading.
+"""
+import pytest
+
+import app.message
+import app.translator
+from app.data import packs as packs_module
+from app.data.packs import BUILTIN_PACKS, PackRegistry, PatternPack
+from app.data.registry import PatternRegistry
+from app.translator import match_error
+
+CPP_PATTERNS = [{
+    "regex": r"std::out_of_range: (\w+)",
+    "title": "Index Out of Range in {{$1}}",
+    "explanation": "A container was read past its end.",
+    "solution": "Check the index against size() first.",
+}]
+
+
+class FakeEntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+@pytest.fixture
+def packs(monkeypatch):
+    loaded = []
+
+    def cpp_patterns():
+        loaded.append("cpp")
+        return CPP_PATTERNS
+
+    cpp = PatternPack("cpp", "C++", cpp_patterns, keywords=["g++", "std::"],
+                      file_extensions=[".cpp"], exception_types=["std::out_of_range"])
+    monkeypatch.setattr(packs_module, "_entry_points", lambda group: [
+        FakeEntryPoint("cpp", cpp),
+        FakeEntryPoint("broken", ImportError("no module named broken_pack")),
+        FakeEntryPoint("python", lambda: PatternPack("python", "Other Python", [])),
+    ])
+    packs = PackRegistry(PatternRegistry())
+    packs.loaded_log = loaded
+    return packs
+
+
+@pytest.mark.unit
+def test_discovery_skips_broken_and_duplicate_packs(packs):
+    """Test that entry point packs follow the built-in ones, skipping bad and duplicate packs."""
+    assert packs.languages() == [pack.language for pack in BUILTIN_PACKS[:-1]] + ["cpp", "general"]
+    assert packs.pack("python").name == "Python"
+    assert packs.file_extensions()[".cpp"] == "cpp"
+    assert packs.generic_title("cpp") == "C++ Error"
+
+
+@pytest.mark.unit
+def test_patterns_load_on_first_use(packs):
+    """Test that a pack's patterns are compiled only when its language is needed, and only once."""
+    assert packs.loaded_log == [] and not packs.is_loaded("cpp")
+    assert packs.languages_for_type("std::out_of_range") == ("cpp",)
+    assert packs.ensure_loaded("cpp") and packs.ensure_loaded("cpp")
+    assert packs.loaded_log == ["cpp"]
+    assert [pattern.id for pattern in packs.registry.patterns("cpp")] == ["cpp:0"]
+    assert not packs.ensure_loaded("php")
+
+
+@pytest.mark.unit
+def test_detected_pack_is_loaded_and_matched(packs, monkeypatch):
+    """Test that a message detected as a plugin's language loads and matches its pack."""
+    monkeypatch.setattr(app.translator, "LANGUAGE_PACKS", packs)
+    monkeypatch.setattr(app.message, "LANGUAGE_PACKS", packs)
+    result = match_error("main.cpp: terminate called after std::out_of_range: vector",
+                         registry=packs.registry)
+    assert result["language"] == "cpp"
+    assert result["title"] == "Index Out of Range in vector"
+    assert packs.loaded_log == ["cpp"]
+
+
+@pytest.mark.unit
+def test_failed_pack_is_retried_after_backoff(packs):
+    """Test that a pack whose patterns fail to load stays unloaded and is tried again later."""
+    attempts = []
+
+    def flaky_patterns():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise OSError("pattern file unavailable")
+        return CPP_PATTERNS
+
+    packs.register(PatternPack("rust", "Rust", flaky_patterns))
+    assert not packs.ensure_loaded("rust") and not packs.is_loaded("rust")
+    assert not packs.ensure_loaded("rust") and attempts == [0]
+    packs._retry_at["rust"] = 0.0  # The back-off has passed
+    assert packs.ensure_loaded("rust") and attempts == [0, 1]
+
+
+@pytest.mark.unit
+def test_loading_a_pack_invalidates_cached_results(packs, monkeypatch):
+    """Test that detections and translations cached before a pack loaded are not reused."""
+    monkeypatch.setattr(app.translator, "LANGUAGE_PACKS", packs)
+    message = app.message.Message("main.cpp: terminate called after std::out_of_range: vector")
+    before_key = app.translator.cache_key_for(message)
+    before_generation = packs.generation
+    packs.ensure_loaded("cpp")
+    assert packs.generation != before_generation
+    assert app.translator.cache_key_for(message) != before_key
+
+
+@pytest.mark.unit
+def test_pattern_path_is_imported_lazily():
+    """Test that patterns given as a module path are imported when loaded."""
+    pack = PatternPack("general", "General", "app.data.patterns.general:PATTERNS")
+    assert isinstance(pack.load_patterns(), list)
+    with pytest.raises(ValueError):
+        PatternPack("C++", "C++", [])
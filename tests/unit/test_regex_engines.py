@@ -0,0 +1,99 @@
+"""
+Unit tests for the regex engine backends.
+"""
+import re
+
+import pytest
+
+from app import regex_engines
+from app.data.error_patterns import REGISTRY
+from app.regex_engines import (
+    CompiledRegex,
+    RegexEngine,
+    RegexEngineError,
+    compile_pattern,
+    has_nested_quantifier,
+    has_wildcard_chain,
+    select_engine,
+)
+
+FLAGS = re.IGNORECASE | re.DOTALL
+
+
+class FakeLinearEngine(RegexEngine):
+    """A linear engine that, like RE2, rejects lookaround."""
+
+    name = "fake"
+    available = True
+    linear = True
+
+    def compile(self, source, flags):
+        if "(?=" in source:
+            raise RegexEngineError("lookaround is not supported")
+        compiled = re.compile(source, flags)
+        return CompiledRegex(source, compiled.groups, self.name, compiled.search)
+
+
+@pytest.mark.unit
+def test_nested_quantifier_detection():
+    """Test recognising patterns that can backtrack catastrophically."""
+    assert has_nested_quantifier(r"(a+)+$")
+    assert has_nested_quantifier(r"(?:\w+\s?)*done")
+    assert not has_nested_quantifier(r"(a+)?b")
+    assert not has_nested_quantifier(r"([^,]+)(?:,|$)")
+    assert not has_nested_quantifier(r"\(\w+\)+")
+
+
+@pytest.mark.unit
+def test_wildcard_chain_detection():
+    """Test recognising wildcards that can split the same text in polynomially many ways."""
+    assert has_wildcard_chain(r"Invalid attribute(?:.*?)([a-z-]+)(?:.*?)for")
+    assert has_wildcard_chain(r".*\s*.+x")
+    assert not has_wildcard_chain(r"Property value .+? is invalid for .+?flex")
+    assert not has_wildcard_chain(r"SyntaxError: (?:.*?)unexpected ([^,]+)(?:,|$)")
+    assert not has_wildcard_chain(r".*[^x]\..*")
+
+
+@pytest.mark.unit
+def test_safe_patterns_stay_on_stdlib():
+    """Test that every shipped pattern runs on re."""
+    assert {pattern.engine for pattern in REGISTRY} == {"re"}
+    assert isinstance(compile_pattern(r"NameError: (\w+)", FLAGS), re.Pattern)
+
+
+@pytest.mark.unit
+def test_nested_quantifiers_route_to_compatible_linear_engine(monkeypatch):
+    """Test routing to the preferred engine that can compile the pattern."""
+    monkeypatch.setitem(regex_engines.ENGINES, "fake", FakeLinearEngine())
+    assert select_engine(r"(\w+\s?)+$", FLAGS, preference=["fake"]).name == "fake"
+    assert select_engine(r"(?=x)(\w+\s?)+$", FLAGS, preference=["fake"]).name == "re"
+
+    compiled = compile_pattern(r"(\w+\s?)+!", FLAGS, preference=["fake"])
+    assert compiled.engine == "fake"
+    assert compiled.search("hello world!").group(1) == "world"
+
+
+@pytest.mark.unit
+def test_bounded_engines_are_used_for_risky_patterns(monkeypatch):
+    """Test that an engine that times searches out is picked without claiming to be linear."""
+    class FakeBoundedEngine(FakeLinearEngine):
+        name = "bounded"
+        linear = False
+        bounded = True
+
+    class FakeUnsafeEngine(FakeLinearEngine):
+        name = "unsafe"
+        linear = False
+
+    monkeypatch.setitem(regex_engines.ENGINES, "bounded", FakeBoundedEngine())
+    monkeypatch.setitem(regex_engines.ENGINES, "unsafe", FakeUnsafeEngine())
+    assert select_engine(r".*?(\w+).*?x", FLAGS, preference=["unsafe", "bounded"]).name == "bounded"
+    assert not regex_engines.ENGINES["regex"].linear and regex_engines.ENGINES["regex"].bounded
+
+
+@pytest.mark.unit
+def test_regex_module_search_times_out():
+    """Test that a catastrophic search on the regex module is cut off."""
+    pytest.importorskip("regex")
+    compiled = regex_engines.RegexModuleEngine(timeout=0.01).compile(r"(a+)+$", FLAGS)
+    assert compiled.search("a" * 40 + "!") is None
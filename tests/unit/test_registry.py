@@ -0,0 +1,129 @@
+"""
+Unit tests for the compiled pattern registry.
+"""
+import pytest
+
+from app.data.patterns.base_pattern import ErrorPattern, literal_alternatives
+from app.data.registry import PatternRegistry, exception_types
+from app.data.error_patterns import REGISTRY
+
+
+NAME_ERROR = {
+    "regex": r"NameError: name '([^']+)' is not defined",
+    "title": 'Variable "{{$1}}" Not Defined',
+    "explanation": 'Python cannot find a variable named "{{$1}}".',
+    "solution": "Define the variable before using it.",
+    "code_example": "{{$1}} = 5",
+    "related_errors": ["UnboundLocalError"],
+    "difficulty": "beginner",
+}
+
+
+@pytest.mark.unit
+def test_error_pattern_keeps_hot_fields_and_decodes_cold_fields():
+    """Test that a pattern compiles its regex and decodes its display text on demand."""
+    pattern = ErrorPattern.from_dict(NAME_ERROR, "python", pattern_id="python:0")
+    assert pattern.id == "python:0"
+    assert pattern.regex.search("NameError: name 'x' is not defined")
+    assert pattern.slots == (1,)
+    assert pattern.title == NAME_ERROR["title"]
+    assert pattern.related_errors == ["UnboundLocalError"]
+    assert pattern.to_dict() == NAME_ERROR
+    assert not hasattr(pattern, "__dict__")
+
+
+@pytest.mark.unit
+def test_error_pattern_rejects_invalid_difficulty():
+    """Test that pattern validation is kept."""
+    with pytest.raises(ValueError):
+        ErrorPattern.from_dict(dict(NAME_ERROR, difficulty="expert"), "python")
+
+
+@pytest.mark.unit
+def test_registry_skips_invalid_patterns():
+    """Test that one invalid pattern does not drop the rest of the language."""
+    registry = PatternRegistry()
+    registry.add_language("python", [NAME_ERROR, {"regex": "x"}])
+    assert [p.id for p in registry.patterns("python")] == ["python:0"]
+    assert registry.patterns("ruby") == ()
+
+
+@pytest.mark.unit
+def test_registry_loaded_all_languages():
+    """Test that the shared registry holds every language including general."""
+    assert set(REGISTRY.languages()) >= {
+        "python", "javascript", "java", "ruby", "html", "css", "general"}
+
+
+@pytest.mark.unit
+def test_loading_the_registry_keeps_the_source_patterns():
+    """Test that compiling the pattern modules does not empty their lists."""
+    import app.data.patterns as source_patterns
+    from app.data.patterns import python
+
+    assert len(python.PATTERNS) == len(PatternRegistry().add_language("python", python.PATTERNS))
+    assert len(source_patterns.ALL_PATTERNS) >= len(python.PATTERNS)
+
+
+@pytest.mark.unit
+def test_released_pattern_modules_are_rebuilt_on_import():
+    """Test that a released pattern module is dropped, and importing it again rebuilds its list."""
+    import sys
+
+    from app.data.error_patterns import release_source_module
+    from app.data.patterns import python
+
+    release_source_module("app.data.patterns.python")
+    assert not [name for name in sys.modules if name.startswith("app.data.patterns.python")]
+    from app.data.patterns import python as reloaded
+
+    assert reloaded is not python and len(reloaded.PATTERNS) == len(python.PATTERNS) > 0
+
+
+@pytest.mark.unit
+def test_registry_dispatches_on_exception_type():
+    """Test that patterns for the message's exception type come first, the rest after."""
+    type_error = dict(NAME_ERROR, regex=r"TypeError: '([^']+)' object is not callable")
+    generic = dict(NAME_ERROR, regex=r"is not defined")
+    registry = PatternRegistry()
+    registry.add_language("python", [generic, type_error, NAME_ERROR])
+    assert registry.patterns("python")[2].exception_type == "nameerror"
+    assert registry.patterns("python")[0].exception_type == ""
+
+    types = exception_types("Traceback:\nNameError: name 'x' is not defined")
+    assert types == ("nameerror",)
+    assert [p.id for p in registry.candidates("python", types)] == [
+        "python:2", "python:0", "python:1"]
+    assert registry.candidates("python", ("valueerror",)) == registry.patterns("python")
+    assert registry.languages_for_type("nameerror") == ("python",)
+
+
+@pytest.mark.unit
+def test_exception_types_finds_qualified_names():
+    """Test extracting fully qualified Java exception names."""
+    message = ('Exception in thread "main" java.lang.NullPointerException: x\n'
+               'Caused by: java.io.IOException')
+    assert exception_types(message) == ("java.lang.nullpointerexception", "java.io.ioexception")
+
+
+@pytest.mark.unit
+def test_literal_patterns_skip_the_regex_engine():
+    """Test that pure literal patterns are classified and searched case-insensitively."""
+    assert literal_alternatives(r"Permission denied|Access denied") == (
+        "permission denied", "access denied")
+    assert literal_alternatives(r"JSON\.parse failed") == ("json.parse failed",)
+    assert literal_alternatives(r"NameError: name '([^']+)'") is None
+    assert literal_alternatives(r"Timeout\s+reached") is None
+    assert literal_alternatives(r"Timeout|") is None
+
+    pattern = ErrorPattern.from_dict(dict(NAME_ERROR, regex="Access denied|Permission denied"),
+                                     "general")
+    assert pattern.literals is not None
+    assert pattern.search("open(): PERMISSION DENIED").group(0) == "PERMISSION DENIED"
+    assert pattern.search("File not found") is None
+    assert ErrorPattern.from_dict(NAME_ERROR, "python").literals is None
+
+    registry = PatternRegistry()
+    registry.add_language("python", [NAME_ERROR])
+    registry.add_language("general", [dict(NAME_ERROR, regex="Access denied|Permission denied")])
+    assert not registry.has_literals("python") and registry.has_literals("general")
@@ -0,0 +1,113 @@
+"""
+Unit tests for sharded pattern matching.
+"""
+import time
+
+import pytest
+
+from app import sharding
+from app.breaker import BREAKER
+from app.data.error_patterns import REGISTRY
+from app.message import Message
+from app.sharding import ShardError, ShardPool, SHARD_POOL, disable_sharding, enable_sharding
+from app.translator import match_error
+
+MESSAGES = [
+    ("python", "NameError: name 'foo' is not defined"),
+    ("python", "TypeError: 'int' object is not callable"),
+    ("javascript", "TypeError: Cannot read properties of undefined (reading 'x')"),
+    ("java", 'Exception in thread "main" java.lang.NullPointerException'),
+    ("general", "Permission denied"),
+    ("python", "nothing to see here"),
+]
+
+
+def local_first_match(text, language):
+    message = Message(text, language)
+    folded = message.folded
+    for rank, pattern in enumerate(REGISTRY.candidates(language, message.exception_types)):
+        if pattern.search(text, folded):
+            return rank
+    return None
+
+
+@pytest.fixture(params=["hash", "language"])
+def pool(request):
+    pool = ShardPool()
+    pool.start(3, request.param)
+    yield pool
+    pool.stop()
+
+
+@pytest.mark.unit
+def test_shards_agree_with_single_process_scan(pool):
+    """Test that scatter-gather picks the same pattern as a local scan."""
+    for language, text in MESSAGES:
+        types = Message(text, language).exception_types
+        assert pool.first_match(text, language, types) == local_first_match(text, language)
+
+
+@pytest.mark.unit
+def test_match_error_uses_shards():
+    """Test that the translator's results do not change with sharding enabled."""
+    expected = [match_error(text, language) for language, text in MESSAGES]
+    enable_sharding(2)
+    try:
+        results = [match_error(text, language) for language, text in MESSAGES]
+        assert SHARD_POOL.stats["requests"] == len(MESSAGES)
+    finally:
+        disable_sharding()
+    for result, want in zip(results, expected):
+        assert (result["title"], result["language"]) == (want["title"], want["language"])
+
+
+@pytest.mark.unit
+def test_shards_skip_tripped_patterns(pool):
+    """Test that a pattern tripped by the breaker cannot win the rank, as in a local scan."""
+    text, types = "NameError: name 'foo' is not defined", ("nameerror",)
+    rank = pool.first_match(text, "python", types)
+    pattern = REGISTRY.candidates("python", types)[rank]
+    try:
+        for _ in range(BREAKER.trip_after):
+            BREAKER.record(pattern.id, BREAKER.threshold)
+        skipped = []
+        assert pool.first_match(text, "python", types, skipped=skipped) != rank
+        assert skipped == [pattern.id]
+    finally:
+        BREAKER.reset()
+
+
+@pytest.mark.unit
+def test_shard_search_times_trip_patterns(pool, monkeypatch):
+    """Test that the search times measured in the shards are recorded by the breaker."""
+    text, types = "NameError: name 'foo' is not defined", ("nameerror",)
+    pattern = REGISTRY.candidates("python", types)[pool.first_match(text, "python", types)]
+    # Every search counts as slow
+    monkeypatch.setattr(BREAKER, "threshold", 0.0)
+    monkeypatch.setattr(BREAKER, "threshold_per_kib", 0.0)
+    try:
+        for _ in range(BREAKER.trip_after):
+            pool.first_match(text, "python", types)
+        assert pattern.id in [trip["id"] for trip in BREAKER.tripped()]
+    finally:
+        BREAKER.reset()
+
+
+@pytest.mark.unit
+def test_dead_shard_is_restarted(pool, monkeypatch):
+    """Test that losing a shard fails waiting requests and the shard is forked again."""
+    monkeypatch.setattr(sharding, "RESTART_BACKOFF", 0.0)
+    for shard in pool._shards:
+        shard.process.kill()
+        shard.process.join()
+    try:
+        pool.first_match("NameError: name 'x' is not defined", "python", ("nameerror",),
+                         timeout=1.0)
+    except ShardError:
+        pass  # The request was sent before the pool noticed
+    deadline = time.monotonic() + 5
+    while pool.stats["restarts"] < len(pool._shards) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.active and pool.stats["restarts"] == len(pool._shards)
+    assert pool.first_match("NameError: name 'x' is not defined", "python", ("nameerror",)) == \
+        local_first_match("NameError: name 'x' is not defined", "python")
@@ -0,0 +1,65 @@
+"""
+Unit tests for the trigram similarity fallback.
+"""
+import pytest
+
+from app.data.registry import PatternRegistry
+from app.data.similarity import TrigramIndex, normalize, trigrams
+from app.translator import match_error
+
+
+def _pattern(regex, title, related=()):
+    return {"regex": regex, "title": title, "explanation": "Explanation", "solution": "Solution",
+            "related_errors": list(related)}
+
+
+@pytest.fixture
+def index():
+    registry = PatternRegistry()
+    registry.add_language("python", [
+        _pattern(r"NameError: name '(\w+)' is not defined", 'Variable "{{$1}}" Not Defined'),
+        _pattern(r"ZeroDivisionError: division by zero", "Division by Zero",
+                 ["ZeroDivisionError: integer modulo by zero"]),
+    ])
+    registry.add_language("ruby", [
+        _pattern(r"NameError: uninitialized constant (\w+)", "Unknown Constant"),
+    ])
+    return TrigramIndex(registry)
+
+
+@pytest.mark.unit
+def test_trigrams_ignore_case_punctuation_and_placeholders():
+    """Test that texts differing only in case and punctuation share all trigrams."""
+    assert normalize('Variable "{{$1}}" Not  Defined!') == "variable not defined"
+    assert trigrams("Division-by ZERO") == trigrams("division by zero")
+
+
+@pytest.mark.unit
+def test_nearest_patterns_are_ranked(index):
+    """Test that a near miss finds its pattern first, with a similarity score."""
+    results = index.search("NameErro: name 'x' is not definedd")
+    assert results[0][0].id == "python:0"
+    assert 0.5 < results[0][1] < 1
+    assert [pattern.id for pattern, _ in index.search("integer modulo by zero")] == ["python:1"]
+    assert index.search("completely unrelated words") == []
+
+
+@pytest.mark.unit
+def test_language_filter(index):
+    """Test that only patterns of the requested languages are returned."""
+    results = index.search("NameError: uninitialized constant Foo", languages=("python",))
+    assert all(pattern.language == "python" for pattern, _ in results)
+    found = index.search("NameError: uninitialized constant Foo", languages=("ruby",))
+    assert found[0][0].id == "ruby:0"
+
+
+@pytest.mark.unit
+def test_unmatched_message_gets_similar_errors():
+    """Test that a message no pattern matches is answered from the closest pattern."""
+    result = match_error("NameErro: name 'x' is not definedd", "python")
+    assert result["match"] == "fuzzy"
+    assert result["similar_errors"][0]["id"] == "python:0"
+    assert "{{$" not in result["title"]
+
+    result = match_error("qqqq zzzz", "python")
+    assert "match" not in result and "similar_errors" not in result
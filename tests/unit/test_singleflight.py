@@ -0,0 +1,119 @@
+"""
+Unit tests for request coalescing.
+"""
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+@pytest.mark.unit
+def test_concurrent_calls_share_one_computation():
+    """Test that identical concurrent requests wait for a single computation."""
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait()
+        return {"title": "shared"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.stats["in_flight"] == 0 or sum(t.is_alive() for t in threads) < 5:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"title": "shared"}] * 5
+    assert flight.stats["coalesced"] == 4
+    assert flight.stats["in_flight"] == 0
+
+
+@pytest.mark.unit
+def test_waiting_caller_computes_after_timeout():
+    """Test that a waiter falls back to its own computation when the leader is slow."""
+    flight = SingleFlight(timeout=0.05)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return "slow"
+
+    leader = threading.Thread(target=flight.do, args=("key", slow))
+    leader.start()
+    started.wait()
+    assert flight.do("key", lambda: "own") == "own"
+    assert flight.stats["timeouts"] == 1
+    release.set()
+    leader.join()
+
+
+@pytest.mark.unit
+def test_failed_computation_is_not_shared():
+    """Test that an exception in the leader is raised there and waiters recompute."""
+    flight = SingleFlight(timeout=1)
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", failing)
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+@pytest.mark.unit
+def test_waiter_stops_waiting_at_its_own_deadline():
+    """Test that a caller's timeout shorter than the coalescer's bounds its wait."""
+    flight = SingleFlight(timeout=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return "slow"
+
+    leader = threading.Thread(target=flight.do, args=("key", slow))
+    leader.start()
+    started.wait()
+    began = time.monotonic()
+    assert flight.do("key", lambda: "own", timeout=0.05) == "own"
+    assert time.monotonic() - began < 1
+    assert flight.stats["timeouts"] == 1
+    release.set()
+    leader.join()
+
+
+@pytest.mark.unit
+def test_rejected_shared_result_is_recomputed():
+    """Test that a waiter computes its own result when it does not accept the shared one."""
+    flight = SingleFlight(timeout=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def degraded():
+        started.set()
+        release.wait()
+        return {"degraded": ["general_response"]}
+
+    leader = threading.Thread(target=flight.do, args=("key", degraded))
+    leader.start()
+    started.wait()
+    threading.Timer(0.05, release.set).start()
+    result = flight.do("key", lambda: {"title": "full"},
+                       accept=lambda shared: "degraded" not in shared)
+    assert result == {"title": "full"}
+    assert flight.stats["rejected"] == 1
+    leader.join()
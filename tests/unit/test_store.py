@@ -0,0 +1,119 @@
+"""
+Unit tests for the SQLite pattern store.
+"""
+import time
+
+import pytest
+
+from app.cache import TRANSLATION_CACHE
+from app.data import store as store_module
+from app.data.registry import PatternRegistry
+from app.data.store import PATTERN_STORE, PatternStore, fts_query
+from app.translator import translate_error, translate_errors
+
+
+def _pattern(regex, title, related=()):
+    return {
+        "regex": regex,
+        "title": title,
+        "explanation": f"Explanation of {title.lower()}",
+        "solution": "Solution",
+        "related_errors": list(related),
+        "difficulty": "beginner",
+    }
+
+
+@pytest.fixture
+def registry():
+    registry = PatternRegistry()
+    registry.add_language("python", [
+        _pattern(r"NameError: name '(\w+)' is not defined", "Variable Not Defined",
+                 ["UnboundLocalError"]),
+        _pattern(r"IndentationError: unexpected indent", "Unexpected Indentation"),
+    ])
+    return registry
+
+
+@pytest.mark.unit
+def test_fts_query_quotes_terms():
+    """Test that free text becomes quoted terms with a prefix match on the last one."""
+    assert fts_query('name "x" is not def') == '"name" "x" "is" "not" "def"*'
+    assert fts_query("'()") == ""
+
+
+@pytest.mark.unit
+def test_search_ranks_module_patterns(registry):
+    """Test full-text search over titles, explanations and related errors."""
+    store = PatternStore()
+    assert store.import_registry(registry) == 2
+    assert [result["id"] for result in store.search("indent")] == ["python:1"]
+    assert [result["id"] for result in store.search("unboundlocal")] == ["python:0"]
+    assert store.search("indentation", language="java") == []
+    assert store.get("python:0")["category"] == "NameError".lower()
+
+
+@pytest.mark.unit
+def test_versions_and_hits(tmp_path, registry):
+    """Test that edits bump the version and hit counts are written on flush."""
+    store = PatternStore(str(tmp_path / "patterns.db"))
+    store.import_registry(registry)
+    store.import_registry(registry)
+    assert store.get("python:1")["version"] == 1
+
+    pattern_id = store.add(_pattern(r"KeyError: '(\w+)'", "Missing Key"), "python",
+                           category="keyerror")
+    store.add(_pattern(r"KeyError: '(\w+)'", "Missing Dictionary Key"), "python",
+              pattern_id=pattern_id)
+    assert store.get(pattern_id)["version"] == 2
+    assert [result["id"] for result in store.search("dictionary")] == [pattern_id]
+
+    store.record_hit("python:0")
+    store.record_hit("python:0")
+    store.flush_hits()
+    assert store.get("python:0")["hits"] == 2
+    store.close()
+
+
+@pytest.mark.unit
+def test_store_patterns_load_into_registry(tmp_path, registry):
+    """Test that patterns added to the store become registry patterns after the module ones."""
+    store = PatternStore(str(tmp_path / "patterns.db"))
+    store.import_registry(registry)
+    pattern_id = store.add(_pattern(r"KeyError: '(\w+)'", "Missing Key"), "python")
+    with pytest.raises(ValueError):
+        store.add(_pattern(r"KeyError: (", "Broken"), "python")
+
+    assert store.load_into(registry) == 1
+    assert [p.id for p in registry.patterns("python")] == ["python:0", "python:1", pattern_id]
+    assert registry.patterns("python")[-1].search("KeyError: 'name'")
+    store.close()
+
+
+@pytest.mark.unit
+def test_hits_are_written_in_the_background(tmp_path, registry, monkeypatch):
+    """Test that buffered hit counts are written without a flush on the request path."""
+    monkeypatch.setattr(store_module, "HIT_FLUSH_INTERVAL", 0.01)
+    store = PatternStore(str(tmp_path / "patterns.db"))
+    store.import_registry(registry)
+    store.record_hit("python:0")
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        rows = store._execute("SELECT hits FROM patterns WHERE id = ?", ("python:0",))
+        if rows[0]["hits"]:
+            break
+        time.sleep(0.01)
+    assert rows[0]["hits"] == 1
+    store.close()
+
+
+@pytest.mark.unit
+def test_cached_translations_count_as_hits(monkeypatch):
+    """Test that a translation served from the cache still counts towards its pattern."""
+    counted = []
+    monkeypatch.setattr(PATTERN_STORE, "record_hit", counted.append)
+    TRANSLATION_CACHE.clear()
+    message = "NameError: name 'hot' is not defined"
+    first = translate_error(message, "python")
+    translate_error(message, "python")
+    translate_errors([(message, "python")])
+    assert counted == [first["pattern_id"]] * 3
@@ -0,0 +1,88 @@
+"""
+Unit tests for the error signature suggestions.
+"""
+import pytest
+
+from app.cache import TRANSLATION_CACHE
+from app.data.patterns.base_pattern import ErrorPattern
+from app.data.registry import PatternRegistry
+from app.data.suggest import SUGGESTIONS, SignatureTrie, pattern_signatures
+from app.translator import translate_error
+
+
+def _pattern(regex, title="Title"):
+    return {"regex": regex, "title": title, "explanation": "Explanation", "solution": "Solution"}
+
+
+@pytest.fixture
+def trie():
+    registry = PatternRegistry()
+    registry.add_language("python", [
+        _pattern(r"TypeError: unsupported operand type\(s\) for (.+)"),
+        _pattern(r"TypeError: '(\w+)' object is not subscriptable"),
+        _pattern(r"NameError: name '(\w+)' is not defined"),
+    ])
+    registry.add_language("javascript", [
+        _pattern(r"TypeError: Cannot read (?:property|properties) '([^']*)' of (undefined|null)"),
+    ])
+    registry.add_language("general", [_pattern(r"Permission denied|Access denied")])
+    return SignatureTrie(registry)
+
+
+@pytest.mark.unit
+def test_signatures_follow_literal_alternatives():
+    """Test that signatures stop at the first non-literal and fan out over alternatives."""
+    def signatures(regex):
+        return pattern_signatures(ErrorPattern.from_dict(_pattern(regex), "python"))
+
+    assert signatures(r"NameError: name '(\w+)' is not defined") == ["NameError: name"]
+    assert signatures(r"SyntaxError: (EOL|EOF) while\s+scanning") == [
+        "SyntaxError: EOL while scanning", "SyntaxError: EOF while scanning"]
+    assert signatures(r"(?:error:)?\s*cannot find symbol") == [
+        "cannot find symbol", "error: cannot find symbol"]
+    assert signatures(r"(\w+) is not defined") == []
+
+
+@pytest.mark.unit
+def test_completions_are_case_insensitive(trie):
+    """Test that completions share the typed prefix, ignoring case and repeated spaces."""
+    texts = [suggestion["text"] for suggestion in trie.complete("typeerror:  ")]
+    assert texts == [
+        "TypeError: Cannot read property",
+        "TypeError: Cannot read properties",
+        "TypeError: unsupported operand type(s) for",
+    ]
+    assert trie.complete("TypeError: Cannot read properties of") == []
+    assert trie.complete("xyz") == [] and trie.complete("") == []
+
+
+@pytest.mark.unit
+def test_completions_ranked_by_hits(trie):
+    """Test that signatures whose patterns matched more often come first."""
+    trie.record_hit("python:0")
+    trie.record_hit("python:0")
+    suggestions = trie.complete("TypeError", limit=2)
+    assert suggestions[0] == {
+        "text": "TypeError: unsupported operand type(s) for", "languages": ["python"], "hits": 2}
+    assert len(suggestions) == 2
+
+
+@pytest.mark.unit
+def test_language_filter_keeps_general(trie):
+    """Test that a language limits completions to its own and general signatures."""
+    assert [suggestion["text"] for suggestion in trie.complete("TypeError", "javascript")] == [
+        "TypeError: Cannot read property", "TypeError: Cannot read properties"]
+    assert trie.complete("access", "python")[0]["text"] == "Access denied"
+
+
+@pytest.mark.unit
+def test_cached_translations_raise_suggestion_rank():
+    """Test that every served translation, cached or not, counts towards the ranking."""
+    TRANSLATION_CACHE.clear()
+    SUGGESTIONS.reset()
+    message = "TypeError: 'int' object is not callable"
+    pattern_id = translate_error(message, "python")["pattern_id"]
+    before = SUGGESTIONS.trie().hits.get(pattern_id, 0)
+    for _ in range(3):
+        translate_error(message, "python")  # Served from the cache
+    assert SUGGESTIONS.trie().hits[pattern_id] == before + 3
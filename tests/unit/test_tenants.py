@@ -0,0 +1,103 @@
+"""
+Unit tests for tenant overlay registries.
+"""
+import pytest
+
+from app.data.registry import PatternRegistry
+from app.data.tenants import TenantRegistries, UnknownTenant
+from app.translator import cache_key_for, match_error
+from app.message import Message
+
+
+def _pattern(regex, title):
+    return {"regex": regex, "title": title, "explanation": "Explanation", "solution": "Solution"}
+
+
+@pytest.fixture
+def base():
+    registry = PatternRegistry()
+    registry.add_language(
+        "python", [_pattern(r"NameError: name '(\w+)' is not defined", "Shared NameError")])
+    registry.add_language("general", [_pattern(r"Permission denied", "Shared Permission")])
+    return registry
+
+
+@pytest.fixture
+def tenants(base):
+    tenants = TenantRegistries(base)
+    tenants.define(
+        "payments", {"python": [_pattern(r"PaymentError: card (\w+) declined", "Card Declined")]},
+        api_keys=["secret"])
+    tenants.define(
+        "search", {"python": [_pattern(r"NameError: name 'index'", "Search Index Missing")]})
+    return tenants
+
+
+@pytest.mark.unit
+def test_overlay_patterns_come_first(tenants, base):
+    """Test that a tenant's patterns are tried before the shared ones, which stay untouched."""
+    registry = tenants.registry("search")
+    assert [pattern.id for pattern in registry.candidates("python", ("nameerror",))] == [
+        "search/python:0", "python:0"]
+    message = "NameError: name 'index' is not defined"
+    assert match_error(message, "python", registry=registry)["title"] == "Search Index Missing"
+    assert match_error(message, "python", registry=base)["title"] == "Shared NameError"
+    assert registry.base is base and len(base) == 2
+
+
+@pytest.mark.unit
+def test_compiled_once_and_keys_resolve(tenants):
+    """Test that an overlay is compiled on first use and reused, and API keys name their tenant."""
+    first = tenants.registry(tenants.tenant_for_key("secret"))
+    assert tenants.registry("payments") is first
+    assert tenants.stats["compiled"] == 1 and tenants.stats["hits"] == 1
+    with pytest.raises(UnknownTenant):
+        tenants.tenant_for_key("wrong")
+    with pytest.raises(UnknownTenant):
+        tenants.registry("nobody")
+
+
+@pytest.mark.unit
+def test_lru_eviction_by_count_and_bytes(tenants):
+    """Test that the least recently used overlays are evicted to respect both limits."""
+    tenants.max_tenants = 1
+    tenants.registry("payments")
+    tenants.registry("search")
+    assert tenants.metrics()["cached"] == 1 and tenants.stats["evicted"] == 1
+    tenants.registry("payments")
+    assert tenants.stats["compiled"] == 3
+
+    tenants.max_tenants = 10
+    tenants.max_bytes = tenants.registry("payments").nbytes
+    tenants.registry("search")
+    assert tenants.metrics()["cached"] == 1
+    assert tenants.metrics()["bytes"] == tenants.registry("search").nbytes > 0
+
+
+@pytest.mark.unit
+def test_redefinition_changes_cache_key(tenants):
+    """Test that tenants and successive definitions of a tenant get their own cache keys."""
+    message = Message("NameError: name 'x' is not defined", "python")
+    before = cache_key_for(message, tenants.registry("search"))
+    tenants.define("search", {"python": []})
+    after = cache_key_for(message, tenants.registry("search"))
+    other = cache_key_for(message, tenants.registry("payments"))
+    assert len({message.fingerprint, before, after, other}) == 4
+
+
+@pytest.mark.unit
+def test_invalid_definitions_are_refused(tenants, tmp_path):
+    """Test that unknown languages and broken patterns fail when defined, not when used."""
+    with pytest.raises(ValueError, match="unknown language 'cobol'"):
+        tenants.define("legacy", {"cobol": [_pattern(r"ABEND (\w+)", "Abnormal End")]})
+    with pytest.raises(ValueError, match="invalid python pattern #1"):
+        tenants.define(
+            "legacy", {"python": [_pattern(r"ok", "Fine"), _pattern(r"(unclosed", "Broken")]})
+    with pytest.raises(ValueError, match="invalid python pattern #0"):
+        tenants.define("legacy", {"python": [{"regex": r"no title"}]})
+    assert "legacy" not in tenants.tenants()
+
+    path = tmp_path / "tenants.json"
+    path.write_text('{"tenants": {"legacy": {"patterns": {"cobol": []}}}}')
+    with pytest.raises(ValueError):
+        tenants.load_file(str(path))
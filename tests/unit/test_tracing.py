@@ -0,0 +1,75 @@
+"""
+Unit tests for request tracing.
+"""
+import json
+
+import pytest
+
+from app.tracing import NOOP_SPAN, InMemoryExporter, JsonLinesExporter, Tracer, current_trace, span
+from app.translator import translate_error
+
+
+@pytest.mark.unit
+def test_span_is_noop_without_trace():
+    """Test that spans cost nothing when no trace is active."""
+    assert current_trace() is None
+    assert span("match") is NOOP_SPAN
+    with span("match"):
+        pass
+
+
+@pytest.mark.unit
+def test_translation_stages_are_recorded():
+    """Test that a traced translation records a span per stage."""
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+    token = tracer.start("test")
+    translate_error("NameError: name 'traced_total' is not defined", "python")
+    trace = current_trace()
+    tracer.end(token)
+
+    assert current_trace() is None
+    assert exporter.traces == [trace]
+    names = [name for name, _, _ in trace.spans]
+    for stage in ("sanitize", "fingerprint", "cache", "prefilter", "match", "render"):
+        assert stage in names
+    assert "detect" not in names  # The language was given
+    assert all(duration >= 0 for _, _, duration in trace.spans)
+    assert trace.duration >= max(offset + duration for _, offset, duration in trace.spans)
+
+
+@pytest.mark.unit
+def test_server_timing_sums_repeated_stages():
+    """Test that the Server-Timing value has one entry per stage plus the total."""
+    tracer = Tracer(InMemoryExporter())
+    token = tracer.start("test")
+    for _ in range(2):
+        with span("cache"):
+            pass
+    trace = current_trace()
+    trace.finish()
+    tracer.end(token)
+
+    metrics = [metric.split(";dur=") for metric in trace.server_timing().split(", ")]
+    assert [name for name, _ in metrics] == ["cache", "total"]
+    spans_ms = sum(duration for _, _, duration in trace.spans) * 1000
+    assert float(metrics[0][1]) == pytest.approx(spans_ms, abs=0.002)
+
+
+@pytest.mark.unit
+def test_json_lines_exporter(tmp_path):
+    """Test that each trace is written as one JSON line."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(JsonLinesExporter(str(path)))
+    for _ in range(2):
+        token = tracer.start("POST /api/translate")
+        with span("match"):
+            pass
+        tracer.end(token)
+    tracer.exporter.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]["name"] == "POST /api/translate"
+    assert records[0]["spans"][0]["name"] == "match"
+    assert records[0]["trace_id"] != records[1]["trace_id"]
@@ -4,7 +4,7 @@ Unit tests for the translator module.
 import pytest
 
 # No need for manual import path manipulation - that's handled in conftest.py
-from app.translator import translate_error, detect_language
+from app.translator import translate_error, detect_language, select_windows, MAX_ERROR_LENGTH
 
 
 @pytest.mark.unit
@@ -42,6 +42,50 @@ def test_detect_language_general():
     assert detect_language(error_msg) == "general"
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize("error_msg, language, title", [
+    ("NameError: name 'x' is not defined", "python", 'Variable "x" Not Defined'),
+    ("ZeroDivisionError: division by zero", "python", "Division by Zero"),
+    ("Uncaught ReferenceError: foo is not defined", "javascript", 'Variable "foo" Not Defined'),
+])
+def test_translate_error_auto_detects_exception_types(error_msg, language, title):
+    """Test that auto-detection picks the language owning the message's exception type."""
+    result = translate_error(error_msg, "auto")
+    assert result["language"] == language
+    assert result["title"] == title
+
+
+@pytest.mark.unit
+def test_detect_language_exception_type_outranks_file_extension():
+    """Test that an exception type only one language has patterns for outweighs a file extension."""
+    error_msg = "Traceback from main.py:\nReferenceError: foo is not defined"
+    assert detect_language(error_msg, use_patterns=False) == "javascript"
+
+
+@pytest.mark.unit
+def test_detect_language_ignores_general_exception_types(monkeypatch):
+    """Test that an exception type only general patterns have does not break detection."""
+    import app.message
+    import app.translator
+    from app.data.packs import PackRegistry
+    from app.data.registry import PatternRegistry
+
+    registry = PatternRegistry()
+    registry.add_language("general", [{
+        "regex": r"WidgetError: broken", "title": "Broken Widget",
+        "explanation": "The widget broke.", "solution": "Fix the widget.",
+    }])
+    packs = PackRegistry(registry, discover=False)
+    monkeypatch.setattr(app.translator, "LANGUAGE_PACKS", packs)
+    monkeypatch.setattr(app.message, "LANGUAGE_PACKS", packs)
+    detect_language.cache_clear()
+    try:
+        assert registry.languages_for_type("widgeterror") == ("general",)
+        assert detect_language("WidgetError: broken thing", use_patterns=False) == "general"
+    finally:
+        detect_language.cache_clear()
+
+
 @pytest.mark.unit
 def test_translate_error_syntax():
     """Test translation of syntax errors."""
@@ -61,5 +105,68 @@ def test_translate_error_empty():
     assert result["title"] == "No error message provided"
 
 
+@pytest.mark.unit
+def test_select_windows_short_text_unchanged():
+    """Test that text within the length limit is not windowed."""
+    text = "NameError: name 'x' is not defined"
+    assert select_windows(text) == (text, [])
+
+
+@pytest.mark.unit
+def test_select_windows_keeps_head_tail_and_markers():
+    """Test that oversized text keeps the head, tail and exception marker lines."""
+    frames = "".join(f'  File "app.py", line {i}, in handler\n' for i in range(2000))
+    text = (
+        "Traceback (most recent call last):\n"
+        + frames
+        + "Caused by: ValueError: bad input\n"
+        + frames
+        + "NameError: name 'total' is not defined"
+    )
+    windowed, windows = select_windows(text)
+
+    assert [w["kind"] for w in windows] == ["head", "marker", "tail"]
+    assert windowed.startswith("Traceback (most recent call last):")
+    assert "Caused by: ValueError: bad input" in windowed
+    assert windowed.endswith("NameError: name 'total' is not defined")
+    assert len(windowed) <= MAX_ERROR_LENGTH
+
+
+@pytest.mark.unit
+def test_select_windows_budget_counts_separators():
+    """Test that the windowed text stays within the limit when the marker budget is used up."""
+    filler = "x" * 20 + "\n"
+    marker = "Caused by: ValueError: bad input ".ljust(399, "z") + "\n"
+    text = ("Traceback (most recent call last):\n" + filler * 200 + (filler + marker) * 50
+            + filler * 300)
+    windowed, windows = select_windows(text)
+
+    assert [w["kind"] for w in windows].count("marker") > 1
+    assert len(windowed) <= MAX_ERROR_LENGTH
+
+
+@pytest.mark.unit
+def test_select_windows_cuts_long_lines_around_the_marker():
+    """Test that a marker late in a long line is kept when the line is cut."""
+    frames = "".join(f'  File "app.py", line {i}, in handler\n' for i in range(2000))
+    line = "x" * 2000 + " Caused by: ValueError: bad input " + "y" * 2000 + "\n"
+    text = "Traceback (most recent call last):\n" + frames + line + frames + "NameError: oops"
+    windowed, windows = select_windows(text)
+
+    assert "Caused by: ValueError: bad input" in windowed
+    assert len(windowed) <= MAX_ERROR_LENGTH
+
+
+@pytest.mark.unit
+def test_translate_error_long_traceback_matches_final_line():
+    """Test that the final exception line of a long traceback is still matched."""
+    frames = "".join(f'  File "app.py", line {i}, in handler\n' for i in range(1000))
+    error_msg = ("Traceback (most recent call last):\n" + frames
+                 + "NameError: name 'total' is not defined")
+    result = translate_error(error_msg, "python")
+    assert "total" in result["title"]
+    assert [w["kind"] for w in result["windows"]] == ["head", "tail"]
+
+
 if __name__ == "__main__":
     pytest.main()
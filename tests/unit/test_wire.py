@@ -0,0 +1,76 @@
+"""
+Unit tests for the daemon's binary frame protocol.
+"""
+import socket
+
+import pytest
+
+from app import wire
+from app.wire import FrameError, FrameReader, encode_frame, packb, unpackb
+
+
+@pytest.fixture(params=["builtin", "msgpack"])
+def codec(request, monkeypatch):
+    """Run each test with the built-in codec, and with msgpack when it is installed."""
+    if request.param == "builtin":
+        monkeypatch.setattr(wire, "msgpack", None)
+    elif wire.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    return request.param
+
+
+@pytest.mark.unit
+def test_values_round_trip(codec):
+    """Test that every supported type survives encoding, at each size class."""
+    values = [
+        None, True, False, 0, 127, 128, -32, -33, 255, 65536, 2 ** 40, -2 ** 40, 2 ** 64 - 1,
+        -2 ** 63, 1.5,
+        "", "é", "x" * 31, "x" * 300, "x" * 70000, b"\x00\xff", list(range(20)),
+        {"id": 1, "result": {"title": "Oops", "related_errors": ["a", "b"], "confidence": 0.9,
+                             "cached": None}},
+        {str(i): i for i in range(20)},
+    ]
+    for value in values:
+        assert unpackb(packb(value)) == value
+    assert unpackb(packb((1, 2))) == [1, 2]
+
+
+@pytest.mark.unit
+def test_encoding_matches_msgpack_spec(codec):
+    """Test the exact bytes of a few values, so both codecs stay interchangeable."""
+    assert packb({"a": 1}) == b"\x81\xa1a\x01"
+    assert packb([None, True, -1, 200]) == b"\x94\xc0\xc3\xff\xcc\xc8"
+    assert packb("x" * 40) == b"\xd9\x28" + b"x" * 40
+
+
+@pytest.mark.unit
+def test_invalid_frames_are_rejected(codec):
+    """Test that truncated, trailing and unsupported data raise FrameError."""
+    for data in (b"\x92\x01", b"\x01\x02", b"\xc1", b"\xd9\x05ab"):
+        with pytest.raises(FrameError):
+            unpackb(data)
+    with pytest.raises(FrameError):
+        packb(object())
+
+
+@pytest.mark.unit
+def test_reader_splits_pipelined_frames():
+    """Test that frames written together, or split across reads, are read one at a time."""
+    left, right = socket.socketpair()
+    with left, right:
+        frames = encode_frame({"id": 1}) + encode_frame({"id": 2})
+        left.sendall(frames[:3])
+        left.sendall(frames[3:])
+        reader = FrameReader(right)
+        assert reader.read() == {"id": 1}
+        assert reader.has_frame()
+        assert reader.read() == {"id": 2}
+        assert not reader.has_frame()
+
+        left.sendall(wire.HEADER.pack(wire.MAX_FRAME_SIZE + 1))
+        with pytest.raises(FrameError):
+            reader.read()
+        left.close()
+        reader = FrameReader(right)
+        with pytest.raises(EOFError):
+            reader.read()